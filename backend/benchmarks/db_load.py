@@ -0,0 +1,185 @@
+"""
+Veritabanı profili yük testi: eşzamanlı dosya listeleme ve yükleme.
+
+Her profil ayrı bir süreçte, geçici MEDIA_ROOT ve boş veritabanıyla çalışır. Çok thread'li
+WSGI sunucusu (runserver / waitress gibi) başlatılır; her thread kendi kullanıcısıyla
+GET /api/drive/files (eşitleme tetikler) ve POST /api/drive/files isteklerini art arda gönderir.
+İşlem başına istek/sn, p50 / p95 gecikme ve hata sayısı yazdırılır.
+
+    sqlite-legacy -> eski ayarlar (rollback journal, DEFERRED transaction, 5 sn timeout)
+    sqlite        -> settings.py SQLite profili (WAL, IMMEDIATE, busy_timeout, mmap)
+    postgres      -> DATABASE_URL (boş bir veritabanı verin; tablolar oluşturulur)
+
+    cd backend
+    python benchmarks/db_load.py --profiles sqlite-legacy,sqlite --threads 8 --seconds 15
+    DATABASE_URL=postgres://... python benchmarks/db_load.py --profiles postgres
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.client import HTTPConnection
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PROFILES = ('sqlite-legacy', 'sqlite', 'postgres')
+
+
+def _multipart(filename, data):
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file_type"\r\n\r\nFILE\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def _worker(port, token, deadline, upload_ratio, upload_size, results):
+    conn = HTTPConnection('127.0.0.1', port, timeout=120)
+    headers = {'Authorization': f'Bearer {token}'}
+    rng = random.Random()
+    while time.monotonic() < deadline:
+        if rng.random() < upload_ratio:
+            op = 'upload'
+            body, content_type = _multipart(f'{uuid.uuid4().hex[:12]}.bin', os.urandom(upload_size))
+            request = ('POST', '/api/drive/files', body, {**headers, 'Content-Type': content_type})
+        else:
+            op = 'list'
+            request = ('GET', '/api/drive/files?limit=50', None, headers)
+        started = time.monotonic()
+        try:
+            conn.request(*request)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except OSError:
+            conn.close()
+            conn = HTTPConnection('127.0.0.1', port, timeout=120)
+            ok = False
+        results.append((op, time.monotonic() - started, ok))
+    conn.close()
+
+
+def run_profile(profile, threads, seconds, upload_ratio, upload_size):
+    """Alt süreç: tek profili çalıştırır, sonucu JSON olarak döndürür."""
+    work_dir = tempfile.mkdtemp(prefix='db_load_')
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'config.settings',
+        'MEDIA_ROOT': os.path.join(work_dir, 'media'),
+        'THUMBNAIL_CACHE_ROOT': os.path.join(work_dir, 'thumbnails'),
+        'DRIVE_WATCHER': 'off',
+        'DRIVE_TASK_BACKEND': 'thread',
+    })
+    if profile != 'postgres':
+        os.environ.pop('DATABASE_URL', None)
+    elif not os.environ.get('DATABASE_URL'):
+        raise SystemExit('postgres profili için DATABASE_URL gerekli')
+
+    import django
+    from django.conf import settings
+
+    if profile.startswith('sqlite'):
+        settings.DATABASES['default']['NAME'] = os.path.join(work_dir, 'db.sqlite3')
+    if profile == 'sqlite-legacy':
+        settings.DATABASES['default']['OPTIONS'] = {}
+    django.setup()
+
+    from django.core.management import call_command
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from core.models import User
+
+    call_command('migrate', verbosity=0)
+    users = []
+    for i in range(threads):
+        name = f'load{i}_{uuid.uuid4().hex[:6]}'
+        users.append(User.objects.create_user(phone_number=name, password='x', username=name, user_folder=name.upper()))
+    tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    results = []
+    deadline = time.monotonic() + seconds
+    workers = [
+        threading.Thread(target=_worker, args=(port, token, deadline, upload_ratio, upload_size, results))
+        for token in tokens
+    ]
+    started = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - started
+    server.shutdown()
+
+    summary = {}
+    for op in ('list', 'upload'):
+        ok = [duration for name, duration, success in results if name == op and success]
+        failed = sum(1 for name, _, success in results if name == op and not success)
+        quantiles = statistics.quantiles(ok, n=20) if len(ok) >= 2 else [0] * 19
+        summary[op] = {
+            'count': len(ok),
+            'rate': len(ok) / elapsed,
+            'p50': statistics.median(ok) * 1000 if ok else 0,
+            'p95': quantiles[18] * 1000,
+            'errors': failed,
+        }
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default='sqlite-legacy,sqlite', help=f'Virgülle ayrılmış: {", ".join(PROFILES)}')
+    parser.add_argument('--threads', type=int, default=8, help='Eşzamanlı istemci (her biri ayrı kullanıcı)')
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--upload-ratio', type=float, default=0.3, help='İsteklerin yükleme oranı')
+    parser.add_argument('--upload-size', type=int, default=64 * 1024, help='Yüklenen dosya boyutu (bayt)')
+    parser.add_argument('--run', choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_profile(args.run, args.threads, args.seconds, args.upload_ratio, args.upload_size)))
+        return
+
+    print(f'{args.threads} thread, {args.seconds:.0f} sn, yükleme oranı {args.upload_ratio:.0%}')
+    print(f'{"profil":<15} {"işlem":<8} {"istek":>7} {"istek/sn":>9} {"p50 ms":>8} {"p95 ms":>8} {"hata":>6}')
+    for profile in args.profiles.split(','):
+        profile = profile.strip()
+        if profile not in PROFILES:
+            raise SystemExit(f'Bilinmeyen profil: {profile}')
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', profile, '--threads', str(args.threads),
+             '--seconds', str(args.seconds), '--upload-ratio', str(args.upload_ratio),
+             '--upload-size', str(args.upload_size)],
+            cwd=BACKEND_DIR, capture_output=True, text=True,
+        )
+        if output.returncode != 0:
+            print(f'{profile:<15} başarısız:\n{output.stderr[-2000:]}')
+            continue
+        summary = json.loads(output.stdout.strip().splitlines()[-1])
+        for op, row in summary.items():
+            print(f'{profile:<15} {op:<8} {row["count"]:>7} {row["rate"]:>9.1f} {row["p50"]:>8.1f} {row["p95"]:>8.1f} {row["errors"]:>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+FileItem kaydı başına dosya sistemi çağrısı: eski save() (her kayıtta self.size = self.file.size)
+ile yeni save() / touch_metadata() karşılaştırması.
+
+Geçici MEDIA_ROOT ve veritabanında --count dosya oluşturulur, eşitleme ile içe aktarılır. Her senaryoda
+tüm dosyaların favori durumu değiştirilip kaydedilir; MEDIA_ROOT altındaki stat ve open çağrıları
+(os.stat / os.lstat ve 'open' audit olayı) sayılır. Son satır, dosyalar değişmeden klasörü
+yeniden tarayan eşitlemenin dosya başına çağrılarıdır (DirEntry.stat, scandir'in tek çağrısında gelir).
+
+    cd backend
+    python benchmarks/save_syscalls.py --count 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+class Counter:
+    """MEDIA_ROOT altındaki stat / open çağrılarını sayar."""
+
+    def __init__(self, root):
+        self.root = root
+        self.active = False
+        self.stat = self.open = self.scandir = 0
+        self._stat, self._lstat = os.stat, os.lstat
+        os.stat = self._wrap(self._stat)
+        os.lstat = self._wrap(self._lstat)
+        sys.addaudithook(self._audit)
+
+    def _inside(self, path):
+        return isinstance(path, (str, bytes, os.PathLike)) and os.fsdecode(path).startswith(self.root)
+
+    def _wrap(self, func):
+        def wrapper(path, *args, **kwargs):
+            if self.active and self._inside(path):
+                self.stat += 1
+            return func(path, *args, **kwargs)
+        return wrapper
+
+    def _audit(self, event, args):
+        if not self.active or not args or not self._inside(args[0]):
+            return
+        if event == 'open':
+            self.open += 1
+        elif event == 'os.scandir':
+            self.scandir += 1
+
+    def measure(self, func):
+        self.stat = self.open = self.scandir = 0
+        self.active = True
+        started = time.perf_counter()
+        try:
+            func()
+        finally:
+            self.active = False
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=500, help='Dosya sayısı')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='save_syscalls_')
+    media_root = os.path.join(work_dir, 'media')
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'config.settings',
+        'MEDIA_ROOT': media_root,
+        'THUMBNAIL_CACHE_ROOT': os.path.join(work_dir, 'thumbnails'),
+        'DRIVE_WATCHER': 'off',
+        'DRIVE_TASK_BACKEND': 'eager',
+    })
+    os.environ.pop('DATABASE_URL', None)
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = os.path.join(work_dir, 'db.sqlite3')
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import models
+
+    from core.models import User
+    from drive import storage, sync
+    from drive.models import FileItem
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(phone_number='bench', password='x', username='bench', user_folder='BENCH')
+    storage.files().make_user_folder('BENCH')
+    folder = os.path.join(media_root, 'BENCH', 'Dosyalar')
+    for i in range(args.count):
+        with open(os.path.join(folder, f'file_{i}.bin'), 'wb') as f:
+            f.write(os.urandom(1024))
+    sync.reconcile_user(user)
+    items = list(FileItem.objects.filter(user=user))
+
+    def legacy_save(item):
+        # Eski FileItem.save: boyut her kayıtta depodan okunur
+        item.size = item.file.size
+        models.Model.save(item)
+
+    def flip(save):
+        def run():
+            for item in items:
+                item.is_favorite = not item.is_favorite
+                save(item)
+        return run
+
+    def rescan():
+        # Klasör değişmiş görünsün; dosyalar aynı
+        os.utime(folder, ns=(1, 1))
+        sync.reconcile_user(user)
+
+    counter = Counter(os.path.realpath(media_root))
+    scenarios = (
+        ('eski save()', flip(legacy_save)),
+        ('save()', flip(lambda item: item.save())),
+        ('touch_metadata()', flip(lambda item: item.touch_metadata())),
+        ('eşitleme (değişiklik yok)', rescan),
+    )
+    print(f'{args.count} dosya')
+    print(f'{"senaryo":<28} {"stat/dosya":>11} {"open/dosya":>11} {"scandir":>8} {"µs/dosya":>10}')
+    for name, func in scenarios:
+        elapsed = counter.measure(func)
+        print(f'{name:<28} {counter.stat / args.count:>11.2f} {counter.open / args.count:>11.2f} '
+              f'{counter.scandir:>8} {elapsed / args.count * 1e6:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Arama gecikmesi: drive.search.search, büyük bir dizinde (varsayılan 1M kayıt).
+
+Geçici bir SQLite veritabanında SearchDocument tablosu sentetik dosya adlarıyla doldurulur
+(tetikleyiciler FTS5 dizinini günceller). Kayıtlar --users kullanıcıya dağıtılır, ölçülen
+kullanıcı ilkidir. Adların bir kısmı sık kelimelerden (img, fatura, ekran, ...) oluşur ki
+önek aramaları on binlerce kayda uysun. Her sorgu --repeat kez çalıştırılır; p50 / p95 (ms),
+eşleşen kayıt sayısı ve 50 ms hedefini aşanlar yazdırılır.
+
+    cd backend
+    python benchmarks/search.py --rows 1000000
+    python benchmarks/search.py --rows 1000000 --users 4 --queries "img,fatura mart,rap"
+
+Veritabanı --keep ile saklanırsa sonraki çalıştırmalar --db ile aynı dizini kullanabilir.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TARGET_MS = 50
+BATCH = 50_000
+COMMON_WORDS = (
+    'img', 'fatura', 'rapor', 'tatil', 'video', 'belge', 'mart', 'nisan', 'ekran', 'goruntusu',
+    'scan', 'dsc', 'whatsapp', 'image', 'ozgecmis', 'sozlesme', '2023', '2024', 'final', 'kopya',
+)
+QUERIES = (
+    'i', 'im', 'img', 'img 2024', 'fatura mart', 'ekran görüntüsü', 'rap', 'WhatsApp Image',
+    'özgeçmiş final', 'qzx',
+)
+
+
+def _titles(count, seed):
+    """Sık ve seyrek kelimelerden 1-5 kelimelik dosya adları."""
+    rng = random.Random(seed)
+    letters = 'abcdefgiklmnoprstuyz'
+    rare = [''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(50_000)]
+    extensions = ('jpg', 'pdf', 'mp4', 'docx', 'png')
+    for _ in range(count):
+        words = [rng.choice(COMMON_WORDS) if rng.random() < 0.3 else rng.choice(rare) for _ in range(rng.randint(1, 5))]
+        yield f'{"_".join(words)}.{rng.choice(extensions)}'
+
+
+def populate(rows, users, seed):
+    from django.db import connection, transaction
+
+    from core.models import User
+    from drive import search
+
+    owners = []
+    for i in range(users):
+        name = f'search{i}_{uuid.uuid4().hex[:6]}'
+        owners.append(User.objects.create_user(phone_number=name, password='x', username=name, user_folder=name.upper()))
+    started = time.monotonic()
+    batch = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for i, title in enumerate(_titles(rows, seed)):
+            batch.append((owners[i % users].pk.hex, 'file', uuid.uuid4().hex, search.fold(title), ''))
+            if len(batch) == BATCH:
+                cursor.executemany(
+                    'INSERT INTO drive_searchdocument (user_id, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+                    batch,
+                )
+                batch = []
+                print(f'\r{i + 1} kayıt', end='', flush=True)
+        if batch:
+            cursor.executemany(
+                'INSERT INTO drive_searchdocument (user_id, kind, object_id, title, body) VALUES (%s, %s, %s, %s, %s)',
+                batch,
+            )
+    print(f'\r{rows} kayıt {time.monotonic() - started:.0f} sn')
+    return owners[0]
+
+
+def _matches(user, words):
+    from django.db import connection
+
+    from drive import search
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT count(*) FROM {search.FTS_TABLE} CROSS JOIN drive_searchdocument d'
+            f' ON d.id = {search.FTS_TABLE}.rowid WHERE {search.FTS_TABLE} MATCH %s AND d.user_id = %s',
+            [search.match_expression(words), user.pk.hex],
+        )
+        return cursor.fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1, help='Kayıtların dağıtıldığı kullanıcı sayısı')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--queries', help='Virgülle ayrılmış sorgular')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--db', help='Var olan (--keep ile saklanmış) veritabanı')
+    parser.add_argument('--keep', action='store_true', help='Veritabanını silme')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='search_bench_')
+    os.environ.update({
+        'DJANGO_SETTINGS_MODULE': 'config.settings',
+        'MEDIA_ROOT': os.path.join(work_dir, 'media'),
+        'DRIVE_WATCHER': 'off',
+    })
+    os.environ.pop('DATABASE_URL', None)
+
+    import django
+    from django.conf import settings
+
+    db_path = args.db or os.path.join(work_dir, 'db.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    django.setup()
+
+    from django.core.management import call_command
+
+    from core.models import User
+    from drive import search
+
+    try:
+        if args.db:
+            user = User.objects.filter(username__startswith='search0_').first()
+        else:
+            call_command('migrate', verbosity=0)
+            user = populate(args.rows, args.users, args.seed)
+        documents = search.SearchDocument.objects.filter(user=user).count()
+
+        queries = args.queries.split(',') if args.queries else QUERIES
+        print(f'{documents} kayıt (kullanıcı), limit {args.limit}, {args.repeat} tekrar')
+        print(f'{"sorgu":<20} {"eşleşme":>9} {"p50 ms":>8} {"p95 ms":>8}')
+        slow = []
+        for query in queries:
+            words = search.tokens(query)
+            if not words:
+                continue
+            search.search(user, query, limit=args.limit)
+            durations = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                search.search(user, query, limit=args.limit)
+                durations.append((time.perf_counter() - started) * 1000)
+            p95 = statistics.quantiles(durations, n=20)[18] if len(durations) >= 2 else durations[0]
+            print(f'{query:<20} {_matches(user, words):>9} {statistics.median(durations):>8.1f} {p95:>8.1f}')
+            if p95 > TARGET_MS:
+                slow.append(query)
+        print(f'p95 > {TARGET_MS} ms: {", ".join(slow) if slow else "yok"}')
+    finally:
+        if args.keep:
+            print(f'Veritabanı: {db_path}')
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Küçük resim üretimi karşılaştırması: eski ThumbnailView yolu ile drive.thumbnails.render_thumbnail.
+
+Sentetik bir JPEG/PNG derlemi üretir, her uygulamayı ayrı bir süreçte çalıştırır ve
+küçük resim başına süreyi (ms) ve en yüksek bellek kullanımını (peak RSS) yazdırır.
+
+    cd backend
+    python benchmarks/thumbnails.py --count 20 --megapixels 12
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import resource
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+
+def _exif_with_thumbnail(orientation, thumb_bytes):
+    """IFD0'da yön bilgisi, IFD1'de gömülü JPEG önizlemesi olan bir EXIF bloğu üretir."""
+    ifd0 = struct.pack('<H', 1) + struct.pack('<HHIHH', 0x0112, 3, 1, orientation, 0) + struct.pack('<I', 26)
+    thumb_offset = 8 + len(ifd0) + 30
+    ifd1 = (
+        struct.pack('<H', 2)
+        + struct.pack('<HHII', 0x0201, 4, 1, thumb_offset)
+        + struct.pack('<HHII', 0x0202, 4, 1, len(thumb_bytes))
+        + struct.pack('<I', 0)
+    )
+    return b'Exif\x00\x00' + b'II*\x00' + struct.pack('<I', 8) + ifd0 + ifd1 + thumb_bytes
+
+
+def build_corpus(target_dir, count, megapixels):
+    """Gürültülü (kolay sıkışmayan) JPEG ve PNG dosyaları üretir."""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    base = Image.effect_noise((width // 4, height // 4), 64).convert('RGB').resize((width, height))
+    paths = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 2:
+            path = os.path.join(target_dir, f'img_{i}.png')
+            base.resize((width // 2, height // 2)).save(path, 'PNG')
+        else:
+            path = os.path.join(target_dir, f'img_{i}.jpg')
+            exif = None
+            if kind == 1:
+                # Telefon kameraları gibi gömülü önizleme + yön bilgisi
+                # (APP1 segmenti 64 KB ile sınırlı)
+                small = base.resize((512, 384))
+                for quality in (75, 50, 30, 15):
+                    thumb = io.BytesIO()
+                    small.save(thumb, 'JPEG', quality=quality)
+                    if thumb.tell() < 60_000:
+                        break
+                exif = _exif_with_thumbnail(6, thumb.getvalue())
+            base.save(path, 'JPEG', quality=90, **({'exif': exif} if exif else {}))
+        paths.append(path)
+    return paths
+
+
+def legacy_render(path, max_size, fmt='JPEG', quality=60):
+    """Önbellek öncesi ThumbnailView'in yaptığı işlem."""
+    img = Image.open(path)
+    img.thumbnail((max_size, max_size))
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def _run(name, paths, max_size, queue):
+    # İki süreçte de aynı modüller yüklü olsun ki RSS farkı sadece üretimden gelsin
+    from drive.thumbnails import render_thumbnail
+    render = legacy_render if name == 'legacy' else render_thumbnail
+    started = time.perf_counter()
+    for path in paths:
+        render(path, max_size)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed * 1000 / len(paths), peak_kb / 1024))
+
+
+def measure(name, paths, max_size):
+    # Her uygulama kendi sürecinde: peak RSS birbirini etkilemesin
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_run, args=(name, paths, max_size, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=12)
+    parser.add_argument('--megapixels', type=float, default=12)
+    parser.add_argument('--size', type=int, default=400, help='Küçük resmin en uzun kenarı')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f'Derlem oluşturuluyor: {args.count} dosya, {args.megapixels} MP ...')
+        paths = build_corpus(tmp, args.count, args.megapixels)
+        print(f'{"uygulama":<10} {"ms/küçük resim":>15} {"peak RSS (MB)":>15}')
+        for name in ('legacy', 'fast'):
+            ms, rss = measure(name, paths, args.size)
+            print(f'{name:<10} {ms:>15.1f} {rss:>15.1f}')
+
+
+if __name__ == '__main__':
+    main()
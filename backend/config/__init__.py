@@ -0,0 +1,6 @@
+try:
+    from .celery import app as celery_app
+except ImportError:  # Celery kurulu değilse süreç içi iş havuzu kullanılır
+    celery_app = None
+
+__all__ = ('celery_app',)
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django kurulduktan sonra; waitress'in --max-request-body-size sınırının yerini alır
+from drive.aio import limit_body  # noqa: E402
+
+application = limit_body(django_application)
@@ -0,0 +1,16 @@
+"""
+Celery uygulaması.
+
+Sadece DRIVE_TASK_BACKEND = 'celery' iken kullanılır; çalıştırmak için:
+    celery -A config worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
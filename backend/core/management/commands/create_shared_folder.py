@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from pathlib import Path
+from drive import storage
 
 
 class Command(BaseCommand):
@@ -7,7 +7,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Ortak klasör
-        shared_folder = Path('D:/ooCloud/Paylasilan')
+        shared_folder = storage.shared_dir()
         
         try:
             # Ana klasörü oluştur
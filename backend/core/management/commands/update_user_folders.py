@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from core.models import User
-from pathlib import Path
+from drive import storage
 
 
 class Command(BaseCommand):
@@ -19,10 +19,7 @@ class Command(BaseCommand):
             
             # Klasörleri oluştur
             try:
-                user_folder = Path(f'D:/ooCloud/{folder_name}')
-                user_folder.mkdir(parents=True, exist_ok=True)
-                (user_folder / 'Dosyalar').mkdir(exist_ok=True)
-                (user_folder / 'Fotograflar').mkdir(exist_ok=True)
+                storage.files().make_user_folder(folder_name)
                 
                 self.stdout.write(
                     self.style.SUCCESS(f'✓ {user.full_name or user.phone_number}: {folder_name}')
@@ -4,8 +4,7 @@ from django.shortcuts import get_object_or_404
 from .models import User, OTP
 from .serializers import LoginSerializer, VerifyOTPSerializer, UserSerializer, RegisterSerializer
 from django.utils import timezone
-import os
-from pathlib import Path
+from drive import storage
 
 class RegisterView(views.APIView):
     permission_classes = [permissions.AllowAny]
@@ -19,18 +18,13 @@ class RegisterView(views.APIView):
             try:
                 # Kullanıcı adını klasör adı olarak kullan
                 folder_name = user.username or user.full_name.replace(' ', '_').upper()
-                user_folder = Path(f'D:/ooCloud/{folder_name}')
                 
                 # user_folder alanını kaydet
                 user.user_folder = folder_name
                 user.save()
                 
-                # Ana klasörü oluştur
-                user_folder.mkdir(parents=True, exist_ok=True)
-                
-                # Alt klasörleri oluştur
-                (user_folder / 'Dosyalar').mkdir(exist_ok=True)
-                (user_folder / 'Fotograflar').mkdir(exist_ok=True)
+                # Ana klasörü ve alt klasörleri (Dosyalar, Fotograflar) oluştur
+                user_folder = storage.files().make_user_folder(folder_name)
                 
                 print(f"✓ Kullanıcı klasörleri oluşturuldu: {user_folder}")
             except Exception as e:
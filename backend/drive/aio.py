@@ -0,0 +1,203 @@
+"""
+ASGI altında ağır G/Ç uçları için async yardımcılar.
+
+Sunucu ASGI ise (uvicorn config.asgi:application) indirme, paylaşılan dosya, küçük resim,
+parça yükleme ve olay akışı istekleri bir thread'i dakikalarca tutmaz: istemciyi event
+loop'ta bekler, disk okuma / yazmayı sınırlı bir thread havuzunda sabit boyutlu parçalar
+halinde, PIL işlerini ayrı (CPU sayısı kadar) bir havuzda yapar. WSGI altında (runserver,
+waitress) aynı URL'ler mevcut DRF view'larına düşer.
+
+    DRIVE_IO_WORKERS       -> dosya okuma / yazma thread sayısı
+    DRIVE_CPU_WORKERS      -> küçük resim üretimi thread sayısı
+    DRIVE_MAX_REQUEST_BODY -> istek gövdesi sınırı (bkz. limit_body)
+
+Django ASGI'de gövdeyi view çalışmadan önce tamamen okur (FILE_UPLOAD_MAX_MEMORY_SIZE'a kadar
+bellekte, sonrası geçici dosyada). Sınır bu yüzden Django'nun önündeki limit_body katmanındadır.
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .serving import STREAM_BLOCK
+from .uploads import MAX_CHUNK_SIZE
+
+UPLOAD_SESSION_PATH_RE = re.compile(r'^/api/drive/uploads/[0-9a-fA-F-]+$')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _executor(kind):
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                if kind == 'cpu':
+                    workers = getattr(settings, 'DRIVE_CPU_WORKERS', None) or os.cpu_count() or 2
+                else:
+                    workers = getattr(settings, 'DRIVE_IO_WORKERS', 32)
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'drive-{kind}')
+                _executors[kind] = executor
+    return executor
+
+
+def _call(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Havuz thread'lerinde açılan veritabanı bağlantıları istek sonunda kapanmaz
+        close_old_connections()
+
+
+async def run_io(func, *args, **kwargs):
+    """Engelleyen dosya sistemi işini G/Ç havuzunda çalıştırır."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor('io'), functools.partial(_call, func, args, kwargs)
+    )
+
+
+async def run_cpu(func, *args, **kwargs):
+    """PIL gibi CPU ağırlıklı işi ayrı havuzda çalıştırır (indirmeler bunun arkasında beklemez)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor('cpu'), functools.partial(_call, func, args, kwargs)
+    )
+
+
+async def iter_file(path, start, length):
+    """Dosyanın [start, start + length) aralığını STREAM_BLOCK'luk parçalar halinde okur."""
+    f = await run_io(open, path, 'rb')
+    try:
+        await run_io(f.seek, start)
+        while length > 0:
+            block = await run_io(f.read, min(STREAM_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        f.close()
+
+
+async def iterate(iterator):
+    """Senkron üreticiyi (ör. ZIP akışı) her adımı G/Ç havuzunda çalıştırarak akıtır."""
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while True:
+            item = await run_io(next, iterator, done)
+            if item is done:
+                return
+            yield item
+    finally:
+        # İstemci koparsa açık dosyalar beklemeden kapansın
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await run_io(close)
+
+
+def _authenticate(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except exceptions.AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+async def authenticate(request):
+    """Authorization: Bearer <jwt> başlığındaki kullanıcıyı döndürür, yoksa / geçersizse None."""
+    return await sync_to_async(_authenticate)(request)
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+def error(message, status):
+    return json_response({'error': message}, status)
+
+
+def hybrid(sync_view, **handlers):
+    """
+    ASGI isteklerinde verilen metotları (get=..., put=...) async handler'a,
+    diğer metotları ve WSGI isteklerini mevcut view'a yönlendirir.
+    """
+    sync_view_async = sync_to_async(sync_view)
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        handler = handlers.get(request.method.lower())
+        if handler is None or not isinstance(request, ASGIRequest):
+            return await sync_view_async(request, *args, **kwargs)
+        return await handler(request, *args, **kwargs)
+    return view
+
+
+def body_limit(scope):
+    """İsteğin gövde sınırı: parça yüklemede MAX_CHUNK_SIZE, diğerlerinde DRIVE_MAX_REQUEST_BODY."""
+    if scope.get('method') == 'PUT' and UPLOAD_SESSION_PATH_RE.match(scope.get('path', '')):
+        return MAX_CHUNK_SIZE
+    return getattr(settings, 'DRIVE_MAX_REQUEST_BODY', 100 * 1024 * 1024)
+
+
+async def _too_large(send):
+    body = json.dumps({'error': 'İstek gövdesi çok büyük'}, ensure_ascii=False).encode()
+    await send({
+        'type': 'http.response.start', 'status': 413,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def limit_body(app):
+    """
+    ASGI katmanı: sınırı aşan istekler Django gövdeyi biriktirmeden 413 alır.
+    Content-Length sınırı aşıyorsa gövde hiç okunmaz; başlık yoksa (chunked) okunan bayt sayılır,
+    sınır aşılınca Django'ya bağlantı kopmuş gibi görünür ve yanıtı bu katman verir.
+    """
+    async def application(scope, receive, send):
+        if scope['type'] != 'http':
+            return await app(scope, receive, send)
+        limit = body_limit(scope)
+        length = dict(scope.get('headers', ())).get(b'content-length', b'')
+        if length.isdigit() and int(length) > limit:
+            return await _too_large(send)
+
+        received = 0
+        exceeded = started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            if exceeded:
+                return {'type': 'http.disconnect'}
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    exceeded = True
+                    return {'type': 'http.disconnect'}
+            return message
+
+        async def tracked_send(message):
+            nonlocal started
+            if message['type'] == 'http.response.start':
+                started = True
+            await send(message)
+
+        await app(scope, limited_receive, tracked_send)
+        if exceeded and not started:
+            await _too_large(send)
+    return application
@@ -2,4 +2,6 @@ from django.apps import AppConfig
 
 
 class DriveConfig(AppConfig):
+    # drive tabloları 32 bit id ile oluşturuldu; id'si büyüyecek modeller (ChangeJournal) BigAutoField'ı açıkça belirtir
+    default_auto_field = 'django.db.models.AutoField'
     name = 'drive'
@@ -0,0 +1,163 @@
+"""
+Çoklu dosya / klasör indirmesi için anlık ZIP akışı.
+
+Arşiv geçici dosya kullanılmadan, dosyalar okundukça üretilir: ilk baytlar hemen gider,
+bellek kullanımı arşiv boyutundan bağımsızdır (bir okuma bloğu + sıkıştırıcı tamponu).
+Zaten sıkıştırılmış medya (jpg, mp4, zip ...) STORED, diğerleri DEFLATED eklenir.
+4 GB üstü dosyalar ve arşivler için ZIP64 kullanılır.
+
+Başlık gönderemeyen tarayıcı indirmeleri için seçime bağlı, süreli imza (sign / check).
+"""
+import hashlib
+import os
+import time
+import zipfile
+
+from django.core import signing
+
+from .serving import STREAM_BLOCK, link_max_age
+from .storage import files
+
+LINK_SALT = 'drive.archive'
+MAX_ARCHIVE_ITEMS = 20000
+# ZIP'in gösterebildiği en eski tarih (1980-01-01)
+ZIP_EPOCH = 315532800
+
+# Sıkıştırınca küçülmeyen biçimler (CPU harcanmaz)
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.heif', '.avif',
+    '.mp4', '.mov', '.mkv', '.avi', '.webm', '.m4v', '.3gp',
+    '.mp3', '.m4a', '.aac', '.ogg', '.opus', '.flac',
+    '.zip', '.rar', '.7z', '.gz', '.bz2', '.xz', '.zst',
+    '.pdf', '.docx', '.xlsx', '.pptx', '.apk',
+}
+
+
+class _Sink:
+    """ZipFile'ın yazdığı baytları toplar; iter_zip her bloktan sonra boşaltır."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def compress_type(name):
+    if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _open_entry(arcname, source):
+    """(ZipInfo, açık dosya); klasörse None. source disk yolu veya (depo, ad)."""
+    if isinstance(source, tuple):
+        storage, name = source
+        st = storage.stat(name)
+        info = zipfile.ZipInfo(arcname, time.localtime(max(st.st_mtime, ZIP_EPOCH))[:6])
+        info.file_size = st.st_size
+        info.external_attr = 0o644 << 16
+        return info, storage.open(name)
+    info = zipfile.ZipInfo.from_file(source, arcname, strict_timestamps=False)
+    if info.is_dir():
+        return None
+    return info, open(source, 'rb')
+
+
+def iter_zip(entries):
+    """
+    (arşivdeki ad, disk yolu veya (depo, ad)) çiftlerinden ZIP akışı üretir.
+    Arada silinen / okunamayan dosyalar atlanır.
+    """
+    sink = _Sink()
+    # Çıkış seek edilemediği için boyut / CRC her dosyanın ardından (data descriptor) yazılır
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as zf:
+        for arcname, path in entries:
+            try:
+                opened = _open_entry(arcname, path)
+                if opened is None:
+                    continue
+                info, source = opened
+                info.compress_type = compress_type(arcname)
+            except OSError:
+                continue
+            with source, zf.open(info, 'w') as dest:
+                while True:
+                    block = source.read(STREAM_BLOCK)
+                    if not block:
+                        break
+                    dest.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def _unique_name(name, used):
+    """Arşivde aynı ad ikinci kez geçerse 'ad (2).uzantı' yapılır."""
+    if name not in used:
+        used.add(name)
+        return name
+    stem, ext = os.path.splitext(name)
+    counter = 2
+    while f'{stem} ({counter}){ext}' in used:
+        counter += 1
+    name = f'{stem} ({counter}){ext}'
+    used.add(name)
+    return name
+
+
+def item_entries(items):
+    """FileItem'lar için (ad, (depo, ad)) listesi; aynı isimli dosyalar numaralandırılır."""
+    storage = files()
+    used = set()
+    return [
+        (_unique_name(item.filename or os.path.basename(item.file.name), used), (storage, item.file.name))
+        for item in items
+    ]
+
+
+def folder_entries(folder):
+    """Klasör ağacını gezerek (klasör adı/alt yol, yol) üretir. Gizli (.) girdiler atlanır."""
+    folder = os.fspath(folder)
+    base = os.path.dirname(os.path.abspath(folder))
+    for current, subdirs, files in os.walk(folder):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            path = os.path.join(current, name)
+            yield os.path.relpath(path, base).replace(os.sep, '/'), path
+
+
+def _selection_digest(ids, path):
+    raw = path if path is not None else ','.join(sorted(str(i) for i in ids))
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def sign(user, ids=None, path=None):
+    """Kullanıcıya ve seçime (id listesi veya paylaşılan klasör) bağlı süreli imza."""
+    return signing.dumps({'u': str(user.pk), 's': _selection_digest(ids, path)}, salt=LINK_SALT)
+
+
+def check(token, ids=None, path=None):
+    """İmza geçerli ve aynı seçim içinse kullanıcı id'sini, değilse None döndürür."""
+    try:
+        payload = signing.loads(token, salt=LINK_SALT, max_age=link_max_age())
+    except signing.BadSignature:
+        return None
+    if payload.get('s') != _selection_digest(ids, path):
+        return None
+    return payload.get('u')
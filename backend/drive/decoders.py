@@ -0,0 +1,218 @@
+"""
+Pillow'un doğrudan açamadığı fotoğraf biçimleri için çözücü kaydı.
+
+Her çözücü bir dosya uzantısı kümesine kayıtlıdır ve func(kaynak, max_size) ile açık dosyadan
+yönü düzeltilmiş RGB PIL görüntüsü döndürür. Uzantının çözücüleri kayıt sırasıyla, en son Pillow
+denenir; hiçbiri açamazsa Unsupported. Kayıtlı çözücüsü olan dosyaların çıktısı thumbnails
+önbelleğinde JPEG önizleme olarak bir kez saklanır (bkz. thumbnails._decode).
+
+    heif      -> pillow-heif (kuruluysa; HEIC açıcısı Pillow'a da kaydedilir, EXIF okunur)
+    rawpy     -> rawpy / LibRaw (kuruluysa): gömülü önizleme, yoksa yarım çözünürlükte çözme
+    embedded  -> TIFF tabanlı RAW'lardaki (DNG, NEF, ARW, CR2, ...) ve RAF'taki gömülü JPEG önizleme
+
+Ek çözücü: decoders.register('ad', ('.uzanti',), func)
+"""
+import posixpath
+import struct
+from collections import namedtuple
+from io import BytesIO
+
+from PIL import ExifTags, Image, UnidentifiedImageError
+
+from . import thumbnails
+
+try:
+    import pillow_heif
+except ImportError:
+    pillow_heif = None
+else:
+    pillow_heif.register_heif_opener()
+
+try:
+    import rawpy
+except ImportError:
+    rawpy = None
+
+HEIF_EXTENSIONS = ('.heic', '.heif', '.hif')
+RAW_EXTENSIONS = (
+    '.dng', '.arw', '.srf', '.sr2', '.cr2', '.cr3', '.nef', '.nrw', '.orf', '.rw2', '.pef', '.raf', '.srw', '.erf', '.3fr',
+)
+
+Decoder = namedtuple('Decoder', ('name', 'extensions', 'func'))
+
+
+class Unsupported(Exception):
+    """Dosya kayıtlı çözücülerin hiçbiriyle açılamadı."""
+
+
+DECODE_ERRORS = (
+    Unsupported, UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError,
+    EOFError, struct.error,
+) + ((rawpy.LibRawError,) if rawpy is not None else ())
+
+_registry = []
+
+
+def register(name, extensions, func):
+    """Çözücüyü uzantılar için kaydeder; önce kaydedilen önce denenir."""
+    _registry.append(Decoder(name, frozenset(ext.lower() for ext in extensions), func))
+
+
+def _for_name(name):
+    ext = posixpath.splitext(name)[1].lower()
+    return [decoder for decoder in _registry if ext in decoder.extensions]
+
+
+def has_decoder(name):
+    return bool(_for_name(name))
+
+
+def signature():
+    """Kurulu çözücüler; değişirse (ör. pillow-heif kuruldu) desteklenmeyen kayıtları geçersiz olur."""
+    return ','.join(decoder.name for decoder in _registry)
+
+
+def _pillow(source, max_size):
+    return thumbnails._load_image(source, max_size)
+
+
+PILLOW = Decoder('pillow', frozenset(), _pillow)
+
+
+def decode(source, name, max_size):
+    """Açık dosyayı (name'in uzantısına göre) çözer. Hiçbir çözücü açamazsa Unsupported."""
+    errors = []
+    for decoder in _for_name(name) + [PILLOW]:
+        source.seek(0)
+        try:
+            return decoder.func(source, max_size)
+        except (FileNotFoundError, PermissionError):
+            raise
+        except DECODE_ERRORS as e:
+            errors.append(f'{decoder.name}: {e}')
+    raise Unsupported('; '.join(errors))
+
+
+def _oriented(data, max_size, orientation):
+    """Gömülü JPEG'i çözer; kendi EXIF yönü yoksa RAW'ın yönü (orientation) uygulanır."""
+    with Image.open(BytesIO(data)) as img:
+        own = img.getexif().get(ExifTags.Base.Orientation, 1)
+    img = thumbnails._load_image(BytesIO(data), max_size)
+    return img if own != 1 else thumbnails._apply_orientation(img, orientation)
+
+
+# --- rawpy ---
+
+# LibRaw flip -> EXIF yönü
+RAW_FLIP = {3: 3, 5: 8, 6: 6}
+
+
+def _rawpy(source, max_size):
+    with rawpy.imread(source) as raw:
+        try:
+            thumb = raw.extract_thumb()
+        except (rawpy.LibRawNoThumbnailError, rawpy.LibRawUnsupportedThumbnailError):
+            thumb = None
+        orientation = RAW_FLIP.get(raw.sizes.flip, 1)
+        if thumb is not None and thumb.format == rawpy.ThumbFormat.JPEG:
+            img = _oriented(thumb.data, max_size, orientation)
+            if max(img.size) >= max_size // 2:
+                return img
+        elif thumb is not None and max(thumb.data.shape[:2]) >= max_size // 2:
+            img = thumbnails._apply_orientation(Image.fromarray(thumb.data), orientation)
+            img.thumbnail((max_size, max_size))
+            return img.convert('RGB')
+        # Önizleme yok veya çok küçük: sensör verisini yarım çözünürlükte çöz (yön uygulanmış gelir)
+        img = Image.fromarray(raw.postprocess(half_size=True, use_camera_wb=True, output_bps=8))
+        img.thumbnail((max_size, max_size))
+        return img
+
+
+# --- Gömülü önizleme ---
+
+TIFF_MAGICS = (b'II*\x00', b'MM\x00*', b'IIRO', b'MMOR', b'IIU\x00')
+RAF_MAGIC = b'FUJIFILMCCD-RAW'
+TAG_COMPRESSION, TAG_PHOTOMETRIC, TAG_STRIP_OFFSETS, TAG_ORIENTATION, TAG_STRIP_BYTE_COUNTS = 259, 262, 273, 274, 279
+TAG_SUB_IFDS, TAG_JPEG_OFFSET, TAG_JPEG_LENGTH = 330, 0x0201, 0x0202
+# Ham sensör verisi (CFA / LinearRaw) JPEG gibi görünse de Pillow ile çözülemez
+RAW_PHOTOMETRIC = (32803, 34892)
+TYPE_SIZES = {3: 2, 4: 4, 13: 4}
+MAX_IFDS = 32
+
+
+def _values(f, endian, type_id, count, raw):
+    """SHORT / LONG / IFD türündeki etiket değerleri (diğer türler için boş liste)."""
+    size = TYPE_SIZES.get(type_id)
+    if size is None or not count or count > 1024:
+        return []
+    fmt = endian + ('H' if size == 2 else 'I') * count
+    if size * count <= 4:
+        return list(struct.unpack(fmt, raw[:size * count]))
+    pos = f.tell()
+    f.seek(struct.unpack(endian + 'I', raw)[0])
+    values = list(struct.unpack(fmt, f.read(size * count)))
+    f.seek(pos)
+    return values
+
+
+def _tiff_previews(f, endian):
+    """TIFF IFD'lerini (zincir ve SubIFD'ler) gezer: ([(ofset, uzunluk)], IFD0 yönü)."""
+    f.seek(4)
+    queue = [struct.unpack(endian + 'I', f.read(4))[0]]
+    seen = set()
+    candidates = []
+    orientation = None
+    while queue and len(seen) < MAX_IFDS:
+        offset = queue.pop(0)
+        if not offset or offset in seen:
+            continue
+        seen.add(offset)
+        f.seek(offset)
+        count = struct.unpack(endian + 'H', f.read(2))[0]
+        entries = f.read(12 * count)
+        tags = {}
+        for i in range(count):
+            tag, type_id, n, raw = struct.unpack(endian + 'HHI4s', entries[i * 12:i * 12 + 12])
+            tags[tag] = _values(f, endian, type_id, n, raw)
+        queue.append(struct.unpack(endian + 'I', f.read(4) or b'\0\0\0\0')[0])
+        queue.extend(tags.get(TAG_SUB_IFDS, []))
+
+        if orientation is None:
+            orientation = (tags.get(TAG_ORIENTATION) or [1])[0]
+        if tags.get(TAG_JPEG_OFFSET) and tags.get(TAG_JPEG_LENGTH):
+            candidates.append((tags[TAG_JPEG_OFFSET][0], tags[TAG_JPEG_LENGTH][0]))
+        strips, counts = tags.get(TAG_STRIP_OFFSETS, []), tags.get(TAG_STRIP_BYTE_COUNTS, [])
+        if (tags.get(TAG_COMPRESSION) in ([6], [7]) and len(strips) == 1 and len(counts) == 1
+                and (tags.get(TAG_PHOTOMETRIC) or [0])[0] not in RAW_PHOTOMETRIC):
+            candidates.append((strips[0], counts[0]))
+    return candidates, orientation or 1
+
+
+def _embedded(source, max_size):
+    head = source.read(92)
+    if head.startswith(RAF_MAGIC):
+        offset, length = struct.unpack('>II', head[84:92])
+        candidates, orientation = [(offset, length)], 1
+    elif head[:4] in TIFF_MAGICS:
+        candidates, orientation = _tiff_previews(source, '<' if head[:2] == b'II' else '>')
+    else:
+        raise Unsupported('gömülü önizleme bulunamadı')
+
+    # En büyük önizlemeden başla; kayıpsız JPEG (ham veri) gibi çözülemeyenler atlanır
+    for offset, length in sorted(set(candidates), key=lambda c: -c[1]):
+        source.seek(offset)
+        data = source.read(length)
+        if not data.startswith(b'\xff\xd8'):
+            continue
+        try:
+            return _oriented(data, max_size, orientation)
+        except DECODE_ERRORS:
+            continue
+    raise Unsupported('gömülü önizleme çözülemedi')
+
+
+if pillow_heif is not None:
+    register('heif', HEIF_EXTENSIONS, _pillow)
+if rawpy is not None:
+    register('rawpy', RAW_EXTENSIONS, _rawpy)
+register('embedded', RAW_EXTENSIONS, _embedded)
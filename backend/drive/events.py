@@ -0,0 +1,318 @@
+"""
+Değişiklik olayları (event bus).
+
+Olaylar artan bir sıra numarasıyla sınırlı bir tamponda tutulur. İstemciler son gördükleri
+imleçten sonrasını ister; imleç geçersizse ya da tampondan düştüyse reset=True döner
+ve istemci listeyi baştan yükler.
+
+    user_id=None ile yayınlanan olaylar (ör. paylaşılan klasör) tüm kullanıcılara gider.
+
+DRIVE_EVENTS_BACKEND:
+    'memory' -> süreç içi halka tampon, cursor = '<epoch>:<seq>'. Tek web süreci ve süreç içi
+                işler (DRIVE_TASK_BACKEND 'thread' / 'eager') için; başka süreçte yayınlanan olay görünmez.
+    'redis'  -> DRIVE_EVENTS_REDIS_URL'deki Redis stream'i (XADD / XREAD), cursor = stream id.
+                Celery worker'larında yayınlanan olaylar ve birden fazla web süreci aynı sırayı paylaşır.
+
+wait() bekleyen istemci başına bir thread tutar; ASGI altında wait_async() kullanılır.
+"""
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    import redis
+    import redis.asyncio as redis_async
+except ImportError:
+    redis = None
+
+EPOCH = uuid.uuid4().hex[:8]
+
+STREAM_KEY = 'drive:events'
+STREAM_PAGE = 500
+STREAM_ID_RE = re.compile(r'^(\d+)-(\d+)$')
+
+_cond = threading.Condition()
+_seq = 0
+_buffer = deque(maxlen=getattr(settings, 'DRIVE_EVENT_BUFFER', 10000))
+# wait_async ile bekleyenler: (event loop, asyncio.Event)
+_async_waiters = set()
+
+
+def _use_redis():
+    return getattr(settings, 'DRIVE_EVENTS_BACKEND', 'memory') == 'redis'
+
+
+def current_cursor():
+    if _use_redis():
+        return _stream_last(_redis_client())
+    return f'{EPOCH}:{_seq}'
+
+
+def publish(user_id, events):
+    """Olay listesini yayınlar ve bekleyen istemcileri uyandırır."""
+    global _seq
+    if not events:
+        return
+    user_id = str(user_id) if user_id is not None else None
+    if _use_redis():
+        return _redis_publish(user_id, events)
+    with _cond:
+        for event in events:
+            _seq += 1
+            _buffer.append((_seq, user_id, dict(event, seq=_seq)))
+        _cond.notify_all()
+        waiters = list(_async_waiters)
+    for loop, flag in waiters:
+        try:
+            loop.call_soon_threadsafe(flag.set)
+        except RuntimeError:
+            # Event loop kapanmış
+            pass
+
+
+def _parse_cursor(cursor):
+    """İmleçten seq'i döndürür; geçersiz / başka süreçten ise None."""
+    if not cursor:
+        return None
+    epoch, _, seq = cursor.partition(':')
+    if epoch != EPOCH or not seq.isdigit():
+        return None
+    return int(seq)
+
+
+def _collect(user_id, seq, limit):
+    events = []
+    for event_seq, owner, event in _buffer:
+        if event_seq > seq and (owner is None or owner == user_id):
+            events.append(event)
+            if len(events) >= limit:
+                break
+    return events
+
+
+def _has_new(user_id, seq):
+    for event_seq, owner, _ in reversed(_buffer):
+        if event_seq <= seq:
+            return False
+        if owner is None or owner == user_id:
+            return True
+    return False
+
+
+def read(user_id, cursor, limit=500):
+    """
+    İmleçten sonraki olayları döndürür: {'events', 'cursor', 'reset'}.
+    İmleç yoksa sadece güncel imleç döner (istemci buradan takip etmeye başlar).
+    """
+    user_id = str(user_id)
+    if _use_redis():
+        return _redis_read(_redis_client(), user_id, cursor, limit)
+    with _cond:
+        seq = _parse_cursor(cursor)
+        oldest = _buffer[0][0] if _buffer else _seq + 1
+        if seq is None or seq > _seq or seq < oldest - 1:
+            return {'events': [], 'cursor': current_cursor(), 'reset': bool(cursor)}
+        events = _collect(user_id, seq, limit)
+        last = events[-1]['seq'] if len(events) >= limit else _seq
+        return {'events': events, 'cursor': f'{EPOCH}:{last}', 'reset': False}
+
+
+def wait(user_id, cursor, timeout):
+    """
+    Yeni olay gelene veya süre dolana kadar bekler (long-poll), sonra read() sonucunu döndürür.
+    """
+    user_id = str(user_id)
+    if _use_redis():
+        return _redis_wait(user_id, cursor, timeout)
+    seq = _parse_cursor(cursor)
+    if seq is not None:
+        with _cond:
+            _cond.wait_for(lambda: seq > _seq or _has_new(user_id, seq), timeout=timeout)
+    return read(user_id, cursor)
+
+
+async def wait_async(user_id, cursor, timeout):
+    """wait()'in async sürümü: istemci event loop'ta bekler, thread tutmaz."""
+    user_id = str(user_id)
+    if _use_redis():
+        return await _redis_wait_async(user_id, cursor, timeout)
+    seq = _parse_cursor(cursor)
+    if seq is not None:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        deadline = time.monotonic() + timeout
+        # Kontrolden önce kaydolunur; arada gelen olay kaçmaz
+        with _cond:
+            _async_waiters.add(waiter)
+        try:
+            while True:
+                with _cond:
+                    if seq > _seq or _has_new(user_id, seq):
+                        break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                waiter[1].clear()
+        finally:
+            with _cond:
+                _async_waiters.discard(waiter)
+    return read(user_id, cursor)
+
+
+async def read_async(user_id, cursor, limit=500):
+    """read()'in async sürümü: Redis okuması event loop'u bloklamasın diye thread havuzunda yapılır."""
+    if not _use_redis():
+        return read(user_id, cursor, limit)
+    return await asyncio.get_running_loop().run_in_executor(None, read, user_id, cursor, limit)
+
+
+# --- Redis stream ---
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def _redis_url():
+    if redis is None:
+        raise ImproperlyConfigured("DRIVE_EVENTS_BACKEND='redis' için redis paketi kurulu olmalı")
+    return getattr(settings, 'DRIVE_EVENTS_REDIS_URL', '') or settings.CELERY_BROKER_URL
+
+
+def _redis_client():
+    global _redis
+    with _redis_lock:
+        if _redis is None:
+            _redis = redis.Redis.from_url(_redis_url(), decode_responses=True)
+        return _redis
+
+
+def _redis_async_client():
+    # Bağlantılar event loop'a bağlıdır; her bekleyen kendi istemcisini açıp kapatır
+    return redis_async.Redis.from_url(_redis_url(), decode_responses=True)
+
+
+def _buffer_size():
+    return getattr(settings, 'DRIVE_EVENT_BUFFER', 10000)
+
+
+def _redis_publish(user_id, events):
+    pipe = _redis_client().pipeline(transaction=False)
+    for event in events:
+        pipe.xadd(STREAM_KEY, {'user': user_id or '', 'event': json.dumps(event)},
+                  maxlen=_buffer_size(), approximate=True)
+    pipe.execute()
+
+
+def _stream_id(value):
+    match = STREAM_ID_RE.match(value or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _stream_last(client):
+    last = client.xrevrange(STREAM_KEY, count=1)
+    return last[0][0] if last else '0-0'
+
+
+def _stream_after(stream_id):
+    """XRANGE'in başlangıcı: stream_id'den hemen sonraki id (dahil)."""
+    ms, seq = _stream_id(stream_id)
+    return f'{ms}-{seq + 1}'
+
+
+def _stream_event(user_id, entry_id, fields):
+    """Kayıt bu kullanıcıya aitse olay, değilse None."""
+    owner = fields.get('user') or None
+    if owner is not None and owner != user_id:
+        return None
+    return dict(json.loads(fields['event']), seq=entry_id)
+
+
+def _stream_reset(cursor, last, oldest, length):
+    """İmleç geçersiz, stream'in ilerisinde ya da tamponun düşürdüğü kayıtların gerisindeyse True."""
+    position = _stream_id(cursor)
+    if position is None or position > _stream_id(last):
+        return True
+    # Stream hiç kırpılmadıysa en eskiden önceki imleç kayıp olay anlamına gelmez
+    return oldest is not None and position < _stream_id(oldest) and length >= _buffer_size()
+
+
+def _redis_read(client, user_id, cursor, limit):
+    last = _stream_last(client)
+    if not cursor:
+        return {'events': [], 'cursor': last, 'reset': False}
+    first = client.xrange(STREAM_KEY, count=1)
+    if _stream_reset(cursor, last, first[0][0] if first else None, client.xlen(STREAM_KEY)):
+        return {'events': [], 'cursor': last, 'reset': True}
+
+    events, position = [], cursor
+    while len(events) < limit:
+        entries = client.xrange(STREAM_KEY, min=_stream_after(position), count=STREAM_PAGE)
+        for entry_id, fields in entries:
+            position = entry_id
+            event = _stream_event(user_id, entry_id, fields)
+            if event is not None:
+                events.append(event)
+                if len(events) >= limit:
+                    break
+        if len(entries) < STREAM_PAGE:
+            break
+    return {'events': events, 'cursor': position, 'reset': False}
+
+
+def _has_own(user_id, response):
+    for _, entries in response or ():
+        for entry_id, fields in entries:
+            if _stream_event(user_id, entry_id, fields) is not None:
+                return True, entry_id
+        if entries:
+            return False, entries[-1][0]
+    return False, None
+
+
+def _redis_wait(user_id, cursor, timeout):
+    client = _redis_client()
+    if _stream_id(cursor) is not None:
+        deadline = time.monotonic() + timeout
+        position = cursor
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # block=0 sonsuz bekler; en az 1 ms
+            found, seen = _has_own(user_id, client.xread({STREAM_KEY: position}, count=STREAM_PAGE,
+                                                         block=max(int(remaining * 1000), 1)))
+            if found or seen is None:
+                break
+            position = seen
+    return _redis_read(client, user_id, cursor, 500)
+
+
+async def _redis_wait_async(user_id, cursor, timeout):
+    client = _redis_async_client()
+    try:
+        if _stream_id(cursor) is not None:
+            deadline = time.monotonic() + timeout
+            position = cursor
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                found, seen = _has_own(user_id, await client.xread(
+                    {STREAM_KEY: position}, count=STREAM_PAGE, block=max(int(remaining * 1000), 1),
+                ))
+                if found or seen is None:
+                    break
+                position = seen
+    finally:
+        await client.aclose()
+    return await read_async(user_id, cursor)
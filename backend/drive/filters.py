@@ -0,0 +1,19 @@
+import django_filters
+
+from .models import FileItem
+
+
+class FileItemFilter(django_filters.FilterSet):
+    """
+    /api/drive/files için sunucu tarafı filtreler.
+    Çöp kutusu filtresi (trash=true) FileItemViewSet.get_queryset içinde uygulanır.
+    """
+    name = django_filters.CharFilter(field_name='filename', lookup_expr='istartswith')
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+    taken_after = django_filters.IsoDateTimeFilter(field_name='taken_at', lookup_expr='gte')
+    taken_before = django_filters.IsoDateTimeFilter(field_name='taken_at', lookup_expr='lt')
+
+    class Meta:
+        model = FileItem
+        fields = ['file_type', 'is_favorite']
@@ -0,0 +1,132 @@
+"""
+İçerik özetleri (hash) ve tekrar eden dosyaların tespiti.
+
+Her dosya için SHA-256 (content_hash) ve MD5 (content_md5) tek geçişte hesaplanır.
+SHA-256 sunucu tarafı eşleştirme / hardlink için, MD5 ise dosyayı JS'e okumadan
+özet alabilen istemciler (expo-file-system getInfoAsync({ md5: true })) için tutulur.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import transaction
+
+HASH_BLOCK = 1024 * 1024
+# "Bunlar var mı?" isteğinde tek seferde kabul edilen en fazla özet
+MAX_HAVE_HASHES = 10000
+HASH_ALGORITHMS = {
+    'sha256': 'content_hash',
+    'md5': 'content_md5',
+}
+
+
+class ContentHasher:
+    """Akış halinde gelen veriden iki özeti birlikte hesaplar."""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.md5 = hashlib.md5()
+        self.size = 0
+
+    def update(self, data):
+        self.sha256.update(data)
+        self.md5.update(data)
+        self.size += len(data)
+
+    def copy(self):
+        other = ContentHasher.__new__(ContentHasher)
+        other.sha256, other.md5, other.size = self.sha256.copy(), self.md5.copy(), self.size
+        return other
+
+    def hexdigests(self):
+        return self.sha256.hexdigest(), self.md5.hexdigest()
+
+
+def hash_stream(stream):
+    """Dosya benzeri nesnenin özetlerini döndürür (Django UploadedFile için chunks() kullanılır)."""
+    hasher = ContentHasher()
+    if hasattr(stream, 'chunks'):
+        blocks = stream.chunks(HASH_BLOCK)
+    else:
+        blocks = iter(lambda: stream.read(HASH_BLOCK), b'')
+    for block in blocks:
+        hasher.update(block)
+    return hasher.hexdigests()
+
+
+def hash_file(path):
+    with open(path, 'rb') as f:
+        return hash_stream(f)
+
+
+def hash_stored(name):
+    """Depodaki (bkz. storage) dosyanın özetleri."""
+    from .storage import files
+
+    with files().open(name) as f:
+        return hash_stream(f)
+
+
+def hash_items(item_ids):
+    """Arka plan işi: özeti olmayan dosyaların özetlerini hesaplar."""
+    from . import journal
+    from .models import FileItem
+
+    items = list(FileItem.objects.filter(pk__in=item_ids, content_hash=''))
+    for item in items:
+        try:
+            item.content_hash, item.content_md5 = hash_stored(item.file.name)
+        except OSError:
+            continue
+    hashed = [i for i in items if i.content_hash]
+    with transaction.atomic():
+        FileItem.objects.bulk_update(hashed, ['content_hash', 'content_md5'], batch_size=500)
+        # İstemci katalogları özetleri de alsın (yükleme öncesi tekrar kontrolü)
+        journal.record(hashed, 'update')
+
+
+def schedule_hashing(items, batch_size=200):
+    from .tasks import enqueue
+
+    ids = [str(item.pk) for item in items if not item.content_hash]
+    for i in range(0, len(ids), batch_size):
+        enqueue('drive.hashing.hash_items', ids[i:i + batch_size])
+
+
+def find_existing(user, hashes, algorithm='sha256'):
+    """Kullanıcıda zaten bulunan özetleri {özet: dosya id} olarak döndürür."""
+    from .models import FileItem
+
+    field = HASH_ALGORITHMS[algorithm]
+    hashes = list({h.lower() for h in hashes if isinstance(h, str)})
+    found = {}
+    for i in range(0, len(hashes), 500):
+        rows = FileItem.objects.filter(user=user, **{f'{field}__in': hashes[i:i + 500]}).values_list(field, 'id')
+        for digest, item_id in rows:
+            found.setdefault(digest, item_id)
+    return found
+
+
+def link_duplicate(user, sha256, staging_path):
+    """
+    Aynı içerik kullanıcıda zaten varsa yeni dosyayı mevcut dosyaya hardlink yapar (DRIVE_DEDUP_HARDLINKS).
+    Başarılı olursa True; geçici dosyanın yerini aynı inode'a bağlı bir bağlantı alır. Sadece yerel depoda.
+    """
+    from .models import FileItem
+    from .storage import files
+
+    storage = files()
+    if not getattr(settings, 'DRIVE_DEDUP_HARDLINKS', False) or not storage.is_local:
+        return False
+    for name in FileItem.objects.filter(user=user, content_hash=sha256).values_list('file', flat=True)[:5]:
+        existing = storage.path(name)
+        try:
+            if os.stat(existing).st_dev != os.stat(staging_path).st_dev:
+                continue
+            tmp = staging_path + '.link'
+            os.link(existing, tmp)
+            os.replace(tmp, staging_path)
+            return True
+        except OSError:
+            continue
+    return False
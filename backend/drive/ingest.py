@@ -0,0 +1,127 @@
+"""
+Multipart yüklemede dosyanın hedefe kopyasız yazılması.
+
+Varsayılan yolda dosya önce geçici dosyaya (MultiPartParser), sonra hedefe kopyalanır, özet için
+bir kez daha okunur. IngestUploadHandler 'file' alanını ayrıştırılırken doğrudan kullanıcının
+deposundaki .uploads klasörüne yazar; aynı geçişte özet (SHA-256 / MD5), boyut ve ilk baytlardan
+MIME türü (metadata.sniff) hesaplanır. file_type istemcinin gönderdiği değil içerikten çıkan türdür.
+
+WSGI'de gövde soketten okunurken ayrıştırılır, dosya bir kez yazılır. ASGI'de (uvicorn) Django
+gövdeyi view'dan önce tamamen biriktirir (FILE_UPLOAD_MAX_MEMORY_SIZE'dan büyükse geçici dosyaya):
+40 MB'lık yüklemede gövde bir kez biriktirme dosyasına yazılıp okunur, bir kez de .uploads'a yazılır
+(WSGI'de sadece .uploads'a). Büyük dosyalar için parça yükleme (uploads) kullanılmalı.
+
+IngestedFile.temporary_file_path() sayesinde FileSystemStorage dosyayı kopyalamak yerine yeniden
+adlandırır (aynı disk). S3 deposunda geçici dosya DRIVE_STAGING_ROOT'tadır ve kayıtta yüklenir.
+Kayıt tamamlanmazsa (doğrulama hatası, kesilen istek) geçici dosya istek sonunda silinir.
+
+    request.upload_handlers.insert(0, ingest.IngestUploadHandler(request))
+"""
+import os
+import posixpath
+import uuid
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from . import hashing, metadata, storage
+from .uploads import STAGING_FOLDER
+
+FIELD_NAME = 'file'
+
+
+class IngestedFile(UploadedFile):
+    """Handler'ın yazdığı dosya ve yazılırken hesaplanan bilgiler."""
+
+    _file = None
+
+    def __init__(self, path, name, content_type, size, charset, content_type_extra, hasher, mime_type, mtime_ns):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.path = path
+        self.content_hash, self.content_md5 = hasher.hexdigests()
+        self.mime_type = mime_type
+        self.mtime_ns = mtime_ns
+
+    # Okuma için sadece gerekirse (S3'e yükleme) açılır; yerelde açık dosya taşınmaz
+    @property
+    def file(self):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        return self._file
+
+    @file.setter
+    def file(self, value):
+        self._file = value
+
+    def temporary_file_path(self):
+        return self.path
+
+    def item_fields(self):
+        """FileItem'a yazılacak alanlar."""
+        return {
+            'file_type': metadata.file_type_for(self.mime_type),
+            'mime_type': self.mime_type,
+            'content_hash': self.content_hash,
+            'content_md5': self.content_md5,
+            'mtime_ns': self.mtime_ns,
+        }
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        # Yerinde taşındıysa dosya artık yok
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class IngestUploadHandler(FileUploadHandler):
+    """'file' alanını kendisi yazar; diğer dosya alanlarını sıradaki handler'lara bırakır."""
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.user = request.user
+        self.target = None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.target = None
+        if field_name != FIELD_NAME:
+            return
+        name = posixpath.join(self.user.get_user_folder(), STAGING_FOLDER, f'{uuid.uuid4()}.part')
+        path = storage.files().staging_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.target = open(path, 'wb')
+        self.hasher = hashing.ContentHasher()
+        self.head = b''
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.target is None:
+            return raw_data
+        if len(self.head) < metadata.SNIFF_BYTES:
+            self.head += raw_data[:metadata.SNIFF_BYTES - len(self.head)]
+        self.hasher.update(raw_data)
+        self.target.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.target is None:
+            return None
+        self.target.flush()
+        # Rename mtime'ı korur; eşitleme dosyayı değişmiş saymasın
+        mtime_ns = os.fstat(self.target.fileno()).st_mtime_ns
+        self.target.close()
+        upload = IngestedFile(
+            self.target.name, self.file_name, self.content_type, file_size, self.charset,
+            self.content_type_extra, self.hasher, metadata.sniff(self.head, self.file_name), mtime_ns,
+        )
+        self.target = None
+        return upload
+
+    def upload_interrupted(self):
+        if self.target is not None:
+            self.target.close()
+            os.remove(self.target.name)
+            self.target = None
@@ -0,0 +1,146 @@
+"""
+Değişiklik günlüğü (ChangeJournal) ve delta eşitleme.
+
+Dosya değiştiren her yol (yükleme, favori, çöp, geri yükleme, silme, kopyalama, toplu işlem,
+dosya sistemi eşitlemesi) record() ile günlüğe yazar. İstemci /api/drive/files/changes?since=<token>
+ile sadece son token'dan sonraki değişiklikleri alır; aynı dosyanın ardışık değişiklikleri
+tek kayda indirgenir. Günlük DRIVE_CHANGES_RETENTION_DAYS gün tutulur; daha eski bir token
+ile gelen istemciye reset=True döner ve istemci listeyi baştan yükler.
+
+    token = '<son id>.<token üretim zamanı (unix sn)>'
+
+id'ler commit sırasıyla değil satır eklenirken verilir (Postgres): N+1 commit edilmişken N henüz
+commit edilmemiş olabilir. Token bu yüzden son DRIVE_CHANGES_COMMIT_GRACE saniyede yazılan kayıtların
+önünde durur; o kayıtlar bir sonraki istekte verilir.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import events, search, usage
+from .models import ChangeJournal
+
+BATCH_SIZE = 500
+
+
+def retention_days():
+    return getattr(settings, 'DRIVE_CHANGES_RETENTION_DAYS', 30)
+
+
+def commit_grace():
+    return timedelta(seconds=getattr(settings, 'DRIVE_CHANGES_COMMIT_GRACE', 5))
+
+
+def snapshot(item):
+    """Dosyanın istemcinin listesini güncellemesine yetecek özeti."""
+    return {
+        'filename': item.filename,
+        'file_type': item.file_type,
+        'size': item.size,
+        'is_favorite': item.is_favorite,
+        'trashed_at': item.trashed_at.isoformat() if item.trashed_at else None,
+        'content_hash': item.content_hash,
+        'content_md5': item.content_md5,
+        'created_at': item.created_at.isoformat() if item.created_at else None,
+    }
+
+
+def entry(item, op):
+    change = ChangeJournal(
+        user_id=item.user_id, item_id=item.pk, op=op,
+        data={} if op == 'delete' else snapshot(item),
+    )
+    # Kaydedilmez; record_entries kullanım sayaçlarını bununla günceller
+    change.usage = usage.delta(item, op)
+    return change
+
+
+def record(items, op):
+    """Aynı işlemi gören dosyaları günlüğe yazar."""
+    record_entries([entry(item, op) for item in items])
+
+
+def record_entries(entries):
+    """
+    Günlük kayıtlarını toplu yazar, arama dizinini ve kullanım sayaçlarını (usage) günceller.
+    Çağıranın transaction'ı içindeyse onunla birlikte kalıcı olur; bekleyen istemciler commit sonrası uyandırılır.
+    """
+    if not entries:
+        return
+    ChangeJournal.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    search.index_changes(entries)
+    usage.apply(entries)
+    by_user = {}
+    for change in entries:
+        by_user.setdefault(change.user_id, []).append({'op': change.op, 'id': str(change.item_id)})
+
+    def notify():
+        for user_id, user_events in by_user.items():
+            events.publish(user_id, user_events)
+    transaction.on_commit(notify)
+
+
+def make_token(last_id):
+    return f'{last_id}.{int(time.time())}'
+
+
+def parse_token(token):
+    """Token'dan son id'yi döndürür; geçersiz veya saklama süresinden eskiyse None."""
+    try:
+        last_id, issued = (int(part) for part in token.split('.', 1))
+    except (AttributeError, ValueError):
+        return None
+    if issued < time.time() - retention_days() * 86400:
+        return None
+    return last_id
+
+
+def changes_since(user, token, limit=1000):
+    """
+    {'changes', 'token', 'has_more', 'reset'} döndürür.
+    Token yoksa / geçersizse reset=True ve güncel token döner (istemci tam listeyi çekip buradan devam eder).
+    """
+    since = parse_token(token)
+    watermark = timezone.now() - commit_grace()
+    if since is None:
+        # Tam listeyle birlikte verilir; bekletilen kayıtlar sonraki istekte tekrar gelir (özetler tekrar uygulanabilir)
+        qs = ChangeJournal.objects.filter(user=user)
+        pending = qs.filter(created_at__gt=watermark).order_by('id').values_list('id', flat=True).first()
+        last = pending - 1 if pending else qs.order_by('-id').values_list('id', flat=True).first()
+        return {'changes': [], 'token': make_token(last or 0), 'has_more': False, 'reset': True}
+
+    rows = list(
+        ChangeJournal.objects.filter(user=user, id__gt=since).order_by('id')
+        .values_list('id', 'item_id', 'op', 'data', 'created_at')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # İlk yeni kayıtta durulur; arkasındaki id'ler daha küçük commit edilmemiş id'leri atlatabilir
+    for index, row in enumerate(rows):
+        if row[4] > watermark:
+            rows, has_more = rows[:index], False
+            break
+
+    # Aynı dosyanın değişikliklerinden sonuncusu yeterli (oluşturulup silindiyse sadece silme)
+    latest = {}
+    for change_id, item_id, op, data, _ in rows:
+        latest.pop(item_id, None)
+        latest[item_id] = (op, data)
+    changes = [dict(data, id=str(item_id), op=op) for item_id, (op, data) in latest.items()]
+    return {
+        'changes': changes,
+        'token': make_token(rows[-1][0] if rows else since),
+        'has_more': has_more,
+        'reset': False,
+    }
+
+
+def prune(user=None):
+    """Saklama süresini geçen günlük kayıtlarını siler."""
+    qs = ChangeJournal.objects.filter(created_at__lt=timezone.now() - timedelta(days=retention_days()))
+    if user is not None:
+        qs = qs.filter(user=user)
+    qs.delete()
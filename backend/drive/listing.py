@@ -0,0 +1,124 @@
+"""
+Klasör listeleme (BrowseFilesystemView / BrowseSharedView).
+
+os.scandir ile tek geçişte okunur: klasör / dosya ayrımı DirEntry'nin önbelleğinden gelir,
+dosya başına en fazla bir stat yapılır. Listeler süreç içi LRU önbellekte klasörün
+mtime'ı ile birlikte tutulur; klasöre dosya eklenip silinmediyse tekrar taranmaz.
+(Mevcut bir dosyanın yerinde değişmesi klasör mtime'ını değiştirmez; boyut / tarih bir
+sonraki ekleme-silmeye kadar eski kalabilir.)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Uzantı -> tip (if/elif zinciri yerine tek sözlük araması)
+FILE_TYPE_EXTENSIONS = {
+    'image': ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'),
+    'video': ('.mp4', '.avi', '.mov', '.mkv', '.webm'),
+    'pdf': ('.pdf',),
+    'document': ('.doc', '.docx', '.txt', '.rtf'),
+    'archive': ('.zip', '.rar', '.7z', '.tar', '.gz'),
+}
+EXTENSION_MAP = {ext: kind for kind, exts in FILE_TYPE_EXTENSIONS.items() for ext in exts}
+
+SORT_FIELDS = ('name', 'size', 'modified')
+# Dosya sistemi zaman damgası çözünürlüğü: bu kadar yeni değişen klasör önbelleğe alınmaz
+RACY_WINDOW_NS = 2_000_000_000
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def cache_size():
+    return getattr(settings, 'DRIVE_LISTING_CACHE_SIZE', 256)
+
+
+def file_type(name):
+    return EXTENSION_MAP.get(os.path.splitext(name)[1].lower(), 'file')
+
+
+def _scan(path):
+    """Klasör içeriğini (isim, klasör mü, boyut, mtime) listesi olarak okur. Gizli (.) girdiler atlanır."""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir():
+                    entries.append((entry.name, True, 0, 0))
+                    continue
+                st = entry.stat()
+                entries.append((entry.name, False, st.st_size, st.st_mtime))
+            except OSError:
+                entries.append((entry.name, False, 0, 0))
+    return entries
+
+
+def _sort_key(field):
+    if field == 'size':
+        return lambda e: (not e[1], e[2], e[0].lower())
+    if field == 'modified':
+        return lambda e: (not e[1], e[3], e[0].lower())
+    return lambda e: (not e[1], e[0].lower())
+
+
+def list_directory(path, sort='name', reverse=False):
+    """
+    Klasörün sıralanmış içeriğini döndürür; klasörler her zaman önce gelir.
+    Sonuç (ve her sıralama) klasörün mtime'ı değişene kadar önbellekte kalır.
+    """
+    path = os.fspath(path)
+    st = os.stat(path)
+    key = (sort, reverse)
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached['mtime_ns'] == st.st_mtime_ns:
+            _cache.move_to_end(path)
+            if key in cached['sorted']:
+                return cached['sorted'][key]
+            entries = cached['entries']
+        else:
+            entries = None
+
+    if entries is None:
+        entries = _scan(path)
+    ordered = sorted(entries, key=_sort_key(sort))
+    if reverse:
+        # Klasörler önde kalsın
+        dirs = [e for e in ordered if e[1]]
+        ordered = dirs[::-1] + [e for e in ordered if not e[1]][::-1]
+
+    if st.st_mtime_ns < time.time_ns() - RACY_WINDOW_NS:
+        with _lock:
+            cached = _cache.get(path)
+            if cached is None or cached['mtime_ns'] != st.st_mtime_ns:
+                cached = {'mtime_ns': st.st_mtime_ns, 'entries': entries, 'sorted': {}}
+                _cache[path] = cached
+            cached['sorted'][key] = ordered
+            _cache.move_to_end(path)
+            while len(_cache) > cache_size():
+                _cache.popitem(last=False)
+    return ordered
+
+
+def invalidate(path):
+    with _lock:
+        _cache.pop(os.fspath(path), None)
+
+
+def serialize(entries, rel_dir):
+    """Liste girdilerini API biçimine çevirir."""
+    prefix = f'{rel_dir}/' if rel_dir else ''
+    items = []
+    for name, is_dir, size, modified in entries:
+        item_info = {'name': name, 'is_dir': is_dir, 'path': prefix + name}
+        if not is_dir:
+            item_info['size'] = size
+            item_info['modified'] = modified
+            item_info['type'] = file_type(name)
+        items.append(item_info)
+    return items
@@ -0,0 +1,97 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from drive import decoders, thumbnails
+
+
+def _build(task):
+    """Worker süreci: tek dosyanın küçük resimlerini üretir (veritabanına dokunmaz)."""
+    item_id, name = task
+    try:
+        return thumbnails.build_all(item_id, name), None
+    except (FileNotFoundError, decoders.Unsupported):
+        return 0, None
+    except Exception as e:
+        return 0, f'{item_id}: {e}'
+
+
+class Command(BaseCommand):
+    help = 'Mevcut fotoğrafların küçük resimlerini paralel olarak önceden üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Paralel süreç sayısı')
+        parser.add_argument('--user', help='Sadece bu kullanıcı klasörü (user_folder)')
+        parser.add_argument('--resume', action='store_true', help='Son kayıtlı noktadan devam et')
+        parser.add_argument('--batch', type=int, default=500, help='Veritabanından bir seferde okunacak kayıt')
+
+    def handle(self, *args, **options):
+        # Modül seviyesinde değil: spawn ile başlayan worker'lar (Windows) bu modülü django.setup() öncesi import eder
+        from drive.models import FileItem
+
+        state_file = os.path.join(thumbnails.cache_root(), '.build_thumbnails.json')
+        qs = FileItem.objects.filter(file_type='PHOTO').order_by('created_at', 'id')
+        if options['user']:
+            qs = qs.filter(user__user_folder=options['user'])
+
+        # Checkpoint: en son tamamlanan kaydın (created_at, id) konumu
+        if options['resume'] and os.path.exists(state_file):
+            with open(state_file) as f:
+                state = json.load(f)
+            last_created, last_id = parse_datetime(state['created_at']), state['id']
+            qs = qs.filter(Q(created_at__gt=last_created) | Q(created_at=last_created, id__gt=last_id))
+            self.stdout.write(f'Kaldığı yerden devam: {state["created_at"]} / {last_id}')
+
+        total = qs.count()
+        self.stdout.write(f'{total} fotoğraf işlenecek ({options["workers"]} süreç)')
+        if not total:
+            return
+
+        # Fork edilen süreçler açık veritabanı bağlantısını paylaşmasın
+        connections.close_all()
+        done = generated = 0
+        errors = []
+        started = time.monotonic()
+        cursor = None
+        # Fork edilmeyen (spawn) worker'larda uygulama kaydı boş başlar
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as pool:
+            while True:
+                page = qs
+                if cursor:
+                    page = page.filter(Q(created_at__gt=cursor[0]) | Q(created_at=cursor[0], id__gt=cursor[1]))
+                rows = list(page.values_list('id', 'file', 'created_at')[:options['batch']])
+                if not rows:
+                    break
+                tasks = [(str(item_id), name) for item_id, name, _ in rows]
+                for count, error in pool.map(_build, tasks, chunksize=8):
+                    generated += count
+                    if error:
+                        errors.append(error)
+                done += len(rows)
+                cursor = (rows[-1][2], rows[-1][0])
+                self._save_state(state_file, cursor)
+
+                elapsed = time.monotonic() - started
+                rate = done / elapsed if elapsed else 0
+                eta = (total - done) / rate if rate else 0
+                self.stdout.write(f'  {done}/{total} ({rate:.1f}/sn, kalan ~{eta:.0f} sn)')
+
+        for error in errors[:20]:
+            self.stdout.write(self.style.WARNING(f'  ⚠ {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {done} fotoğraf işlendi, {generated} küçük resim üretildi, {len(errors)} hata'
+        ))
+
+    def _save_state(self, state_file, cursor):
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        tmp = state_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'created_at': cursor[0].isoformat(), 'id': str(cursor[1])}, f)
+        os.replace(tmp, state_file)
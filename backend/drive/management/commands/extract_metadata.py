@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from drive import metadata
+from drive.models import FileItem
+
+
+class Command(BaseCommand):
+    help = 'Mevcut dosyaların MIME türünü ve EXIF bilgilerini (çekim zamanı, boyut, kamera, GPS) okur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Sadece bu kullanıcı klasörü (user_folder)')
+        parser.add_argument('--all', action='store_true', help='Daha önce okunmuş dosyaları da yeniden oku')
+        parser.add_argument('--batch', type=int, default=500, help='Bir seferde işlenecek kayıt')
+
+    def handle(self, *args, **options):
+        qs = FileItem.objects.order_by('created_at', 'id')
+        if options['user']:
+            qs = qs.filter(user__user_folder=options['user'])
+        if not options['all']:
+            # mime_type boşsa dosya henüz hiç okunmamıştır
+            qs = qs.filter(mime_type='')
+
+        total = qs.count()
+        self.stdout.write(f'{total} dosya işlenecek')
+        done = updated = 0
+        started = time.monotonic()
+        cursor = None
+        while True:
+            page = qs
+            if cursor:
+                page = page.filter(Q(created_at__gt=cursor[0]) | Q(created_at=cursor[0], id__gt=cursor[1]))
+            rows = list(page.values_list('id', 'created_at')[:options['batch']])
+            if not rows:
+                break
+            updated += metadata.extract_items([item_id for item_id, _ in rows])
+            done += len(rows)
+            cursor = (rows[-1][1], rows[-1][0])
+
+            elapsed = time.monotonic() - started
+            rate = done / elapsed if elapsed else 0
+            self.stdout.write(f'  {done}/{total} ({rate:.1f}/sn)')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ {done} dosya işlendi, {updated} dosyanın metadata\'sı kaydedildi'))
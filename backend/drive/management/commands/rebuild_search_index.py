@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from drive import search
+from drive.models import FileItem, Note, SearchDocument
+
+
+class Command(BaseCommand):
+    help = 'Arama dizinini (dosya adları ve notlar) veritabanından baştan oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Sadece bu kullanıcı klasörü (user_folder)')
+        parser.add_argument('--batch', type=int, default=2000, help='Bir seferde dizinlenecek kayıt')
+
+    def handle(self, *args, **options):
+        files = FileItem.objects.filter(trashed_at__isnull=True).only('id', 'user_id', 'filename', 'trashed_at')
+        notes = Note.objects.only('id', 'user_id', 'title', 'content')
+        documents = SearchDocument.objects.all()
+        if options['user']:
+            files = files.filter(user__user_folder=options['user'])
+            notes = notes.filter(user__user_folder=options['user'])
+            documents = documents.filter(user__user_folder=options['user'])
+
+        with transaction.atomic():
+            removed, _ = documents.delete()
+            file_count = self._index(files.order_by('pk'), search.index_files, options['batch'])
+            note_count = self._index(notes.order_by('pk'), search.index_notes, options['batch'])
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {removed} eski kayıt silindi, {file_count} dosya ve {note_count} not dizinlendi'
+        ))
+
+    def _index(self, qs, index, batch):
+        count = 0
+        batch_items = []
+        for obj in qs.iterator(chunk_size=batch):
+            batch_items.append(obj)
+            if len(batch_items) >= batch:
+                index(batch_items)
+                count += len(batch_items)
+                batch_items = []
+        if batch_items:
+            index(batch_items)
+            count += len(batch_items)
+        return count
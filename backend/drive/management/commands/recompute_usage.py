@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from drive import usage
+
+
+def _recompute(user_id, verify):
+    """Worker thread'i: tek kullanıcının özetini hesaplar (kendi veritabanı bağlantısıyla)."""
+    try:
+        fixed = usage.verify_sizes(user_id) if verify else 0
+        return usage.recompute(user_id), fixed, None
+    except Exception as e:
+        return None, 0, f'{user_id}: {e}'
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Kullanıcıların depolama kullanım özetini (StorageUsage) dosya kayıtlarından paralel olarak yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Paralel thread sayısı')
+        parser.add_argument('--user', help='Sadece bu kullanıcı klasörü (user_folder)')
+        parser.add_argument('--verify-sizes', action='store_true',
+                            help='Kayıtlı boyutları depodaki dosyalarla karşılaştır ve düzelt (yavaş)')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['user']:
+            users = users.filter(user_folder=options['user'])
+        user_ids = list(users.values_list('pk', flat=True))
+        self.stdout.write(f'{len(user_ids)} kullanıcı işlenecek ({options["workers"]} thread)')
+
+        done = fixed_total = 0
+        errors = []
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = pool.map(lambda user_id: _recompute(user_id, options['verify_sizes']), user_ids)
+            for user_id, (result, fixed, error) in zip(user_ids, results):
+                done += 1
+                fixed_total += fixed
+                if error:
+                    errors.append(error)
+                    continue
+                self.stdout.write(
+                    f'  {user_id}: {result.used_bytes} bayt, {result.file_count + result.photo_count} dosya, '
+                    f'{result.trash_count} çöpte' + (f', {fixed} boyut düzeltildi' if fixed else '')
+                )
+
+        elapsed = time.monotonic() - started
+        for error in errors[:20]:
+            self.stderr.write(f'  Hata: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {done} kullanıcı {elapsed:.1f} sn\'de hesaplandı, {fixed_total} boyut düzeltildi, {len(errors)} hata'
+        ))
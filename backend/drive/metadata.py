@@ -0,0 +1,254 @@
+"""
+Dosya metadata'sının (MIME türü, EXIF) okunması.
+
+Yükleme, kopyalama ve dosya sistemi eşitlemesinden sonra arka planda çalışır:
+mime_type içerikten (PIL biçimi, yoksa ilk baytlar, o da yoksa uzantı) doldurulur; fotoğraflarda çekim zamanı
+FileItem.taken_at'e, boyut / yön / kamera / GPS MediaMetadata'ya yazılır.
+Image.open sadece başlığı okur; piksel verisi çözülmez.
+
+Saat dilimi bilgisi olmayan EXIF zamanları DRIVE_LOCAL_TIMEZONE'da kabul edilir.
+"""
+import logging
+import math
+import mimetypes
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from PIL import ExifTags, Image, UnidentifiedImageError
+
+# pillow-heif kuruluysa HEIC açıcısı Pillow'a kaydedilir (EXIF okunabilsin)
+from . import decoders  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIME_TYPE = 'application/octet-stream'
+BATCH_SIZE = 500
+
+# İlk baytlardaki imzalar: (ofset, imza, MIME). RIFF ve ISO BMFF (ftyp) ayrıca çözülür.
+SNIFF_BYTES = 64
+SIGNATURES = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (0, b'BM', 'image/bmp'),
+    (0, b'II*\x00', 'image/tiff'),
+    (0, b'MM\x00*', 'image/tiff'),
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'PK\x03\x04', 'application/zip'),
+    (0, b'\x1f\x8b', 'application/gzip'),
+    (0, b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (0, b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'fLaC', 'audio/flac'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'\x1aE\xdf\xa3', 'video/x-matroska'),
+    (0, b'IIRO', 'image/tiff'),
+    (0, b'IIU\x00', 'image/tiff'),
+    (0, b'FUJIFILMCCD-RAW', 'image/x-fuji-raf'),
+)
+RIFF_TYPES = {b'WEBP': 'image/webp', b'WAVE': 'audio/wav', b'AVI ': 'video/x-msvideo'}
+FTYP_BRANDS = {
+    b'heic': 'image/heic', b'heix': 'image/heic', b'mif1': 'image/heif', b'msf1': 'image/heif',
+    b'avif': 'image/avif', b'qt  ': 'video/quicktime', b'M4A ': 'audio/mp4', b'crx ': 'image/x-canon-cr3',
+}
+# Kamera RAW biçimleri; çoğu TIFF tabanlıdır, imzadan değil uzantıdan ayırt edilir
+RAW_MIME_TYPES = {
+    '.dng': 'image/x-adobe-dng', '.arw': 'image/x-sony-arw', '.srf': 'image/x-sony-srf', '.sr2': 'image/x-sony-sr2',
+    '.cr2': 'image/x-canon-cr2', '.cr3': 'image/x-canon-cr3', '.nef': 'image/x-nikon-nef', '.nrw': 'image/x-nikon-nrw',
+    '.orf': 'image/x-olympus-orf', '.rw2': 'image/x-panasonic-rw2', '.pef': 'image/x-pentax-pef',
+    '.raf': 'image/x-fuji-raf', '.srw': 'image/x-samsung-srw', '.erf': 'image/x-epson-erf',
+    '.3fr': 'image/x-hasselblad-3fr',
+}
+for _ext, _mime in RAW_MIME_TYPES.items():
+    mimetypes.add_type(_mime, _ext)
+# Galeriye (Fotograflar) giden türler
+PHOTO_MIME_TYPES = {
+    'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/heic', 'image/heif', *RAW_MIME_TYPES.values(),
+}
+
+# EXIF etiketleri
+TAG_DATETIME = 0x0132
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_DATETIME_DIGITIZED = 0x9004
+TAG_OFFSET_TIME_ORIGINAL = 0x9011
+GPS_LATITUDE_REF, GPS_LATITUDE, GPS_LONGITUDE_REF, GPS_LONGITUDE = 1, 2, 3, 4
+
+
+def local_timezone():
+    try:
+        return ZoneInfo(getattr(settings, 'DRIVE_LOCAL_TIMEZONE', settings.TIME_ZONE))
+    except (ZoneInfoNotFoundError, ValueError):
+        return dt_timezone.utc
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'ignore')
+    return str(value or '').strip('\x00 ').strip()
+
+
+def _parse_offset(value):
+    """'+03:00' -> timezone"""
+    value = _text(value)
+    if len(value) != 6 or value[0] not in '+-' or value[3] != ':':
+        return None
+    try:
+        delta = timedelta(hours=int(value[1:3]), minutes=int(value[4:6]))
+    except ValueError:
+        return None
+    return dt_timezone(-delta if value[0] == '-' else delta)
+
+
+def _parse_datetime(value, offset=None):
+    """EXIF 'YYYY:MM:DD HH:MM:SS' -> aware datetime (geçersiz / sıfır tarih için None)"""
+    try:
+        taken = datetime.strptime(_text(value)[:19], '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None
+    return taken.replace(tzinfo=_parse_offset(offset) or local_timezone())
+
+
+def _gps_coordinate(value, ref):
+    """(derece, dakika, saniye) rasyonelleri -> ondalık derece"""
+    try:
+        degrees, minutes, seconds = (float(v) for v in value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    result = degrees + minutes / 60 + seconds / 3600
+    if not math.isfinite(result):
+        return None
+    return -result if _text(ref).upper() in ('S', 'W') else result
+
+
+def _gps(exif):
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    if not gps:
+        return None, None
+    latitude = _gps_coordinate(gps.get(GPS_LATITUDE), gps.get(GPS_LATITUDE_REF))
+    longitude = _gps_coordinate(gps.get(GPS_LONGITUDE), gps.get(GPS_LONGITUDE_REF))
+    if latitude is None or longitude is None or abs(latitude) > 90 or abs(longitude) > 180:
+        return None, None
+    # Konumu kapalı cihazların yazdığı 0,0
+    if latitude == 0 and longitude == 0:
+        return None, None
+    return latitude, longitude
+
+
+def sniff(head, filename=''):
+    """İlk baytlardan (en az SNIFF_BYTES) MIME türü; imza tanınmazsa uzantıdan, o da yoksa DEFAULT_MIME_TYPE."""
+    guessed = mimetypes.guess_type(filename)[0] if filename else None
+    for offset, signature, mime in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            # docx / xlsx / apk ... zip tabanlı biçimler uzantıdan ayırt edilir
+            if mime == 'application/zip' and guessed and guessed.startswith('application/'):
+                return guessed
+            if mime == 'image/tiff' and guessed in RAW_MIME_TYPES.values():
+                return guessed
+            return mime
+    if head[:4] == b'RIFF' and head[8:12] in RIFF_TYPES:
+        return RIFF_TYPES[head[8:12]]
+    if head[4:8] == b'ftyp':
+        return FTYP_BRANDS.get(head[8:12], 'video/mp4')
+    return guessed or DEFAULT_MIME_TYPE
+
+
+def file_type_for(mime_type):
+    return 'PHOTO' if mime_type in PHOTO_MIME_TYPES else 'FILE'
+
+
+def _read_head(source):
+    if hasattr(source, 'read'):
+        source.seek(0)
+        head = source.read(SNIFF_BYTES)
+        source.seek(0)
+        return head
+    with open(source, 'rb') as f:
+        return f.read(SNIFF_BYTES)
+
+
+def extract(path, filename=''):
+    """
+    Dosyanın (yol veya açık dosya) metadata'sını döndürür:
+    {'mime_type', 'taken_at', 'image': {width, height, orientation, camera_make, camera_model,
+    latitude, longitude} veya resim değilse None}
+    """
+    filename = filename or str(getattr(path, 'name', path))
+    try:
+        img = Image.open(path)
+    except (UnidentifiedImageError, ValueError):
+        return {'mime_type': sniff(_read_head(path), filename), 'taken_at': None, 'image': None}
+
+    with img:
+        exif = img.getexif()
+        exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+        taken_at = (
+            _parse_datetime(exif_ifd.get(TAG_DATETIME_ORIGINAL), exif_ifd.get(TAG_OFFSET_TIME_ORIGINAL))
+            or _parse_datetime(exif_ifd.get(TAG_DATETIME_DIGITIZED))
+            or _parse_datetime(exif.get(TAG_DATETIME))
+        )
+        orientation = exif.get(ExifTags.Base.Orientation, 1)
+        if not isinstance(orientation, int) or not 1 <= orientation <= 8:
+            orientation = 1
+        width, height = img.size
+        if orientation >= 5:
+            # 90° döndürülmüş: ekranda en ve boy yer değiştirir
+            width, height = height, width
+        latitude, longitude = _gps(exif)
+        return {
+            # RAW'lar Pillow'da TIFF olarak açılır
+            'mime_type': (img.format != 'TIFF' and Image.MIME.get(img.format)) or sniff(_read_head(path), filename),
+            'taken_at': taken_at,
+            'image': {
+                'width': width,
+                'height': height,
+                'orientation': orientation,
+                'camera_make': _text(exif.get(ExifTags.Base.Make))[:100],
+                'camera_model': _text(exif.get(ExifTags.Base.Model))[:100],
+                'latitude': latitude,
+                'longitude': longitude,
+            },
+        }
+
+
+def extract_items(item_ids):
+    """Arka plan işi: dosyaların MIME türünü, çekim zamanını ve EXIF bilgilerini kaydeder."""
+    from .models import FileItem, MediaMetadata
+    from .storage import files
+
+    storage = files()
+    items = list(FileItem.objects.filter(pk__in=item_ids).only('id', 'file', 'filename', 'mime_type', 'taken_at'))
+    updated, rows = [], []
+    for item in items:
+        try:
+            with storage.open(item.file.name) as f:
+                data = extract(f, item.filename)
+        except OSError:
+            continue
+        except Exception:
+            logger.warning('Metadata okunamadı: %s', item.pk, exc_info=True)
+            continue
+        item.mime_type = data['mime_type']
+        if data['taken_at'] is not None:
+            item.taken_at = data['taken_at']
+        updated.append(item)
+        if data['image'] is not None:
+            rows.append(MediaMetadata(item_id=item.pk, **data['image']))
+
+    FileItem.objects.bulk_update(updated, ['mime_type', 'taken_at'], batch_size=BATCH_SIZE)
+    MediaMetadata.objects.bulk_create(
+        rows, batch_size=BATCH_SIZE, update_conflicts=True, unique_fields=['item'],
+        update_fields=['width', 'height', 'orientation', 'camera_make', 'camera_model',
+                       'latitude', 'longitude', 'extracted_at'],
+    )
+    return len(updated)
+
+
+def schedule_extraction(items, batch_size=200):
+    """Yeni / içeriği değişen dosyalar için metadata okumayı kuyruğa alır."""
+    from .tasks import enqueue
+
+    ids = [str(item.pk) for item in items]
+    for i in range(0, len(ids), batch_size):
+        enqueue('drive.metadata.extract_items', ids[i:i + batch_size])
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0005_syncstate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fileitem',
+            index=models.Index(fields=['user', 'trashed_at', 'created_at'], name='fileitem_user_trash_created'),
+        ),
+        migrations.AddIndex(
+            model_name='fileitem',
+            index=models.Index(fields=['user', 'file_type', 'trashed_at', 'created_at'], name='fileitem_user_type_created'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0006_fileitem_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fileitem',
+            name='size',
+            field=models.PositiveBigIntegerField(help_text='File size in bytes'),
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('file_type', models.CharField(choices=[('FILE', 'Genel Dosya'), ('PHOTO', 'Fotoğraf')], default='FILE', max_length=10)),
+                ('target', models.CharField(choices=[('USER', 'Kullanıcı alanı'), ('SHARED', 'Ortak klasör')], default='USER', max_length=10)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('staging_path', models.CharField(help_text="MEDIA_ROOT'a göre göreli geçici dosya", max_length=500)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Devam ediyor'), ('COMPLETED', 'Tamamlandı'), ('ABORTED', 'İptal edildi')], default='ACTIVE', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('file_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='drive.fileitem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0007_uploadsession'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileitem',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='fileitem',
+            name='content_md5',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='fileitem',
+            index=models.Index(fields=['user', 'content_hash'], name='fileitem_user_hash'),
+        ),
+        migrations.AddIndex(
+            model_name='fileitem',
+            index=models.Index(fields=['user', 'content_md5'], name='fileitem_user_md5'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0009_changejournal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransferJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('op', models.CharField(choices=[('COPY', 'Kopyala'), ('MOVE', 'Taşı')], default='COPY', max_length=10)),
+                ('direction', models.CharField(choices=[('TO_USER', 'Paylaşılandan kullanıcı alanına'), ('TO_SHARED', 'Kullanıcı alanından paylaşılana')], default='TO_USER', max_length=10)),
+                ('source', models.CharField(help_text='Paylaşılan klasöre göre yol (TO_USER) veya FileItem id (TO_SHARED)', max_length=500)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_bytes', models.PositiveBigIntegerField(default=0)),
+                ('done_bytes', models.PositiveBigIntegerField(default=0)),
+                ('method', models.CharField(blank=True, help_text='rename / link / reflink / copy_file_range / copy', max_length=20)),
+                ('status', models.CharField(choices=[('QUEUED', 'Sırada'), ('RUNNING', 'Çalışıyor'), ('COMPLETED', 'Tamamlandı'), ('FAILED', 'Başarısız'), ('CANCELLED', 'İptal edildi')], default='QUEUED', max_length=10)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('file_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='drive.fileitem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transfer_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
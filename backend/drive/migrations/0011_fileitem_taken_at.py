@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_created_at(apps, schema_editor):
+    # Mevcut dosyaların çekim zamanı, metadata okunana kadar yükleme zamanı kabul edilir
+    FileItem = apps.get_model('drive', 'FileItem')
+    FileItem.objects.update(taken_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0010_transferjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaMetadata',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metadata', serialize=False, to='drive.fileitem')),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('orientation', models.PositiveSmallIntegerField(default=1)),
+                ('camera_make', models.CharField(blank=True, max_length=100)),
+                ('camera_model', models.CharField(blank=True, max_length=100)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('extracted_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='fileitem',
+            name='taken_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='fileitem',
+            index=models.Index(fields=['user', 'file_type', 'trashed_at', 'taken_at'], name='fileitem_user_type_taken'),
+        ),
+    ]
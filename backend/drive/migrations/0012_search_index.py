@@ -0,0 +1,108 @@
+# Generated by Django 5.1 on 2026-10-18 10:00
+
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SQLITE_SQL = [
+    # Contentless FTS5: metin SearchDocument'ta, burada sadece indeks.
+    # owner = 'u' + kullanıcı id, kind = file / note (arama bunları SearchDocument'ta süzer, bkz. search).
+    """CREATE VIRTUAL TABLE drive_search_fts USING fts5(
+        owner, kind, title, body, content='', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )""",
+    """CREATE TRIGGER drive_search_ai AFTER INSERT ON drive_searchdocument BEGIN
+        INSERT INTO drive_search_fts(rowid, owner, kind, title, body)
+        VALUES (new.id, 'u' || new.user_id, new.kind, new.title, new.body);
+    END""",
+    """CREATE TRIGGER drive_search_ad AFTER DELETE ON drive_searchdocument BEGIN
+        INSERT INTO drive_search_fts(drive_search_fts, rowid, owner, kind, title, body)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.kind, old.title, old.body);
+    END""",
+    """CREATE TRIGGER drive_search_au AFTER UPDATE ON drive_searchdocument BEGIN
+        INSERT INTO drive_search_fts(drive_search_fts, rowid, owner, kind, title, body)
+        VALUES ('delete', old.id, 'u' || old.user_id, old.kind, old.title, old.body);
+        INSERT INTO drive_search_fts(rowid, owner, kind, title, body)
+        VALUES (new.id, 'u' || new.user_id, new.kind, new.title, new.body);
+    END""",
+]
+SQLITE_REVERSE_SQL = [
+    'DROP TRIGGER IF EXISTS drive_search_au',
+    'DROP TRIGGER IF EXISTS drive_search_ad',
+    'DROP TRIGGER IF EXISTS drive_search_ai',
+    'DROP TABLE IF EXISTS drive_search_fts',
+]
+POSTGRES_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX drive_searchdocument_title_trgm ON drive_searchdocument USING gin (title gin_trgm_ops)',
+    'CREATE INDEX drive_searchdocument_body_trgm ON drive_searchdocument USING gin (body gin_trgm_ops)',
+]
+POSTGRES_REVERSE_SQL = [
+    'DROP INDEX IF EXISTS drive_searchdocument_body_trgm',
+    'DROP INDEX IF EXISTS drive_searchdocument_title_trgm',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_SQL, 'postgresql': POSTGRES_SQL})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_REVERSE_SQL, 'postgresql': POSTGRES_REVERSE_SQL})
+
+
+# drive.search'ten kopya: migration uygulama kodu değişse de aynı sonucu vermeli
+TURKISH_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def fold(text):
+    text = unicodedata.normalize('NFKD', (text or '').translate(TURKISH_FOLD).casefold())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def populate(apps, schema_editor):
+    FileItem = apps.get_model('drive', 'FileItem')
+    Note = apps.get_model('drive', 'Note')
+    SearchDocument = apps.get_model('drive', 'SearchDocument')
+    files = FileItem.objects.filter(trashed_at__isnull=True).values_list('id', 'user_id', 'filename')
+    notes = Note.objects.values_list('id', 'user_id', 'title', 'content')
+    rows = [('file', row[0], row[1], row[2], '') for row in files.iterator()]
+    rows += [('note', *row) for row in notes.iterator()]
+    for i in range(0, len(rows), 500):
+        SearchDocument.objects.bulk_create([
+            SearchDocument(user_id=user_id, kind=kind, object_id=pk, title=fold(title), body=fold(body))
+            for kind, pk, user_id, title, body in rows[i:i + 500]
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0011_fileitem_taken_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('file', 'Dosya'), ('note', 'Not')], max_length=10)),
+                ('object_id', models.UUIDField()),
+                ('title', models.TextField()),
+                ('body', models.TextField(blank=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='searchdocument_kind_object')],
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0012_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageUsage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_count', models.BigIntegerField(default=0)),
+                ('file_bytes', models.BigIntegerField(default=0)),
+                ('photo_count', models.BigIntegerField(default=0)),
+                ('photo_bytes', models.BigIntegerField(default=0)),
+                ('favorite_count', models.BigIntegerField(default=0)),
+                ('favorite_bytes', models.BigIntegerField(default=0)),
+                ('trash_count', models.BigIntegerField(default=0)),
+                ('trash_bytes', models.BigIntegerField(default=0)),
+                ('quota', models.PositiveBigIntegerField(blank=True, help_text='Bayt; boşsa DRIVE_DEFAULT_QUOTA', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='storage_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0013_storage_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileitem',
+            name='mtime_ns',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drive', '0014_fileitem_mtime'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Devam ediyor'), ('FINALIZING', 'Tamamlanıyor'), ('COMPLETED', 'Tamamlandı'), ('ABORTED', 'İptal edildi')], default='ACTIVE', max_length=10),
+        ),
+    ]
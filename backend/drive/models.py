@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 import os
 
@@ -12,8 +13,8 @@ def user_directory_path(instance, filename):
     if instance.file_type == 'PHOTO':
         folder = 'Fotograflar'
     
-    # D:\ooCloud\KULLANICI_ADI\Dosyalar\filename
-    # D:\ooCloud\KULLANICI_ADI\Fotograflar\filename
+    # <depolama kökü>/KULLANICI_ADI/Dosyalar/filename (bkz. storage)
+    # <depolama kökü>/KULLANICI_ADI/Fotograflar/filename
     return os.path.join(user_folder, folder, filename)
 
 class FileItem(models.Model):
@@ -27,16 +28,75 @@ class FileItem(models.Model):
     file = models.FileField(upload_to=user_directory_path)
     filename = models.CharField(max_length=255, blank=True)
     file_type = models.CharField(max_length=10, choices=FILE_TYPES, default='FILE')
-    size = models.PositiveIntegerField(help_text="File size in bytes")
+    size = models.PositiveBigIntegerField(help_text="File size in bytes")
+    # Depodaki dosyanın değiştirilme zamanı; eşitleme boyut / mtime farkından içerik değişikliğini anlar.
+    # 0: bilinmiyor (ör. API ile yüklenmiş), ilk eşitlemede içerik değişikliği sayılmadan doldurulur
+    mtime_ns = models.BigIntegerField(default=0)
     mime_type = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_favorite = models.BooleanField(default=False)
     trashed_at = models.DateTimeField(null=True, blank=True)
+    # İçerik özetleri (hex); tekrar yüklemeyi önlemek için
+    content_hash = models.CharField(max_length=64, blank=True, default='', help_text="SHA-256")
+    content_md5 = models.CharField(max_length=32, blank=True, default='')
+    # Çekim zamanı (EXIF), yoksa dosyanın değiştirilme zamanı; zaman çizelgesi ve galeri sırası
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Liste ve keyset sayfalama: (user, çöp durumu) + created_at sırası
+            models.Index(fields=['user', 'trashed_at', 'created_at'], name='fileitem_user_trash_created'),
+            models.Index(fields=['user', 'file_type', 'trashed_at', 'created_at'], name='fileitem_user_type_created'),
+            models.Index(fields=['user', 'content_hash'], name='fileitem_user_hash'),
+            models.Index(fields=['user', 'content_md5'], name='fileitem_user_md5'),
+            # Zaman çizelgesi ve çekim zamanına göre sayfalama
+            models.Index(fields=['user', 'file_type', 'trashed_at', 'taken_at'], name='fileitem_user_type_taken'),
+        ]
     
+    # Konum / durum alanları (touch_metadata) ve sadece içerik değişince yenilenen alanlar (content_changed)
+    METADATA_FIELDS = ('file', 'filename', 'is_favorite', 'trashed_at', 'updated_at')
+    CONTENT_FIELDS = ('size', 'mtime_ns', 'content_hash', 'content_md5')
+    USAGE_FIELDS = ('file_type', 'size', 'is_favorite', 'trashed_at')
+    # Son günlük kaydındaki (veya veritabanından okunduğundaki) kullanım durumu; bkz. usage.delta
+    _usage_state = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._usage_state = instance.usage_state()
+        return instance
+
+    def usage_state(self):
+        """(tür, boyut, favori mi, çöpte mi); alanlardan biri okunmamışsa (only / defer) None."""
+        if any(name not in self.__dict__ for name in self.USAGE_FIELDS):
+            return None
+        return (self.file_type, self.size or 0, self.is_favorite, self.trashed_at is not None)
+
+    def content_changed(self, size=None, mtime_ns=None, content_hash='', content_md5=''):
+        """
+        İçerik alanlarını yeniler (kaydetmez). Boyut / mtime verilmezse depodan tek stat ile okunur;
+        özetler verilmezse temizlenir (arka planda yeniden hesaplanır).
+        """
+        if size is None or mtime_ns is None:
+            from .storage import files
+
+            st = files().stat(self.file.name)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        self.size, self.mtime_ns = size, mtime_ns
+        self.content_hash, self.content_md5 = content_hash, content_md5
+
+    def touch_metadata(self):
+        """Sadece konum / favori / çöp alanlarını yazar; içerik alanlarına dokunmaz, depoya gitmez."""
+        self.save(update_fields=self.METADATA_FIELDS)
+
     def save(self, *args, **kwargs):
         if self.file:
-            self.size = self.file.size
+            # Boyut sadece yeni kayıtta okunur: yüklenen dosyadan veya (boyut verilmediyse) depodan
+            if not self.file._committed:
+                self.size = self.file.size
+            elif self.size is None:
+                self.content_changed(content_hash=self.content_hash, content_md5=self.content_md5)
             if not self.filename:
                 self.filename = self.file.name
         super().save(*args, **kwargs)
@@ -44,6 +104,48 @@ class FileItem(models.Model):
     def __str__(self):
         return self.filename
 
+class MediaMetadata(models.Model):
+    """
+    Fotoğraftan okunan EXIF bilgileri (FileItem başına bir kayıt).
+    width / height yön (orientation) uygulanmış, ekranda görünen boyutlardır.
+    """
+    item = models.OneToOneField(FileItem, on_delete=models.CASCADE, primary_key=True, related_name='metadata')
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    orientation = models.PositiveSmallIntegerField(default=1)
+    camera_make = models.CharField(max_length=100, blank=True)
+    camera_model = models.CharField(max_length=100, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.item_id)
+
+class SearchDocument(models.Model):
+    """
+    Arama dizinindeki bir kayıt (dosya adı veya not başlığı / içeriği).
+    title / body search.fold ile katlanmış metindir; SQLite'ta FTS5, Postgres'te trigram indeksi bu tabloyu izler.
+    """
+    KIND_CHOICES = (
+        ('file', 'Dosya'),
+        ('note', 'Not'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    title = models.TextField()
+    body = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='searchdocument_kind_object'),
+        ]
+
+    def __str__(self):
+        return self.title
+
 class Note(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notes')
@@ -54,3 +156,168 @@ class Note(models.Model):
     
     def __str__(self):
         return self.title
+
+class DirectorySnapshot(models.Model):
+    """
+    Senkronizasyonda taranan bir klasörün son görüntüsü.
+    Klasörün mtime'ı değişmediyse tekrar taranmaz.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='directory_snapshots')
+    path = models.CharField(max_length=500, help_text="MEDIA_ROOT'a göre göreli klasör yolu")
+    mtime_ns = models.BigIntegerField(default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    # {dosya_adi: [boyut, mtime_ns]}
+    entries = models.JSONField(default=dict)
+    scanned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'path')
+
+    def __str__(self):
+        return self.path
+
+class SyncState(models.Model):
+    """
+    Kullanıcı başına arka plan eşitleme durumu.
+    queued alanı aynı kullanıcı için birden fazla taramanın kuyruğa girmesini engeller.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_state')
+    queued = models.BooleanField(default=False)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    running = models.BooleanField(default=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_purged_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return str(self.user)
+
+class StorageUsage(models.Model):
+    """
+    Kullanıcının depolama kullanımı (FileItem boyutlarının özeti), bkz. usage.
+    Favoriler çöpte olmayan dosyaların alt kümesidir; kullanılan alan = dosyalar + fotoğraflar + çöp.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='storage_usage')
+    file_count = models.BigIntegerField(default=0)
+    file_bytes = models.BigIntegerField(default=0)
+    photo_count = models.BigIntegerField(default=0)
+    photo_bytes = models.BigIntegerField(default=0)
+    favorite_count = models.BigIntegerField(default=0)
+    favorite_bytes = models.BigIntegerField(default=0)
+    trash_count = models.BigIntegerField(default=0)
+    trash_bytes = models.BigIntegerField(default=0)
+    quota = models.PositiveBigIntegerField(null=True, blank=True, help_text="Bayt; boşsa DRIVE_DEFAULT_QUOTA")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def used_bytes(self):
+        return self.file_bytes + self.photo_bytes + self.trash_bytes
+
+    def __str__(self):
+        return str(self.user)
+
+class UploadSession(models.Model):
+    """
+    Parça parça (devam ettirilebilir) yükleme oturumu.
+    Parçalar doğrudan kullanıcının klasöründeki geçici dosyaya yazılır, finalize ile FileItem oluşur.
+    """
+    STATUS_CHOICES = (
+        ('ACTIVE', 'Devam ediyor'),
+        ('FINALIZING', 'Tamamlanıyor'),
+        ('COMPLETED', 'Tamamlandı'),
+        ('ABORTED', 'İptal edildi'),
+    )
+    TARGET_CHOICES = (
+        ('USER', 'Kullanıcı alanı'),
+        ('SHARED', 'Ortak klasör'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='upload_sessions')
+    filename = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=10, choices=FileItem.FILE_TYPES, default='FILE')
+    target = models.CharField(max_length=10, choices=TARGET_CHOICES, default='USER')
+    total_size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    staging_path = models.CharField(max_length=500, help_text="MEDIA_ROOT'a göre göreli geçici dosya")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='ACTIVE')
+    file_item = models.ForeignKey(FileItem, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.filename
+
+class TransferJob(models.Model):
+    """
+    Sunucu tarafı kopyalama / taşıma işi (paylaşılan klasör <-> kullanıcı alanı).
+    İstek hemen döner; iş kuyrukta çalışır, ilerleme done_bytes ile izlenir, cancel_requested ile iptal edilir.
+    """
+    OP_CHOICES = (
+        ('COPY', 'Kopyala'),
+        ('MOVE', 'Taşı'),
+    )
+    DIRECTION_CHOICES = (
+        ('TO_USER', 'Paylaşılandan kullanıcı alanına'),
+        ('TO_SHARED', 'Kullanıcı alanından paylaşılana'),
+    )
+    STATUS_CHOICES = (
+        ('QUEUED', 'Sırada'),
+        ('RUNNING', 'Çalışıyor'),
+        ('COMPLETED', 'Tamamlandı'),
+        ('FAILED', 'Başarısız'),
+        ('CANCELLED', 'İptal edildi'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='transfer_jobs')
+    op = models.CharField(max_length=10, choices=OP_CHOICES, default='COPY')
+    direction = models.CharField(max_length=10, choices=DIRECTION_CHOICES, default='TO_USER')
+    source = models.CharField(max_length=500, help_text="Paylaşılan klasöre göre yol (TO_USER) veya FileItem id (TO_SHARED)")
+    filename = models.CharField(max_length=255)
+    total_bytes = models.PositiveBigIntegerField(default=0)
+    done_bytes = models.PositiveBigIntegerField(default=0)
+    method = models.CharField(max_length=20, blank=True, help_text="rename / link / reflink / copy_file_range / copy")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    cancel_requested = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    file_item = models.ForeignKey(FileItem, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.filename
+
+class ChangeJournal(models.Model):
+    """
+    Kullanıcı dosyalarındaki değişikliklerin sıralı kaydı (delta eşitleme için).
+    id artan sıra numarasıdır; istemci son gördüğü id'den sonrasını ister (bkz. journal.changes_since).
+    """
+    OP_CHOICES = (
+        ('create', 'Oluşturuldu'),
+        ('update', 'Güncellendi'),
+        ('move', 'Taşındı'),
+        ('trash', 'Çöpe atıldı'),
+        ('delete', 'Silindi'),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='changes')
+    item_id = models.UUIDField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    # Değişiklik sonrası dosyanın özet hali (silmede boş)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'id'], name='changejournal_user_id'),
+            models.Index(fields=['created_at'], name='changejournal_created'),
+        ]
+
+    def __str__(self):
+        return f'{self.op} {self.item_id}'
@@ -0,0 +1,150 @@
+"""
+Dosyaların kullanıcı klasörü içinde taşınması (ana klasör / Favoriler / CopKutusu)
+ve çoklu seçim için toplu işlemler.
+"""
+import logging
+import posixpath
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import journal, storage, thumbnails
+from .models import FileItem
+
+logger = logging.getLogger(__name__)
+
+FAVORITES_FOLDER = 'Favoriler'
+TRASH_FOLDER = 'CopKutusu'
+
+BATCH_ACTIONS = ('favorite', 'unfavorite', 'trash', 'restore', 'delete')
+MAX_BATCH_SIZE = 5000
+DB_CHUNK = 500
+
+
+def type_folder(item):
+    return 'Fotograflar' if item.file_type == 'PHOTO' else 'Dosyalar'
+
+
+def move_file(item, subfolder=None):
+    """
+    Dosyayı tip klasörünün ana dizinine veya verilen alt klasöre taşır ve item.file'ı günceller (kaydetmez).
+    Hedefte aynı isimde dosya varsa üzerine yazmak / atlamak yerine yeni isim verilir.
+    Fiziksel dosya yoksa sadece kayıt yolu güncellenir.
+    Dosya taşındıysa (eski ad, yeni ad), taşınmadıysa None döndürür (adlar depoya göre, bkz. storage).
+    """
+    files = storage.files()
+    rel_dir = posixpath.join(item.user.get_user_folder(), type_folder(item), *([subfolder] if subfolder else []))
+    current = item.file.name
+    filename = posixpath.basename(current)
+
+    moved = None
+    if posixpath.dirname(current) != rel_dir and files.exists(current):
+        dest = storage.unique_name(files, rel_dir, filename)
+        files.move(current, dest)
+        moved = (current, dest)
+        if posixpath.basename(dest) != filename:
+            if item.filename == filename:
+                item.filename = posixpath.basename(dest)
+            filename = posixpath.basename(dest)
+
+    item.file = posixpath.join(rel_dir, filename)
+    return moved
+
+
+def _plan(item, action, now):
+    """İşlem sonrası (alt klasör, alanlar) veya gerek yoksa None. 'delete' çöpteki dosya için 'purge' döner."""
+    if action == 'favorite':
+        if item.is_favorite or item.trashed_at:
+            return None
+        return FAVORITES_FOLDER, {'is_favorite': True}
+    if action == 'unfavorite':
+        if not item.is_favorite or item.trashed_at:
+            return None
+        return None, {'is_favorite': False}
+    if action == 'restore':
+        if not item.trashed_at:
+            return None
+        return None, {'trashed_at': None}
+    if action == 'delete' and item.trashed_at:
+        return 'purge'
+    # trash / çöpte olmayan dosya için delete: çöpe taşı
+    if item.trashed_at:
+        return None
+    return TRASH_FOLDER, {'trashed_at': now, 'is_favorite': False}
+
+
+def apply_batch(user, ids, action):
+    """
+    Seçili dosyalara tek seferde favori / çöp / geri yükleme / silme uygular.
+    Önce tüm taşımalar yapılır, veritabanı tek transaction içinde bulk_update ile güncellenir;
+    transaction başarısız olursa taşınan dosyalar geri alınır.
+    Dönüş: {id: 'ok' | 'skipped' | 'not_found' | hata mesajı}
+    """
+    ids = [str(i) for i in dict.fromkeys(ids)]
+    results = {item_id: 'not_found' for item_id in ids}
+    valid_ids = []
+    for item_id in ids:
+        try:
+            valid_ids.append(uuid.UUID(item_id))
+        except ValueError:
+            pass
+    items = []
+    for i in range(0, len(valid_ids), DB_CHUNK):
+        items.extend(FileItem.objects.filter(user=user, pk__in=valid_ids[i:i + DB_CHUNK]))
+
+    now = timezone.now()
+    to_update, to_purge, moves, changes = [], [], [], []
+    for item in items:
+        item.user = user
+        item_id = str(item.pk)
+        plan = _plan(item, action, now)
+        if plan is None:
+            results[item_id] = 'skipped'
+            continue
+        if plan == 'purge':
+            to_purge.append(item)
+            continue
+        subfolder, fields = plan
+        try:
+            moved = move_file(item, subfolder)
+        except OSError as e:
+            results[item_id] = str(e)
+            continue
+        if moved:
+            moves.append(moved)
+        for name, value in fields.items():
+            setattr(item, name, value)
+        item.updated_at = now
+        to_update.append(item)
+        changes.append(journal.entry(item, 'trash' if subfolder == TRASH_FOLDER else 'move'))
+
+    try:
+        with transaction.atomic():
+            FileItem.objects.bulk_update(to_update, FileItem.METADATA_FIELDS, batch_size=DB_CHUNK)
+            for i in range(0, len(to_purge), DB_CHUNK):
+                FileItem.objects.filter(pk__in=[item.pk for item in to_purge[i:i + DB_CHUNK]]).delete()
+            journal.record_entries(changes + [journal.entry(item, 'delete') for item in to_purge])
+    except Exception:
+        files = storage.files()
+        for source, dest in reversed(moves):
+            try:
+                files.move(dest, source)
+            except OSError:
+                pass
+        raise
+
+    # Taşınan dosyaların içeriği değişmedi, küçük resimleri geçerli
+    for item in to_update:
+        results[str(item.pk)] = 'ok'
+    for item in to_purge:
+        # Kayıtlar silindikten sonra dosyalar kaldırılır
+        thumbnails.invalidate(item.pk)
+        try:
+            storage.files().delete(item.file.name)
+        except OSError as e:
+            logger.exception('Dosya silinemedi: %s', item.pk)
+            results[str(item.pk)] = str(e)
+        else:
+            results[str(item.pk)] = 'ok'
+    return results
@@ -0,0 +1,92 @@
+import base64
+import json
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+# ?sort= değeri -> sıralama alanı
+SORT_FIELDS = {
+    'created': 'created_at',
+    'taken': 'taken_at',
+}
+
+
+def sort_field(request):
+    """?sort=created (varsayılan, yükleme zamanı) veya ?sort=taken (çekim zamanı)"""
+    field = SORT_FIELDS.get(request.query_params.get('sort', 'created'))
+    if field is None:
+        raise ValidationError({'sort': 'Geçersiz sıralama'})
+    return field
+
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) veya ?sort=taken ile (taken_at, id) üzerinden keyset sayfalama.
+    OFFSET kullanılmadığı için N. sayfa da ilk sayfa kadar hızlıdır.
+    İstemci 'limit' veya 'cursor' göndermezse eski davranış (tüm liste) korunur.
+    """
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    field = 'created_at'
+
+    def encode_cursor(self, item):
+        raw = json.dumps([getattr(item, self.field).isoformat(), str(item.pk)])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, uuid.UUID(pk)
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': 'Geçersiz cursor'})
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        page_size = self.get_page_size(request)
+        self.field = sort_field(request)
+        queryset = queryset.order_by(f'-{self.field}', '-id')
+        cursor = params.get(self.cursor_query_param)
+        if cursor:
+            value, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(Q(**{f'{self.field}__lt': value}) | Q(**{self.field: value, 'id__lt': pk}))
+
+        # Sonraki sayfa var mı diye bir fazla kayıt çek
+        items = list(queryset[:page_size + 1])
+        self.next_cursor = self.encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+        return items[:page_size]
+
+    def get_paginated_response(self, data):
+        return Response({
+            'results': data,
+            'next': self.next_cursor,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'next': {'type': 'string', 'nullable': True},
+            },
+        }
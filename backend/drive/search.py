@@ -0,0 +1,134 @@
+"""
+Dosya adı ve not başlığı / içeriği üzerinde dizinli arama.
+
+Dizin SearchDocument tablosudur; metin yazılmadan önce fold() ile katlanır (Türkçe İ/I/ı -> i,
+küçük harf, aksanlar atılır: "İstanbul", "ISTANBUL", "istanbul" ve "ıstanbul" aynı sonucu verir).
+
+    SQLite   -> FTS5 tablosu (drive_search_fts); tetikleyiciler SearchDocument ile eşit tutar.
+                Sıralama SQL'de bm25 ile (başlık ağırlığı TITLE_WEIGHT), ilk limit kayıt alınır.
+                Puanlama kayıt başına ek okuma gerektirir; kullanıcının en yeni RANK_WINDOW eşleşmesi
+                puanlanır (çoğu aramada eşleşmelerin tümü, tek harf gibi geniş öneklerde en yeniler).
+                Kullanıcı SearchDocument birleştirmesinde süzülür; owner sütununu eşleştirmek
+                kullanıcının tüm kayıtlarını okur. Ölçüm: benchmarks/search.py
+    Postgres -> title / body üzerinde pg_trgm GIN indeksleri, sıralama kelime benzerliği
+
+Dosyalar değişiklik günlüğünden (journal.record_entries) güncellenir: dosya değiştiren her yol
+günlüğe yazdığı için dizin de aynı transaction'da güncel kalır. Notlar NoteViewSet'ten güncellenir.
+Çöpteki dosyalar dizinde tutulmaz.
+"""
+import re
+import unicodedata
+import uuid
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import SearchDocument
+
+FTS_TABLE = 'drive_search_fts'
+BATCH_SIZE = 500
+MAX_TOKENS = 8
+MAX_RESULTS = 100
+RANK_WINDOW = 10000
+TITLE_WEIGHT = 10.0
+KINDS = ('file', 'note')
+
+TURKISH_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def fold(text):
+    """Aramada büyük / küçük harf, Türkçe i/ı ve aksan farkı gözetilmesin diye metni katlar."""
+    text = unicodedata.normalize('NFKD', (text or '').translate(TURKISH_FOLD).casefold())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def tokens(query):
+    return re.findall(r'\w+', fold(query))[:MAX_TOKENS]
+
+
+def _document(user_id, kind, object_id, title, body=''):
+    return SearchDocument(user_id=user_id, kind=kind, object_id=object_id, title=fold(title), body=fold(body))
+
+
+def _upsert(documents):
+    # Aynı kayıt bir partide iki kez geçerse sonuncusu geçerli
+    documents = list({(d.kind, d.object_id): d for d in documents}.values())
+    SearchDocument.objects.bulk_create(
+        documents, batch_size=BATCH_SIZE, update_conflicts=True,
+        unique_fields=['kind', 'object_id'], update_fields=['title', 'body'],
+    )
+
+
+def remove(kind, object_ids):
+    object_ids = list(object_ids)
+    for i in range(0, len(object_ids), BATCH_SIZE):
+        SearchDocument.objects.filter(kind=kind, object_id__in=object_ids[i:i + BATCH_SIZE]).delete()
+
+
+def index_changes(entries):
+    """Günlük kayıtlarına (ChangeJournal) göre dosyaların dizin kayıtlarını günceller."""
+    latest = {}
+    for change in entries:
+        latest[change.item_id] = change
+    documents, removed = [], []
+    for item_id, change in latest.items():
+        if change.op == 'delete' or change.data.get('trashed_at'):
+            removed.append(item_id)
+        else:
+            documents.append(_document(change.user_id, 'file', item_id, change.data.get('filename', '')))
+    remove('file', removed)
+    _upsert(documents)
+
+
+def index_files(items):
+    remove('file', [item.pk for item in items if item.trashed_at])
+    _upsert([_document(item.user_id, 'file', item.pk, item.filename) for item in items if not item.trashed_at])
+
+
+def index_notes(notes):
+    _upsert([_document(note.user_id, 'note', note.pk, note.title, note.content) for note in notes])
+
+
+def match_expression(words):
+    """FTS5 sorgusu: "kelime"* -> önek eşleşmesi (yazarken arama)."""
+    return '{title body}:(%s)' % ' '.join(f'"{w}"*' for w in words)
+
+
+def _search_sqlite(user, words, kinds, limit):
+    # CROSS JOIN: FTS dış döngüde, rowid sırasıyla kalsın (planlayıcı kullanıcının tüm kayıtlarını taramasın)
+    fts = FTS_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT d.kind, d.object_id, hits.rank FROM ('
+            f'  SELECT {fts}.rowid AS id, bm25({fts}, 0, 0, {TITLE_WEIGHT}, 1.0) AS rank'
+            f'  FROM {fts} CROSS JOIN drive_searchdocument u ON u.id = {fts}.rowid'
+            f'  WHERE {fts} MATCH %s AND u.user_id = %s ORDER BY {fts}.rowid DESC LIMIT %s'
+            f') hits CROSS JOIN drive_searchdocument d ON d.id = hits.id'
+            f' WHERE d.kind IN ({", ".join(["%s"] * len(kinds))})'
+            f' ORDER BY hits.rank, hits.id DESC LIMIT %s',
+            [match_expression(words), user.pk.hex, RANK_WINDOW, *kinds, limit],
+        )
+        # bm25 negatiftir (küçük olan daha iyi); aynı puanda yeni dizinlenen önce
+        return [(kind, uuid.UUID(str(object_id)), -rank) for kind, object_id, rank in cursor.fetchall()]
+
+
+def _search_orm(user, words, kinds, limit):
+    qs = SearchDocument.objects.filter(user=user, kind__in=kinds)
+    for word in words:
+        qs = qs.filter(Q(title__contains=word) | Q(body__contains=word))
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        qs = qs.annotate(rank=TrigramWordSimilarity(' '.join(words), 'title')).order_by('-rank', 'title')
+        return [(d.kind, d.object_id, d.rank) for d in qs[:limit]]
+    return [(d.kind, d.object_id, 0.0) for d in qs.order_by('title')[:limit]]
+
+
+def search(user, query, kinds=KINDS, limit=20):
+    """Sıralı sonuçlar: [(tür, nesne id, skor)] (skor büyük olan önce)."""
+    words = tokens(query)
+    if not words:
+        return []
+    limit = max(1, min(limit, MAX_RESULTS))
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(user, words, list(kinds), limit)
+    return _search_orm(user, words, list(kinds), limit)
@@ -1,21 +1,31 @@
 from rest_framework import serializers
-from .models import FileItem, Note
+from .models import FileItem, MediaMetadata, Note, TransferJob
+
+class MediaMetadataSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MediaMetadata
+        fields = ['width', 'height', 'orientation', 'camera_make', 'camera_model', 'latitude', 'longitude']
+        read_only_fields = fields
 
 class FileItemSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
+    # Fotoğraf değilse / henüz okunmadıysa null
+    metadata = MediaMetadataSerializer(read_only=True, allow_null=True)
     
     class Meta:
         model = FileItem
-        fields = ['id', 'filename', 'file_type', 'file', 'file_url', 'size', 'mime_type', 'created_at', 'updated_at', 'is_favorite']
-        read_only_fields = ('id', 'user', 'size', 'created_at', 'updated_at', 'file_url')
+        fields = ['id', 'filename', 'file_type', 'file', 'file_url', 'size', 'mime_type', 'created_at', 'updated_at', 'is_favorite', 'trashed_at', 'content_hash', 'content_md5', 'taken_at', 'metadata']
+        read_only_fields = ('id', 'user', 'size', 'created_at', 'updated_at', 'file_url', 'trashed_at', 'content_hash', 'content_md5', 'taken_at')
     
     def get_file_url(self, obj):
         if obj.file:
+            url = obj.file.url
             request = self.context.get('request')
-            if request:
+            # S3 deposunda url zaten tam (imzalı) adres
+            if request and url.startswith('/'):
                 # Cloudflare domain'ini kullan
-                return f"https://mobil.onurtopaloglu.uk{obj.file.url}"
-            return obj.file.url
+                return f"https://mobil.onurtopaloglu.uk{url}"
+            return url
         return None
     
     def create(self, validated_data):
@@ -30,3 +40,17 @@ class NoteSerializer(serializers.ModelSerializer):
         model = Note
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'updated_at')
+
+class TransferJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TransferJob
+        fields = ['id', 'op', 'direction', 'source', 'filename', 'total_bytes', 'done_bytes', 'progress',
+                  'method', 'status', 'error', 'file_item', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        if obj.status == 'COMPLETED':
+            return 1.0
+        return round(obj.done_bytes / obj.total_bytes, 4) if obj.total_bytes else 0.0
@@ -0,0 +1,209 @@
+"""
+Dosya sunumu: Range (206), koşullu GET (ETag / If-Modified-Since), doğru Content-Type
+ve web sunucusuna devretme (DRIVE_SENDFILE_MODE).
+
+    DRIVE_SENDFILE_MODE = ''        -> baytları Django gönderir (FileResponse / parça akışı)
+    DRIVE_SENDFILE_MODE = 'nginx'   -> X-Accel-Redirect: DRIVE_SENDFILE_PREFIX + depolama köküne göre yol
+                                       (N. ek kök için DRIVE_SENDFILE_PREFIX'in '-N' eklenmiş hali)
+    DRIVE_SENDFILE_MODE = 'apache'  -> X-Sendfile: mutlak yol (mod_xsendfile)
+
+Nesne deposundaki (S3) dosyalar serve_object ile aralıklı GET'lerden akıtılır.
+
+Etiketli <video>/<img> istekleri Authorization başlığı gönderemediği için kısa ömürlü
+imzalı bağlantı (sign_link / check_link) da buradadır.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+from .storage import storage_roots
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_BLOCK = 256 * 1024
+LINK_SALT = 'drive.serve'
+
+
+def sendfile_mode():
+    return getattr(settings, 'DRIVE_SENDFILE_MODE', '')
+
+
+def link_max_age():
+    return getattr(settings, 'DRIVE_SERVE_LINK_MAX_AGE', 6 * 60 * 60)
+
+
+def sign_link(user, item_id=None, path=None):
+    """Kullanıcı ve tek bir dosyaya bağlı, süreli imza üretir."""
+    payload = {'u': str(user.pk)}
+    if item_id is not None:
+        payload['id'] = str(item_id)
+    else:
+        payload['p'] = path
+    return signing.dumps(payload, salt=LINK_SALT, compress=True)
+
+
+def check_link(token):
+    """İmza geçerliyse içeriği ({'u', 'id' | 'p'}), değilse None döndürür."""
+    try:
+        return signing.loads(token, salt=LINK_SALT, max_age=link_max_age())
+    except signing.BadSignature:
+        return None
+
+
+def _etag(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _parse_range(header, size):
+    """
+    Tek aralıklı 'bytes=' başlığını (start, end) olarak döndürür.
+    Başlık yoksa / desteklenmiyorsa None (tam dosya), karşılanamazsa False (416).
+    """
+    match = RANGE_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: son N bayt
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _iter_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(STREAM_BLOCK, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def _offload(path, content_type):
+    """Web sunucusuna devredilecekse boş gövdeli yanıt döndürür, değilse None."""
+    mode = sendfile_mode()
+    if mode == 'apache':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = os.path.abspath(path)
+        return response
+    if mode == 'nginx':
+        full = os.path.abspath(path)
+        prefix = getattr(settings, 'DRIVE_SENDFILE_PREFIX', '/protected/')
+        for index, root in enumerate(storage_roots()):
+            root = os.path.abspath(root)
+            if os.path.commonpath([root, full]) != root:
+                continue
+            rel = os.path.relpath(full, root).replace('\\', '/')
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = (f"{prefix.rstrip('/')}-{index}/" if index else prefix) + rel
+            return response
+    return None
+
+
+def _content_type(filename):
+    content_type, encoding = mimetypes.guess_type(filename)
+    if encoding:
+        # .gz vb. tarayıcı tarafından açılmasın
+        return 'application/octet-stream'
+    return content_type or 'application/octet-stream'
+
+
+def _serve(request, st, filename, as_attachment, read_range, offload=None, open_file=None):
+    """
+    Koşullu GET / Range mantığı. read_range(start, uzunluk) gövde üreticisi,
+    open_file verilirse tam dosya FileResponse ile (sendfile) gönderilir.
+    """
+    etag = _etag(st)
+    content_type = _content_type(filename)
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if response is None and offload is not None:
+        response = offload(content_type)
+    if response is None:
+        byte_range = None
+        if request.method in ('GET', 'HEAD') and _if_range_matches(request, etag, st.st_mtime):
+            byte_range = _parse_range(request.META.get('HTTP_RANGE'), st.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{st.st_size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(read_range(start, length), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{st.st_size}'
+            response['Content-Length'] = str(length)
+        elif open_file is None:
+            response = StreamingHttpResponse(read_range(0, st.st_size), content_type=content_type)
+            response['Content-Length'] = str(st.st_size)
+        else:
+            # Tam dosya: WSGI sunucusu destekliyorsa sendfile ile (kopyasız) gönderilir
+            response = FileResponse(open_file(), content_type=content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = 'private, no-cache'
+    if response.status_code in (200, 206):
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def serve_file(request, path, filename=None, as_attachment=False, iterator=None):
+    """
+    Diskteki dosyayı sunar. Dosya yoksa FileNotFoundError, klasörse IsADirectoryError.
+    iterator (ASGI, bkz. aio.iter_file) verilirse gövde her durumda iterator(path, start, uzunluk) ile akıtılır.
+    """
+    st = os.stat(path)
+    if stat.S_ISDIR(st.st_mode):
+        raise IsADirectoryError(path)
+    return _serve(
+        request, st, filename or os.path.basename(path), as_attachment,
+        lambda start, length: (iterator or _iter_range)(path, start, length),
+        offload=lambda content_type: _offload(path, content_type),
+        open_file=None if iterator is not None else lambda: open(path, 'rb'),
+    )
+
+
+def serve_object(request, storage, name, filename=None, as_attachment=False, wrap=None):
+    """
+    Depodaki (bkz. storage) dosyayı sunar; yerel depoda serve_file'a düşer.
+    wrap (ASGI, bkz. aio.iterate) verilirse senkron gövde üreticisi onunla sarılır.
+    """
+    filename = filename or posixpath.basename(name)
+    if storage.is_local:
+        iterator = None if wrap is None else lambda path, start, length: wrap(_iter_range(path, start, length))
+        return serve_file(request, storage.path(name), filename, as_attachment, iterator=iterator)
+
+    def read_range(start, length):
+        body = storage.open_range(name, start, length, STREAM_BLOCK)
+        return body if wrap is None else wrap(body)
+    return _serve(request, storage.stat(name), filename, as_attachment, read_range)
@@ -0,0 +1,505 @@
+"""
+Dosya depolama katmanı.
+
+Kullanıcı dosyalarına (FileItem.file) bütün erişim buradaki depolama üzerinden yapılır;
+adlar her zaman 'KULLANICI/Dosyalar/ad.jpg' gibi göreli yollardır.
+
+    DRIVE_STORAGE_BACKEND = 'local' -> LocalStorage: yerel dosya sistemi
+    DRIVE_STORAGE_BACKEND = 's3'    -> S3Storage: S3 uyumlu nesne deposu (AWS, MinIO ...; boto3 gerekir)
+
+LocalStorage birden fazla diske (DRIVE_STORAGE_ROOTS) yayılabilir: bir kullanıcının klasörü
+tek bir köktedir, klasörü olmayan yeni kullanıcı en çok boş alanı olan köke yerleşir.
+Kullanıcı klasörü elle başka köke taşınırsa süreç yeniden başlatılmalıdır.
+
+Büyük dosyalar belleğe alınmaz: aralık okuma (open_range), sunucu tarafı kopya / taşıma
+(copy / move) ve yerel dosyadan yükleme / indirme (upload / download) her iki depoda da vardır.
+
+Paylaşılan klasör (DRIVE_SHARED_ROOT) her zaman yerel dosya sistemindedir.
+Dosya sistemi eşitlemesi, izleyici, hardlink tekrar önleme ve web sunucusuna devretme
+(DRIVE_SENDFILE_MODE) sadece yerel depoda çalışır (is_local).
+"""
+import errno
+import io
+import os
+import posixpath
+import shutil
+import stat
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage, default_storage
+from django.utils._os import safe_join
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+SHARED_FOLDER = 'Paylasilan'
+USER_SUBFOLDERS = ('Dosyalar', 'Fotograflar')
+
+READ_BLOCK = 256 * 1024
+COPY_BUFFER = 8 * 1024 * 1024
+# S3: tek istekte okunan en büyük aralık (sıralı okumada READ_BLOCK'tan başlayıp ikiye katlanır)
+MAX_READ_WINDOW = 16 * 1024 * 1024
+MULTIPART_CHUNK = 64 * 1024 * 1024
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def files():
+    """Kullanıcı dosyalarının deposu (STORAGES['default'])."""
+    return default_storage
+
+
+def storage_roots():
+    return list(getattr(settings, 'DRIVE_STORAGE_ROOTS', None) or [settings.MEDIA_ROOT])
+
+
+def shared_dir():
+    return Path(getattr(settings, 'DRIVE_SHARED_ROOT', '') or os.path.join(storage_roots()[0], SHARED_FOLDER))
+
+
+def local_path(name):
+    """Dosyanın diskteki yolu; nesne deposunda None."""
+    storage = files()
+    return storage.path(name) if storage.is_local else None
+
+
+def unique_name(storage, rel_dir, filename):
+    """Depoda aynı isimde dosya varsa isme zaman damgası (ve gerekirse sayaç) ekler (bkz. uploads.unique_path)."""
+    name = posixpath.join(rel_dir.replace('\\', '/'), filename)
+    if not storage.exists(name):
+        return name
+    stem, suffix = os.path.splitext(filename)
+    timestamp = int(time.time())
+    name = posixpath.join(rel_dir, f'{stem}_{timestamp}{suffix}')
+    counter = 1
+    while storage.exists(name):
+        name = posixpath.join(rel_dir, f'{stem}_{timestamp}_{counter}{suffix}')
+        counter += 1
+    return name
+
+
+class _Counter:
+    """İlerleme takibi istenmeyen kopyalar için."""
+
+    done = reported = 0
+
+    def add(self, count):
+        self.done += count
+
+
+class _ProgressWriter:
+    """copyfileobj için hedef dosya sarmalayıcısı: yazılan baytları ilerlemeye ekler."""
+
+    def __init__(self, f, progress):
+        self.f = f
+        self.progress = progress
+
+    def write(self, data):
+        written = self.f.write(data)
+        self.progress.add(len(data))
+        return written
+
+
+def _same_device(src, dest_dir):
+    try:
+        return os.stat(src).st_dev == os.stat(dest_dir).st_dev
+    except OSError:
+        return False
+
+
+def copy_file(src, dest, progress=None):
+    """
+    src'yi dest'e (yeni dosya) kopyalar, kullanılan yöntemi döndürür.
+    Aynı dosya sisteminde veri kullanıcı alanından geçmez:
+    DRIVE_DEDUP_HARDLINKS açıksa os.link -> reflink (FICLONE; btrfs / xfs) -> copy_file_range (Linux),
+    diğer durumlarda shutil.copyfileobj.
+    """
+    progress = progress or _Counter()
+    same_device = _same_device(src, os.path.dirname(dest))
+    if same_device and getattr(settings, 'DRIVE_DEDUP_HARDLINKS', False):
+        try:
+            os.link(src, dest)
+            progress.add(os.path.getsize(src))
+            return 'link'
+        except OSError:
+            pass
+
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        if same_device and fcntl is not None:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                progress.add(size)
+                return 'reflink'
+            except OSError:
+                pass
+        if same_device and hasattr(os, 'copy_file_range'):
+            try:
+                offset = 0
+                while offset < size:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(MULTIPART_CHUNK, size - offset))
+                    if copied == 0:
+                        break
+                    offset += copied
+                    progress.add(copied)
+                if offset == size:
+                    return 'copy_file_range'
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.EBADF):
+                    raise
+            # Baştan, kullanıcı alanından kopyala
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            progress.done = progress.reported = 0
+        shutil.copyfileobj(fsrc, _ProgressWriter(fdst, progress), COPY_BUFFER)
+    return 'copy'
+
+
+def _move_path(src, dest):
+    """Aynı dosya sisteminde rename, farklı disklerde kopyala + sil."""
+    try:
+        os.replace(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dest)
+
+
+class LocalStorage(FileSystemStorage):
+    """Kullanıcı klasörlerini bir veya daha fazla köke (disk) dağıtan dosya sistemi deposu."""
+
+    is_local = True
+
+    def __init__(self, roots=None, **kwargs):
+        super().__init__(**kwargs)
+        self._roots = roots
+        self._volumes = {}
+        self._volumes_lock = threading.Lock()
+
+    @property
+    def roots(self):
+        return [os.path.abspath(r) for r in (self._roots or storage_roots())]
+
+    @property
+    def base_location(self):
+        return self.roots[0]
+
+    @property
+    def location(self):
+        return self.roots[0]
+
+    def _emptiest(self, roots):
+        def free(root):
+            try:
+                return shutil.disk_usage(root).free
+            except OSError:
+                return -1
+        return max(roots, key=free)
+
+    def volume(self, folder):
+        """Kullanıcı klasörünün bulunduğu (yoksa oluşturulacağı) kök."""
+        roots = self.roots
+        if len(roots) == 1 or not folder or folder in ('.', '..'):
+            return roots[0]
+        root = self._volumes.get(folder)
+        if root in roots:
+            return root
+        root = next((r for r in roots if os.path.isdir(os.path.join(r, folder))), None)
+        if root is None:
+            # Klasör oluşana kadar önbelleğe alınmaz; ilk yazma nereye yaparsa orada kalır
+            return self._emptiest(roots)
+        with self._volumes_lock:
+            self._volumes[folder] = root
+        return root
+
+    def path(self, name):
+        name = os.fspath(name).replace('\\', '/')
+        return safe_join(self.volume(name.split('/', 1)[0]), name)
+
+    def _save(self, name, content):
+        # FileSystemStorage adı ilk köke göre verir; dosyanın yazıldığı köke göre olmalı
+        full_path = os.path.normpath(os.path.join(self.location, super()._save(name, content)))
+        root = next(r for r in self.roots if full_path.startswith(r + os.sep))
+        return os.path.relpath(full_path, root).replace('\\', '/')
+
+    def make_user_folder(self, folder):
+        """Kullanıcı klasörünü ve tip alt klasörlerini oluşturur, yolunu döndürür."""
+        base = self.path(folder)
+        for sub in USER_SUBFOLDERS:
+            os.makedirs(os.path.join(base, sub), exist_ok=True)
+        return base
+
+    def staging_path(self, name):
+        """Yarım yüklemelerin yerel yolu; finalize aynı diskte rename yapabilsin diye kullanıcının kökünde."""
+        return self.path(name)
+
+    def stat(self, name):
+        return os.stat(self.path(name))
+
+    def open_range(self, name, start, length, block_size=READ_BLOCK):
+        """[start, start + length) aralığını parça parça okur."""
+        with open(self.path(name), 'rb') as f:
+            f.seek(start)
+            while length > 0:
+                block = f.read(min(block_size, length))
+                if not block:
+                    break
+                length -= len(block)
+                yield block
+
+    def copy(self, src, dest):
+        dest_path = self.path(dest)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        return copy_file(self.path(src), dest_path)
+
+    def move(self, src, dest):
+        dest_path = self.path(dest)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        _move_path(self.path(src), dest_path)
+
+    def upload(self, local_file, name, callback=None, remove=False):
+        """Yerel dosyayı depoya koyar; remove ise kaynak taşınır (aynı diskte rename)."""
+        dest = self.path(name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if remove:
+            _move_path(local_file, dest)
+            if callback:
+                callback(os.path.getsize(dest))
+            return 'rename'
+        progress = _Counter()
+        if callback:
+            progress.add = callback
+        return copy_file(local_file, dest, progress)
+
+    def download(self, name, local_file, callback=None):
+        progress = _Counter()
+        if callback:
+            progress.add = callback
+        return copy_file(self.path(name), local_file, progress)
+
+
+class _ObjectReader(io.RawIOBase):
+    """
+    S3 nesnesi için seek edilebilir okuyucu (PIL, özet, ZIP).
+    Sıralı okumalar tek aralık isteğinden devam eder; seek bir sonraki okumada yeni istek açar.
+    """
+
+    def __init__(self, storage, key, size):
+        self.storage = storage
+        self.key = key
+        self.size = size
+        self._pos = 0
+        self._body = None
+        self._body_end = 0
+        self._window = READ_BLOCK
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        offset = max(offset, 0)
+        if offset != self._pos:
+            self._release()
+            self._window = READ_BLOCK
+        self._pos = offset
+        return offset
+
+    def _release(self):
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+
+    def readinto(self, buffer):
+        if self._pos >= self.size or not len(buffer):
+            return 0
+        if self._body is None or self._pos >= self._body_end:
+            self._release()
+            end = min(self._pos + max(self._window, len(buffer)), self.size)
+            self._body = self.storage._get(self.key, self._pos, end - self._pos)
+            self._body_end = end
+            self._window = min(self._window * 2, MAX_READ_WINDOW)
+        data = self._body.read(min(len(buffer), self._body_end - self._pos))
+        if not data:
+            raise OSError(f'Beklenmeyen nesne sonu: {self.key}')
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        self._release()
+        super().close()
+
+
+class S3Storage(Storage):
+    """
+    S3 uyumlu nesne deposu. Ayarlar:
+    DRIVE_S3_BUCKET, DRIVE_S3_ENDPOINT_URL (MinIO vb.), DRIVE_S3_REGION,
+    DRIVE_S3_ACCESS_KEY / DRIVE_S3_SECRET_KEY (boşsa boto3'ün kendi kimlik zinciri), DRIVE_S3_PREFIX.
+    """
+
+    is_local = False
+
+    def __init__(self, bucket=None, prefix=None, endpoint_url=None, region=None, access_key=None, secret_key=None):
+        if boto3 is None:
+            raise ImproperlyConfigured('S3 depolama için boto3 kurulu olmalı')
+        self.bucket = bucket or getattr(settings, 'DRIVE_S3_BUCKET', '')
+        if not self.bucket:
+            raise ImproperlyConfigured('DRIVE_S3_BUCKET belirtilmedi')
+        self.prefix = (prefix if prefix is not None else getattr(settings, 'DRIVE_S3_PREFIX', '')).strip('/')
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or getattr(settings, 'DRIVE_S3_ENDPOINT_URL', '') or None,
+            region_name=region or getattr(settings, 'DRIVE_S3_REGION', '') or None,
+            aws_access_key_id=access_key or getattr(settings, 'DRIVE_S3_ACCESS_KEY', '') or None,
+            aws_secret_access_key=secret_key or getattr(settings, 'DRIVE_S3_SECRET_KEY', '') or None,
+            config=Config(signature_version='s3v4', retries={'max_attempts': 5, 'mode': 'standard'}),
+        )
+
+    def _key(self, name):
+        name = os.fspath(name).replace('\\', '/').lstrip('/')
+        return f'{self.prefix}/{name}' if self.prefix else name
+
+    def _transfer_config(self, callback=None):
+        # İlerleme bildirimi (veritabanı, iptal kontrolü) çağıran thread'de yapılabilsin
+        return TransferConfig(multipart_threshold=MULTIPART_CHUNK, multipart_chunksize=MULTIPART_CHUNK,
+                              max_concurrency=4, use_threads=callback is None)
+
+    def _head(self, name):
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                raise FileNotFoundError(name)
+            raise
+
+    def _get(self, key, start, length):
+        return self.client.get_object(
+            Bucket=self.bucket, Key=key, Range=f'bytes={start}-{start + length - 1}'
+        )['Body']
+
+    # --- Django Storage ---
+
+    def _open(self, name, mode='rb'):
+        if 'w' in mode or 'a' in mode or '+' in mode:
+            raise ValueError('S3 nesneleri sadece okunabilir açılır')
+        size = self._head(name)['ContentLength']
+        return File(io.BufferedReader(_ObjectReader(self, self._key(name), size), READ_BLOCK), name)
+
+    def _save(self, name, content):
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        self.client.upload_fileobj(content, self.bucket, self._key(name), Config=self._transfer_config())
+        return name
+
+    def delete(self, name):
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+        except ClientError as e:
+            raise OSError(str(e)) from e
+
+    def exists(self, name):
+        try:
+            self._head(name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name):
+        return self._head(name)['ContentLength']
+
+    def get_modified_time(self, name):
+        return self._head(name)['LastModified']
+
+    def listdir(self, path):
+        prefix = self._key(path).rstrip('/')
+        prefix = f'{prefix}/' if prefix else ''
+        directories, names = [], []
+        for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/'):
+            directories.extend(p['Prefix'][len(prefix):].rstrip('/') for p in page.get('CommonPrefixes', []))
+            names.extend(o['Key'][len(prefix):] for o in page.get('Contents', []))
+        return directories, names
+
+    def url(self, name):
+        from .serving import link_max_age
+
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self._key(name)}, ExpiresIn=link_max_age(),
+        )
+
+    # --- Büyük dosya işlemleri ---
+
+    def make_user_folder(self, folder):
+        # Nesne deposunda klasör yoktur, önekler ilk dosyayla oluşur
+        return f's3://{self.bucket}/{self._key(folder)}'
+
+    def staging_path(self, name):
+        """Yarım yüklemeler yerelde (DRIVE_STAGING_ROOT) tutulur, finalize tek seferde yükler."""
+        root = getattr(settings, 'DRIVE_STAGING_ROOT', '') or os.path.join(settings.BASE_DIR, 'cache', 'uploads')
+        return safe_join(root, name)
+
+    def stat(self, name):
+        head = self._head(name)
+        mtime = head['LastModified'].timestamp()
+        return SimpleNamespace(st_size=head['ContentLength'], st_mtime=mtime,
+                               st_mtime_ns=int(mtime * 1_000_000_000), st_mode=stat.S_IFREG)
+
+    def open_range(self, name, start, length, block_size=READ_BLOCK):
+        if length <= 0:
+            return
+        body = self._get(self._key(name), start, length)
+        try:
+            yield from body.iter_chunks(block_size)
+        finally:
+            body.close()
+
+    def copy(self, src, dest):
+        # Sunucu tarafı kopya (büyük nesnelerde çok parçalı UploadPartCopy)
+        try:
+            self.client.copy({'Bucket': self.bucket, 'Key': self._key(src)}, self.bucket, self._key(dest),
+                             Config=self._transfer_config())
+        except ClientError as e:
+            raise OSError(str(e)) from e
+        return 'server_copy'
+
+    def move(self, src, dest):
+        self.copy(src, dest)
+        self.delete(src)
+
+    def upload(self, local_file, name, callback=None, remove=False):
+        self.client.upload_file(local_file, self.bucket, self._key(name), Callback=callback,
+                                Config=self._transfer_config(callback))
+        if remove:
+            os.remove(local_file)
+        return 'upload'
+
+    def download(self, name, local_file, callback=None):
+        self.client.download_file(self.bucket, self._key(name), local_file, Callback=callback,
+                                  Config=self._transfer_config(callback))
+        return 'download'
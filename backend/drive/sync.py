@@ -0,0 +1,361 @@
+"""
+Dosya sistemi ile veritabanı arasındaki artımlı eşitleme.
+
+Her klasör için son taramanın görüntüsü (DirectorySnapshot) tutulur.
+Klasörün mtime'ı değişmediyse klasör tekrar taranmaz; değişen klasörlerde
+sadece eklenen / silinen / değişen dosyalar veritabanına toplu olarak yazılır.
+Nesne deposunda (S3) dosyalar sadece API üzerinden eklendiği için tarama yapılmaz.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FileItem, DirectorySnapshot, SyncState
+from . import hashing, journal, metadata, storage, thumbnails, transfers
+from .tasks import enqueue
+from .uploads import purge_stale_sessions
+
+TYPE_FOLDERS = {
+    'FILE': 'Dosyalar',
+    'PHOTO': 'Fotograflar',
+}
+
+# (alt klasör, favori mi, çöpte mi)
+LOCATIONS = (
+    ('', False, False),
+    ('Favoriler', True, False),
+    ('CopKutusu', False, True),
+)
+
+# mtime'ı bu kadar yeni olan klasörlerin görüntüsüne güvenilmez;
+# aynı saat diliminde gelen değişiklikler kaçmasın diye bir sonraki istekte yeniden taranır.
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+BATCH_SIZE = 500
+
+# Bu süreden uzun kuyrukta / çalışır görünen iş (ör. süreç öldü) yeniden başlatılabilir
+STALE_JOB_AFTER = timedelta(minutes=10)
+TRASH_PURGE_INTERVAL = timedelta(hours=1)
+
+
+def _rel_path(*parts):
+    return os.path.join(*[p for p in parts if p]).replace('\\', '/')
+
+
+def _scan_dir(full_path):
+    """Klasördeki dosyaları tek geçişte okur: {ad: [boyut, mtime_ns]}"""
+    entries = {}
+    try:
+        with os.scandir(full_path) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries[entry.name] = [st.st_size, st.st_mtime_ns]
+    except OSError:
+        pass
+    return entries
+
+
+def _chunks(seq, size=BATCH_SIZE):
+    seq = list(seq)
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def purge_expired_trash(user, days=30):
+    """Belirtilen günden eski çöpleri diskten ve veritabanından siler."""
+    cleanup_time = timezone.now() - timedelta(days=days)
+    old_trash = (
+        FileItem.objects.filter(user=user, trashed_at__lt=cleanup_time)
+        .only('id', 'user_id', 'file', *FileItem.USAGE_FIELDS)
+    )
+    files = storage.files()
+    items = []
+    for item in old_trash:
+        if item.file:
+            try:
+                files.delete(item.file.name)
+            except OSError:
+                pass
+        thumbnails.invalidate(item.pk)
+        items.append(item)
+    with transaction.atomic():
+        for chunk in _chunks(items):
+            FileItem.objects.filter(pk__in=[item.pk for item in chunk]).delete()
+        journal.record_entries([journal.entry(item, 'delete') for item in items])
+    return len(items)
+
+
+def reconcile_user(user):
+    """
+    Kullanıcının klasörlerini (Ana, Favoriler, Çöp Kutusu) veritabanı ile eşitler.
+    Değişmeyen klasörlere dokunmaz. Yapılan değişikliklerin özetini döndürür.
+    """
+    stats = {'created': 0, 'updated': 0, 'deleted': 0, 'scanned_dirs': 0}
+    if not storage.files().is_local:
+        return stats
+    user_folder_name = user.get_user_folder()
+    snapshots = {s.path: s for s in DirectorySnapshot.objects.filter(user=user)}
+
+    for file_type, folder_name in TYPE_FOLDERS.items():
+        result = _reconcile_type(user, user_folder_name, file_type, folder_name, snapshots)
+        for key, value in result.items():
+            stats[key] += value
+    return stats
+
+
+def _reconcile_type(user, user_folder_name, file_type, folder_name, snapshots):
+    files = storage.files()
+    stats = {'created': 0, 'updated': 0, 'deleted': 0, 'scanned_dirs': 0}
+    scan_started_ns = time.time_ns()
+
+    # --- 1. Hangi klasörler değişmiş? ---
+    dirs = []
+    full_scan = False
+    for sub, is_fav, is_trash in LOCATIONS:
+        rel_dir = _rel_path(user_folder_name, folder_name, sub)
+        full_dir = files.path(rel_dir)
+        try:
+            mtime_ns = os.stat(full_dir).st_mtime_ns
+        except FileNotFoundError:
+            try:
+                os.makedirs(full_dir, exist_ok=True)
+                mtime_ns = os.stat(full_dir).st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+        snapshot = snapshots.get(rel_dir)
+        if snapshot is None:
+            full_scan = True
+        changed = snapshot is None or snapshot.mtime_ns != mtime_ns
+        dirs.append({
+            'sub': sub, 'rel_dir': rel_dir, 'full_dir': full_dir,
+            'is_fav': is_fav, 'is_trash': is_trash,
+            'mtime_ns': mtime_ns, 'snapshot': snapshot, 'changed': changed,
+        })
+
+    if not any(d['changed'] for d in dirs):
+        return stats
+
+    # --- 2. Sadece değişen klasörleri tara ---
+    touched = set()
+    for d in dirs:
+        old_entries = d['snapshot'].entries if d['snapshot'] else {}
+        if d['changed']:
+            d['entries'] = _scan_dir(d['full_dir'])
+            stats['scanned_dirs'] += 1
+            for name, meta in d['entries'].items():
+                if old_entries.get(name) != meta:
+                    touched.add(name)
+            touched.update(name for name in old_entries if name not in d['entries'])
+        else:
+            d['entries'] = old_entries
+
+    # Fiziksel konum: ad -> (klasör bilgisi, [boyut, mtime_ns]). Aynı ad birden fazla yerdeyse sonuncusu geçerli.
+    physical = {}
+    for d in dirs:
+        for name, meta in d['entries'].items():
+            physical[name] = (d, meta)
+
+    # --- 3. İlgili DB kayıtlarını yükle ---
+    fields = ('id', 'file', 'filename', 'size', 'mtime_ns', 'is_favorite', 'trashed_at', 'user_id', 'file_type',
+              'content_hash', 'content_md5', 'created_at')
+    base_qs = FileItem.objects.filter(user=user, file_type=file_type).only(*fields)
+    db_items_map = {}
+    if full_scan:
+        for item in base_qs:
+            if item.file:
+                db_items_map[os.path.basename(item.file.name)] = item
+    else:
+        candidates = [_rel_path(d['rel_dir'], name) for name in touched for d in dirs]
+        for chunk in _chunks(candidates):
+            for item in base_qs.filter(file__in=chunk):
+                db_items_map[os.path.basename(item.file.name)] = item
+        touched &= set(db_items_map) | set(physical)
+
+    names = set(db_items_map) | set(physical) if full_scan else touched
+
+    # --- 4. Toplu oluştur / güncelle / sil ---
+    now = timezone.now()
+    to_create, to_update, to_delete = [], [], []
+    changes, content_changed = [], []
+    for name in names:
+        location = physical.get(name)
+        item = db_items_map.get(name)
+        if location is None:
+            if item is not None:
+                to_delete.append(item)
+                thumbnails.invalidate(item.pk)
+            continue
+
+        d, (size, mtime_ns) = location
+        rel = _rel_path(d['rel_dir'], name)
+        if item is None:
+            # Çekim zamanı EXIF okunana kadar dosyanın değiştirilme zamanı
+            to_create.append(FileItem(
+                user=user, file=rel, filename=name, file_type=file_type, size=size, mtime_ns=mtime_ns,
+                is_favorite=d['is_fav'], trashed_at=now if d['is_trash'] else None,
+                taken_at=datetime.fromtimestamp(mtime_ns / 1e9, tz=dt_timezone.utc),
+            ))
+            continue
+
+        needs_save = False
+        op = 'update'
+        if item.file.name != rel:
+            item.file = rel
+            needs_save = True
+            op = 'move'
+        if d['is_trash'] and not item.trashed_at:
+            item.trashed_at = now
+            needs_save = True
+            op = 'trash'
+        elif not d['is_trash'] and item.trashed_at:
+            item.trashed_at = None
+            needs_save = True
+        if item.is_favorite != d['is_fav']:
+            item.is_favorite = d['is_fav']
+            needs_save = True
+        if item.size != size or (item.mtime_ns and item.mtime_ns != mtime_ns):
+            # İçerik değişmiş; özet, küçük resim ve EXIF yeniden hesaplanacak
+            item.content_changed(size, mtime_ns)
+            content_changed.append(item)
+            needs_save = True
+        if needs_save:
+            item.updated_at = now
+            to_update.append(item)
+            changes.append((item, op))
+        elif item.mtime_ns != mtime_ns:
+            # mtime ilk kez öğrenildi; istemciye bildirilecek bir değişiklik yok
+            item.mtime_ns = mtime_ns
+            to_update.append(item)
+
+    with transaction.atomic():
+        if to_create:
+            FileItem.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+        if to_update:
+            FileItem.objects.bulk_update(
+                to_update, FileItem.METADATA_FIELDS + FileItem.CONTENT_FIELDS, batch_size=BATCH_SIZE,
+            )
+        for chunk in _chunks(to_delete):
+            FileItem.objects.filter(pk__in=[item.pk for item in chunk]).delete()
+        journal.record_entries(
+            [journal.entry(item, 'create') for item in to_create]
+            + [journal.entry(item, op) for item, op in changes]
+            + [journal.entry(item, 'delete') for item in to_delete]
+        )
+
+        for d in dirs:
+            if not d['changed']:
+                continue
+            # Tarama sırasında değişmiş olabilecek klasörün görüntüsüne güvenme
+            mtime_ns = d['mtime_ns']
+            if mtime_ns >= scan_started_ns - RACY_WINDOW_NS:
+                mtime_ns = 0
+            snapshot = d['snapshot'] or DirectorySnapshot(user=user, path=d['rel_dir'])
+            snapshot.mtime_ns = mtime_ns
+            snapshot.entries = d['entries']
+            snapshot.entry_count = len(d['entries'])
+            snapshot.save()
+            snapshots[d['rel_dir']] = snapshot
+
+    for item in content_changed:
+        thumbnails.invalidate(item.pk)
+    thumbnails.schedule_pregenerate(to_create + content_changed)
+    hashing.schedule_hashing(to_create + to_update)
+    metadata.schedule_extraction(to_create + content_changed)
+
+    stats['created'] = len(to_create)
+    stats['updated'] = len(changes)
+    stats['deleted'] = len(to_delete)
+    return stats
+
+
+def _get_state(user):
+    try:
+        state, _ = SyncState.objects.get_or_create(user=user)
+    except IntegrityError:
+        state = SyncState.objects.get(user=user)
+    return state
+
+
+def purge_due(user):
+    """Saatlik bakım (çöp, yarım yüklemeler, günlük) zamanı geldi mi."""
+    return not SyncState.objects.filter(user=user, last_purged_at__gte=timezone.now() - TRASH_PURGE_INTERVAL).exists()
+
+
+def schedule_reconcile(user):
+    """
+    Kullanıcı için eşitleme işini kuyruğa alır.
+    Kuyrukta bekleyen iş varsa yenisi açılmaz; tarama sürüyorsa bittiğinde bir kez daha çalışması işaretlenir.
+    True sadece yeni iş kuyruğa alındıysa döner.
+    """
+    state = _get_state(user)
+    now = timezone.now()
+    stale = now - STALE_JOB_AFTER
+    idle = SyncState.objects.filter(pk=state.pk).filter(
+        Q(queued=False) | Q(queued_at__lt=stale)
+    ).filter(Q(running=False) | Q(started_at__lt=stale))
+    if idle.update(queued=True, queued_at=now):
+        enqueue('drive.sync.reconcile_job', str(user.pk))
+        return True
+    SyncState.objects.filter(pk=state.pk, running=True, queued=False).update(queued=True, queued_at=now)
+    return False
+
+
+def reconcile_job(user_id):
+    """Arka plan işi: çöp temizliği (saatte bir) ve dosya sistemi eşitlemesi."""
+    user = get_user_model().objects.get(pk=user_id)
+    states = SyncState.objects.filter(user_id=user_id)
+    stale = timezone.now() - STALE_JOB_AFTER
+    if not states.filter(Q(running=False) | Q(started_at__lt=stale)).update(
+        queued=False, running=True, started_at=timezone.now()
+    ):
+        # Aynı kullanıcı için tarama sürüyor; o iş bitince tekrar çalışacak
+        return None
+
+    stats = None
+    while True:
+        state = states.get()
+        done = {'running': False, 'last_error': ''}
+        try:
+            if not state.last_purged_at or state.last_purged_at < timezone.now() - TRASH_PURGE_INTERVAL:
+                purge_expired_trash(user)
+                purge_stale_sessions(user)
+                journal.prune(user)
+                transfers.recover_stale_jobs(user)
+                done['last_purged_at'] = timezone.now()
+            stats = reconcile_user(user)
+            done['last_synced_at'] = timezone.now()
+        except Exception as e:
+            done['last_error'] = str(e)
+            states.update(**done)
+            # Tarama sürerken gelen istek kaybolmasın: queued=True kalırsa schedule_reconcile yeni iş açmaz
+            if states.filter(queued=True, running=False).update(queued_at=timezone.now()):
+                enqueue('drive.sync.reconcile_job', str(user_id))
+            raise
+        states.update(**done)
+        # Tarama sürerken yeni istek geldiyse bir tur daha
+        if not states.filter(queued=True, running=False).update(
+            queued=False, running=True, started_at=timezone.now()
+        ):
+            return stats
+
+
+def sync_status(user):
+    """İstemcilerin verinin ne kadar güncel olduğunu anlaması için eşitleme durumu."""
+    state = _get_state(user)
+    return {
+        'last_synced_at': state.last_synced_at,
+        'pending': state.queued,
+        'running': state.running,
+        'backlog': SyncState.objects.filter(Q(queued=True) | Q(running=True)).count(),
+        'last_error': state.last_error or None,
+    }
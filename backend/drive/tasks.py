@@ -0,0 +1,65 @@
+"""
+Arka plan işleri.
+
+İşler, çağrılacak fonksiyonun tam yolu ve JSON'a çevrilebilir argümanlarla kuyruğa alınır.
+DRIVE_TASK_BACKEND ayarına göre:
+    'thread' -> süreç içi iş havuzu (broker gerekmez, varsayılan)
+    'celery' -> CELERY_BROKER_URL üzerinden Celery worker'ları
+    'eager'  -> çağıran thread'de hemen çalışır (test / geliştirme)
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DRIVE_TASK_WORKERS', 4),
+                thread_name_prefix='drive-task',
+            )
+        return _executor
+
+
+def run_task(path, args=()):
+    """Kuyruktan gelen işi çalıştırır. Hatalar loglanır, çağırana taşınmaz."""
+    close_old_connections()
+    try:
+        return import_string(path)(*args)
+    except Exception:
+        logger.exception('Arka plan işi başarısız: %s%r', path, tuple(args))
+    finally:
+        close_old_connections()
+
+
+if shared_task is not None:
+    celery_run_task = shared_task(name='drive.run_task')(run_task)
+else:
+    celery_run_task = None
+
+
+def enqueue(path, *args):
+    """path ile verilen fonksiyonu seçili arka plan altyapısında çalıştırır."""
+    backend = getattr(settings, 'DRIVE_TASK_BACKEND', 'thread')
+    if backend == 'eager':
+        run_task(path, args)
+    elif backend == 'celery' and celery_run_task is not None:
+        celery_run_task.delay(path, list(args))
+    else:
+        _get_executor().submit(run_task, path, args)
@@ -1,3 +1,534 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+from core.models import User
+
+from . import aio, journal, search, storage, thumbnails, transfers, uploads
+from .models import ChangeJournal, FileItem, SyncState, TransferJob, UploadSession
+
+
+class DriveTestCase(TestCase):
+    """Geçici MEDIA_ROOT / önbellek klasörleriyle, arka plan işleri aynı thread'de çalışır."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(self.tmp, 'media'),
+            THUMBNAIL_CACHE_ROOT=os.path.join(self.tmp, 'thumbnails'),
+            DRIVE_STAGING_ROOT=os.path.join(self.tmp, 'staging'),
+            DRIVE_TASK_BACKEND='eager',
+            DRIVE_WATCHER='off',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = self.make_user('onur')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def make_user(self, name):
+        user = User.objects.create_user(phone_number=name, password='x', username=name, user_folder=name.upper())
+        storage.files().make_user_folder(user.user_folder)
+        return user
+
+
+class ChunkedUploadTests(DriveTestCase):
+    data = os.urandom(3 * 1024 + 17)
+
+    def open_session(self):
+        response = self.client.post('/api/drive/uploads', {'filename': 'video.bin', 'size': len(self.data)})
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, session_id, start, end):
+        return self.client.generic(
+            'PUT', f'/api/drive/uploads/{session_id}', self.data[start:end],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(self.data)}',
+        )
+
+    def test_chunks_and_finalize(self):
+        session_id = self.open_session()
+        self.assertEqual(self.put(session_id, 0, 2048).json()['offset'], 2048)
+        # Offset'i tutmayan parça reddedilir, istemci kaldığı yeri öğrenir
+        response = self.put(session_id, 1024, 2048)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 2048)
+        self.assertEqual(self.put(session_id, 2048, len(self.data)).json()['offset'], len(self.data))
+
+        response = self.client.post(f'/api/drive/uploads/{session_id}/finalize')
+        self.assertEqual(response.status_code, 201)
+        item = FileItem.objects.get(pk=response.json()['id'])
+        self.assertEqual(item.size, len(self.data))
+        self.assertEqual(item.content_hash, hashlib.sha256(self.data).hexdigest())
+        with storage.files().open(item.file.name) as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, 'COMPLETED')
+        self.assertNotIn(session_id, uploads._hashers)
+
+    def test_finalize_incomplete(self):
+        session_id = self.open_session()
+        self.put(session_id, 0, 1024)
+        response = self.client.post(f'/api/drive/uploads/{session_id}/finalize')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1024)
+
+    def test_concurrent_finalize_creates_one_item(self):
+        session_id = self.open_session()
+        self.put(session_id, 0, len(self.data))
+        first, second = UploadSession.objects.get(pk=session_id), UploadSession.objects.get(pk=session_id)
+        uploads.finalize(first)
+        with self.assertRaises(uploads.UploadError) as ctx:
+            uploads.finalize(second)
+        self.assertEqual(ctx.exception.status, 409)
+        self.assertEqual(FileItem.objects.filter(user=self.user).count(), 1)
+
+    def test_finalize_in_progress_is_rejected(self):
+        session_id = self.open_session()
+        self.put(session_id, 0, len(self.data))
+        session = UploadSession.objects.get(pk=session_id)
+        UploadSession.objects.filter(pk=session_id).update(status='FINALIZING')
+        with self.assertRaises(uploads.UploadError) as ctx:
+            uploads.finalize(session)
+        self.assertEqual(ctx.exception.message, 'Yükleme zaten tamamlanıyor')
+
+    def test_failed_finalize_reopens_session(self):
+        session_id = self.open_session()
+        self.put(session_id, 0, len(self.data))
+        session = UploadSession.objects.get(pk=session_id)
+        os.remove(storage.files().staging_path(session.staging_path))
+        response = self.client.post(f'/api/drive/uploads/{session_id}/finalize')
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, 'ACTIVE')
+
+    def test_purge_stale_sessions_drops_hasher(self):
+        session_id = self.open_session()
+        self.put(session_id, 0, 1024)
+        session = UploadSession.objects.get(pk=session_id)
+        self.assertIn(session.pk, uploads._hashers)
+        UploadSession.objects.filter(pk=session_id).update(updated_at=timezone.now() - timedelta(days=8))
+        uploads.purge_stale_sessions(self.user)
+        self.assertNotIn(session.pk, uploads._hashers)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, 'ABORTED')
+
+    def test_idle_hasher_is_evicted(self):
+        idle_id = self.open_session()
+        self.put(idle_id, 0, 1024)
+        session = UploadSession.objects.get(pk=idle_id)
+        hasher, used = uploads._hashers[session.pk]
+        uploads._hashers[session.pk] = (hasher, used - uploads.HASHER_MAX_IDLE - 1)
+        self.put(self.open_session(), 0, 1024)
+        self.assertNotIn(session.pk, uploads._hashers)
+        # Özet düşse de finalize dosyayı okuyarak doğru özeti bulur
+        self.put(idle_id, 1024, len(self.data))
+        item = uploads.finalize(UploadSession.objects.get(pk=idle_id))
+        self.assertEqual(item.content_hash, hashlib.sha256(self.data).hexdigest())
+
+
+@override_settings(DRIVE_CHANGES_COMMIT_GRACE=0)
+class JournalTokenTests(DriveTestCase):
+    def change(self, item_id, op='update', age=0):
+        change = ChangeJournal.objects.create(user=self.user, item_id=item_id, op=op, data={'filename': op})
+        if age:
+            ChangeJournal.objects.filter(pk=change.pk).update(created_at=timezone.now() - timedelta(seconds=age))
+        return change
+
+    def test_no_token_resets_at_latest_change(self):
+        latest = self.change(uuid.uuid4())
+        result = journal.changes_since(self.user, None)
+        self.assertTrue(result['reset'])
+        self.assertEqual(journal.parse_token(result['token']), latest.pk)
+
+    def test_changes_are_collapsed_per_item(self):
+        token = journal.changes_since(self.user, None)['token']
+        item_id, other_id = uuid.uuid4(), uuid.uuid4()
+        self.change(item_id, 'create')
+        self.change(other_id, 'create')
+        last = self.change(item_id, 'delete')
+        result = journal.changes_since(self.user, token)
+        self.assertFalse(result['reset'])
+        self.assertEqual([(c['id'], c['op']) for c in result['changes']],
+                         [(str(other_id), 'create'), (str(item_id), 'delete')])
+        self.assertEqual(journal.parse_token(result['token']), last.pk)
+        self.assertEqual(journal.changes_since(self.user, result['token'])['changes'], [])
+
+    def test_paging_with_limit(self):
+        token = journal.make_token(0)
+        changes = [self.change(uuid.uuid4()) for _ in range(3)]
+        result = journal.changes_since(self.user, token, limit=2)
+        self.assertTrue(result['has_more'])
+        self.assertEqual(journal.parse_token(result['token']), changes[1].pk)
+        result = journal.changes_since(self.user, result['token'], limit=2)
+        self.assertFalse(result['has_more'])
+        self.assertEqual([c['id'] for c in result['changes']], [str(changes[2].item_id)])
+
+    def test_invalid_or_expired_token_resets(self):
+        expired = f'1.{int(time.time()) - (journal.retention_days() + 1) * 86400}'
+        for token in ('abc', '', expired):
+            self.assertTrue(journal.changes_since(self.user, token)['reset'])
+
+    def test_other_users_changes_are_hidden(self):
+        other = self.make_user('ayse')
+        ChangeJournal.objects.create(user=other, item_id=uuid.uuid4(), op='create', data={})
+        self.assertEqual(journal.changes_since(self.user, journal.make_token(0))['changes'], [])
+
+    @override_settings(DRIVE_CHANGES_COMMIT_GRACE=60)
+    def test_token_stops_before_recent_changes(self):
+        committed = self.change(uuid.uuid4(), age=120)
+        recent = self.change(uuid.uuid4())
+        # Eski id'li kayıt geç commit edilebilir: token yeni kaydın önünde durur
+        self.change(uuid.uuid4(), age=120)
+        result = journal.changes_since(self.user, journal.make_token(0))
+        self.assertEqual([c['id'] for c in result['changes']], [str(committed.item_id)])
+        self.assertEqual(journal.parse_token(result['token']), committed.pk)
+        self.assertFalse(result['has_more'])
+        self.assertEqual(journal.parse_token(journal.changes_since(self.user, None)['token']), recent.pk - 1)
+
+        ChangeJournal.objects.filter(pk=recent.pk).update(created_at=timezone.now() - timedelta(seconds=120))
+        result = journal.changes_since(self.user, result['token'])
+        self.assertEqual(len(result['changes']), 2)
+
+
+@override_settings(DRIVE_MAX_REQUEST_BODY=10)
+class BodyLimitTests(SimpleTestCase):
+    async def call(self, method, path, chunks, headers=()):
+        seen = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                seen.append(message['body'])
+                if not message.get('more_body'):
+                    break
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        messages = [{'type': 'http.request', 'body': c, 'more_body': i < len(chunks) - 1} for i, c in enumerate(chunks)]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': method, 'path': path, 'headers': list(headers)}
+        await aio.limit_body(app)(scope, receive, send)
+        return sent[0]['status'], seen
+
+    async def test_content_length_rejected_before_body_is_read(self):
+        status, seen = await self.call('POST', '/api/drive/files', [b'x' * 20], [(b'content-length', b'20')])
+        self.assertEqual(status, 413)
+        self.assertEqual(seen, [])
+
+    async def test_chunked_body_over_limit(self):
+        status, seen = await self.call('POST', '/api/drive/files', [b'x' * 6, b'x' * 6])
+        self.assertEqual(status, 413)
+        self.assertEqual(seen, [b'x' * 6])
+
+    async def test_body_within_limit(self):
+        status, seen = await self.call('POST', '/api/drive/files', [b'x' * 4, b'x' * 6])
+        self.assertEqual(status, 200)
+        self.assertEqual(b''.join(seen), b'x' * 10)
+
+    async def test_upload_chunks_use_chunk_limit(self):
+        path = f'/api/drive/uploads/{uuid.uuid4()}'
+        status, _ = await self.call('PUT', path, [b'x' * 20], [(b'content-length', b'20')])
+        self.assertEqual(status, 200)
+        length = str(uploads.MAX_CHUNK_SIZE + 1).encode()
+        status, _ = await self.call('PUT', path, [b''], [(b'content-length', length)])
+        self.assertEqual(status, 413)
+
+
+@mock.patch.object(transfers, 'PROGRESS_STEP', 1)
+class TransferMoveTests(DriveTestCase):
+    def setUp(self):
+        super().setUp()
+        shared = storage.shared_dir()
+        shared.mkdir(parents=True, exist_ok=True)
+        self.source = shared / 'rapor.pdf'
+        self.source.write_bytes(b'x' * 100)
+        with self.captureOnCommitCallbacks():
+            self.job = transfers.create_job(self.user, 'MOVE', path='rapor.pdf')
+
+    def test_cancel_before_move_keeps_source(self):
+        TransferJob.objects.filter(pk=self.job.pk).update(cancel_requested=True)
+        transfers.run_job(str(self.job.pk))
+        self.assertEqual(TransferJob.objects.get(pk=self.job.pk).status, 'CANCELLED')
+        self.assertTrue(self.source.exists())
+        self.assertFalse(FileItem.objects.filter(user=self.user).exists())
+
+    def test_cancel_after_rename_completes(self):
+        rename = os.rename
+
+        def rename_then_cancel(src, dest):
+            rename(src, dest)
+            TransferJob.objects.filter(pk=self.job.pk).update(cancel_requested=True)
+
+        with mock.patch.object(transfers.os, 'rename', rename_then_cancel):
+            transfers.run_job(str(self.job.pk))
+        job = TransferJob.objects.get(pk=self.job.pk)
+        self.assertEqual((job.status, job.method, job.done_bytes), ('COMPLETED', 'rename', 100))
+        self.assertFalse(self.source.exists())
+        with storage.files().open(job.file_item.file.name) as f:
+            self.assertEqual(f.read(), b'x' * 100)
+
+    def test_interrupted_job_marked_failed(self):
+        with mock.patch.object(transfers, '_to_user', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                transfers.run_job(str(self.job.pk))
+        self.assertEqual(TransferJob.objects.get(pk=self.job.pk).status, 'FAILED')
+        self.assertTrue(self.source.exists())
+
+    def test_recover_stale_jobs(self):
+        old = timezone.now() - transfers.STALE_RUNNING_AFTER - timedelta(minutes=1)
+        with self.captureOnCommitCallbacks():
+            running = transfers.create_job(self.user, 'MOVE', path='rapor.pdf')
+        TransferJob.objects.filter(pk=running.pk).update(status='RUNNING', updated_at=old)
+        TransferJob.objects.filter(pk=self.job.pk).update(updated_at=old)
+        self.assertEqual(transfers.recover_stale_jobs(self.user), (1, 1))
+        self.assertEqual(TransferJob.objects.get(pk=running.pk).status, 'FAILED')
+        # Kuyruğa tekrar alınan iş (eager) çalışıp tamamlanır
+        self.assertEqual(TransferJob.objects.get(pk=self.job.pk).status, 'COMPLETED')
+        self.assertEqual(transfers.recover_stale_jobs(self.user), (0, 0))
+
+
+class SearchTests(DriveTestCase):
+    def note(self, title, body='', user=None):
+        note = mock.Mock(pk=uuid.uuid4(), user_id=(user or self.user).pk, title=title, content=body)
+        search.index_notes([note])
+        return note.pk
+
+    def test_ranked_in_sql(self):
+        in_body = self.note('alışveriş', 'istanbul fatura')
+        in_title = self.note('İstanbul fatura mart')
+        exact = self.note('ISTANBUL')
+        hits = search.search(self.user, 'istanbul')
+        self.assertEqual([object_id for _, object_id, _ in hits], [exact, in_title, in_body])
+        self.assertGreater(hits[0][2], hits[-1][2])
+
+    def test_prefix_kind_and_user_filters(self):
+        mine = self.note('Özgeçmiş 2024')
+        self.note('özgeçmiş', user=self.make_user('ayse'))
+        self.assertEqual([object_id for _, object_id, _ in search.search(self.user, 'ozge')], [mine])
+        self.assertEqual(search.search(self.user, 'ozge', kinds=['file']), [])
+        self.assertEqual(search.search(self.user, '  '), [])
+
+
+@skipUnless(mock_aws, 'boto3 / moto kurulu değil')
+class S3StorageTests(DriveTestCase):
+    bucket = 'mobiltools-test'
+    data = os.urandom(storage.READ_BLOCK * 2 + 123)
+
+    def setUp(self):
+        super().setUp()
+        for name, value in (('AWS_ACCESS_KEY_ID', 'test'), ('AWS_SECRET_ACCESS_KEY', 'test'),
+                            ('AWS_DEFAULT_REGION', 'us-east-1')):
+            patcher = mock.patch.dict(os.environ, {name: value})
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket=self.bucket)
+        self.s3 = storage.S3Storage(bucket=self.bucket, prefix='drive', region='us-east-1')
+
+    def object_keys(self):
+        return [o['Key'] for o in self.s3.client.list_objects_v2(Bucket=self.bucket).get('Contents', [])]
+
+    def test_put_and_read(self):
+        from django.core.files.base import ContentFile
+
+        name = self.s3.save('ONUR/Dosyalar/a.bin', ContentFile(self.data))
+        self.assertEqual(self.object_keys(), ['drive/ONUR/Dosyalar/a.bin'])
+        self.assertTrue(self.s3.exists(name))
+        self.assertEqual(self.s3.size(name), len(self.data))
+        self.assertEqual(self.s3.stat(name).st_size, len(self.data))
+        with self.s3.open(name) as f:
+            self.assertEqual(f.read(), self.data)
+            f.seek(-10, os.SEEK_END)
+            self.assertEqual(f.read(), self.data[-10:])
+        self.assertEqual(self.s3.listdir('ONUR/Dosyalar'), ([], ['a.bin']))
+        self.s3.delete(name)
+        self.assertFalse(self.s3.exists(name))
+        with self.assertRaises(FileNotFoundError):
+            self.s3.stat(name)
+
+    def test_open_range(self):
+        self.s3.client.put_object(Bucket=self.bucket, Key='drive/a.bin', Body=self.data)
+        start, length = storage.READ_BLOCK - 5, storage.READ_BLOCK + 10
+        self.assertEqual(b''.join(self.s3.open_range('a.bin', start, length, block_size=4096)),
+                         self.data[start:start + length])
+        self.assertEqual(list(self.s3.open_range('a.bin', 0, 0)), [])
+
+    def test_copy_and_move(self):
+        self.s3.client.put_object(Bucket=self.bucket, Key='drive/a.bin', Body=self.data)
+        self.assertEqual(self.s3.copy('a.bin', 'b.bin'), 'server_copy')
+        self.s3.move('b.bin', 'c.bin')
+        self.assertEqual(sorted(self.object_keys()), ['drive/a.bin', 'drive/c.bin'])
+        with self.s3.open('c.bin') as f:
+            self.assertEqual(f.read(), self.data)
+        with self.assertRaises(OSError):
+            self.s3.copy('yok.bin', 'd.bin')
+
+    def test_upload_and_download_report_progress(self):
+        local = os.path.join(self.tmp, 'a.bin')
+        with open(local, 'wb') as f:
+            f.write(self.data)
+        sent, received = [], []
+        self.assertEqual(self.s3.upload(local, 'a.bin', callback=sent.append, remove=True), 'upload')
+        self.assertFalse(os.path.exists(local))
+        self.assertEqual(sum(sent), len(self.data))
+        self.s3.download('a.bin', local, callback=received.append)
+        self.assertEqual(sum(received), len(self.data))
+        with open(local, 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_chunked_upload_finalize(self):
+        with override_settings(DRIVE_STORAGE_BACKEND='s3', DRIVE_S3_BUCKET=self.bucket, DRIVE_S3_PREFIX='drive',
+                               DRIVE_S3_REGION='us-east-1',
+                               STORAGES={**settings.STORAGES, 'default': {'BACKEND': 'drive.storage.S3Storage'}}):
+            response = self.client.post('/api/drive/uploads', {'filename': 'video.bin', 'size': len(self.data)})
+            session_id = response.json()['id']
+            response = self.client.generic(
+                'PUT', f'/api/drive/uploads/{session_id}', self.data, content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE=f'bytes 0-{len(self.data) - 1}/{len(self.data)}',
+            )
+            self.assertEqual(response.json()['offset'], len(self.data))
+            response = self.client.post(f'/api/drive/uploads/{session_id}/finalize')
+            self.assertEqual(response.status_code, 201)
+            item = FileItem.objects.get(pk=response.json()['id'])
+            self.assertEqual(item.content_hash, hashlib.sha256(self.data).hexdigest())
+            self.assertEqual(self.object_keys(), [f'drive/{item.file.name}'])
+            with storage.files().open(item.file.name) as f:
+                self.assertEqual(f.read(), self.data)
+
+
+@mock.patch('drive.views.schedule_reconcile')
+class KeysetPaginationTests(DriveTestCase):
+    def setUp(self):
+        super().setUp()
+        base = timezone.now() - timedelta(days=1)
+        self.items = []
+        # Aynı created_at'e sahip kayıtlar id ile ayrışır
+        for i, minutes in enumerate((0, 5, 5, 5, 10, 20, 20)):
+            item = FileItem.objects.create(user=self.user, file=f'ONUR/Dosyalar/{i}.jpg', filename=f'{i}.jpg', size=i,
+                                           file_type='PHOTO' if i % 2 else 'FILE')
+            FileItem.objects.filter(pk=item.pk).update(created_at=base + timedelta(minutes=minutes),
+                                                       taken_at=base - timedelta(minutes=minutes))
+            self.items.append(FileItem.objects.get(pk=item.pk))
+        FileItem.objects.create(user=self.make_user('ayse'), file='AYSE/Dosyalar/x.jpg', size=1)
+
+    def pages(self, params):
+        ids, cursor = [], None
+        while True:
+            response = self.client.get('/api/drive/files', {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(len(body['results']), int(params['limit']))
+            ids.extend(row['id'] for row in body['results'])
+            cursor = body['next']
+            if cursor is None:
+                return ids
+
+    def expected(self, field):
+        ordered = sorted(self.items, key=lambda item: (getattr(item, field), item.pk), reverse=True)
+        return [str(item.pk) for item in ordered]
+
+    def test_pages_cover_every_item_once(self, _):
+        for limit in (1, 2, 3, 7, 100):
+            self.assertEqual(self.pages({'limit': limit}), self.expected('created_at'))
+
+    def test_sort_by_taken(self, _):
+        self.assertEqual(self.pages({'limit': 2, 'sort': 'taken'}), self.expected('taken_at'))
+
+    def test_filters_apply_before_paging(self, _):
+        photos = [str(item.pk) for item in self.items if item.file_type == 'PHOTO']
+        self.assertEqual(set(self.pages({'limit': 2, 'file_type': 'PHOTO'})), set(photos))
+        FileItem.objects.filter(pk=self.items[0].pk).update(trashed_at=timezone.now())
+        self.assertNotIn(str(self.items[0].pk), self.pages({'limit': 2}))
+        self.assertEqual(self.pages({'limit': 2, 'trash': 'true'}), [str(self.items[0].pk)])
+
+    def test_without_limit_returns_full_list(self, _):
+        response = self.client.get('/api/drive/files')
+        self.assertEqual([row['id'] for row in response.json()], self.expected('created_at'))
+
+    def test_invalid_cursor_and_sort(self, _):
+        self.assertEqual(self.client.get('/api/drive/files', {'cursor': 'bozuk'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/drive/files', {'limit': 2, 'sort': 'boyut'}).status_code, 400)
+
+
+class ThumbnailCacheTests(DriveTestCase):
+    def setUp(self):
+        super().setUp()
+        from PIL import Image
+
+        name = 'ONUR/Fotograflar/kedi.png'
+        path = storage.files().path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        Image.new('RGB', (64, 48), 'red').save(path)
+        self.item = FileItem.objects.create(user=self.user, file=name, filename='kedi.png', file_type='PHOTO',
+                                            size=os.path.getsize(path))
+
+    def assert_cache_kept(self, cached):
+        item = FileItem.objects.get(pk=self.item.pk)
+        self.assertTrue(os.path.exists(cached))
+        self.assertEqual(thumbnails.get_thumbnail(item)[0], cached)
+
+    def test_moves_keep_cached_thumbnails(self):
+        cached, _, _ = thumbnails.get_thumbnail(self.item)
+        self.assertEqual(self.client.post(f'/api/drive/files/{self.item.pk}/toggle_favorite').status_code, 200)
+        self.assert_cache_kept(cached)
+        self.assertEqual(self.client.delete(f'/api/drive/files/{self.item.pk}').status_code, 204)
+        self.assert_cache_kept(cached)
+        self.assertEqual(self.client.post(f'/api/drive/files/{self.item.pk}/restore?trash=true').status_code, 200)
+        self.assert_cache_kept(cached)
+        response = self.client.post('/api/drive/files/batch', {'ids': [str(self.item.pk)], 'action': 'favorite'},
+                                    format='json')
+        self.assertEqual(response.json()['succeeded'], 1)
+        self.assert_cache_kept(cached)
+
+    def test_hard_delete_drops_cache(self):
+        cached, _, _ = thumbnails.get_thumbnail(self.item)
+        self.client.delete(f'/api/drive/files/{self.item.pk}')
+        self.assertEqual(self.client.delete(f'/api/drive/files/{self.item.pk}?trash=true').status_code, 204)
+        self.assertFalse(os.path.exists(cached))
+
+
+class MaintenanceTests(DriveTestCase):
+    @mock.patch('drive.views.watcher.ensure_started', return_value=True)
+    def test_expired_trash_purged_while_watcher_runs(self, _):
+        name = 'ONUR/Dosyalar/CopKutusu/eski.txt'
+        path = storage.files().path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x')
+        item = FileItem.objects.create(user=self.user, file=name, filename='eski.txt', size=1,
+                                       trashed_at=timezone.now() - timedelta(days=31))
+        SyncState.objects.create(user=self.user, last_purged_at=timezone.now() - timedelta(minutes=5))
+        self.client.get('/api/drive/files')
+        self.assertTrue(FileItem.objects.filter(pk=item.pk).exists())
+
+        SyncState.objects.filter(user=self.user).update(last_purged_at=timezone.now() - timedelta(hours=2))
+        self.client.get('/api/drive/files')
+        self.assertFalse(FileItem.objects.filter(pk=item.pk).exists())
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,261 @@
+"""
+Kalıcı küçük resim (thumbnail) önbelleği.
+
+Önbellek dosyaları içerik adresli tutulur: anahtar (dosya id, boyut adı, format,
+kaynağın mtime'ı ve boyutu). Kaynak değişirse anahtar da değişir; dosya taşındığında
+(favori / çöp / geri yükleme) invalidate() ile o dosyanın tüm önbelleği silinir.
+Videoların poster kareleri ve önizleme klipleri de (bkz. video) aynı klasörde tutulur.
+
+    THUMBNAIL_CACHE_ROOT/<id[:2]>/<id>/<boyut>-<özet>.<uzantı>
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image, ExifTags
+
+from .storage import files
+
+logger = logging.getLogger(__name__)
+
+# Boyut adı -> (en uzun kenar, kalite)
+THUMBNAIL_SIZES = {
+    'grid': (400, 60),
+    'preview': (1280, 80),
+    'full': (2560, 85),
+}
+DEFAULT_SIZE = 'grid'
+# HEIC / RAW'dan bir kez çözülen önizlemenin kalitesi (boyutu 'full')
+PREVIEW_QUALITY = 90
+
+FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'WEBP': ('webp', 'image/webp'),
+    'MP4': ('mp4', 'video/mp4'),
+}
+
+
+def cache_root():
+    return getattr(settings, 'THUMBNAIL_CACHE_ROOT', os.path.join(settings.BASE_DIR, 'cache', 'thumbnails'))
+
+
+def _item_dir(item_id):
+    item_id = str(item_id)
+    return os.path.join(cache_root(), item_id[:2], item_id)
+
+
+def cache_key(item_id, size_name, fmt, st):
+    raw = f'{item_id}:{size_name}:{fmt}:{st.st_mtime_ns}:{st.st_size}'
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _exif_thumbnail(img, max_size):
+    """
+    JPEG içine gömülü EXIF önizlemesini döndürür.
+    Önizleme hedef boyuttan küçükse veya en-boy oranı tutmuyorsa None.
+    """
+    try:
+        ifd1 = img.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset, length = ifd1.get(0x0201), ifd1.get(0x0202)
+        raw = img.info.get('exif', b'')
+        if not offset or not length or not raw.startswith(b'Exif\x00\x00'):
+            return None
+        # Ofsetler TIFF başlığına göre, başlık 'Exif\0\0' sonrasında başlar
+        thumb = Image.open(BytesIO(raw[6 + offset:6 + offset + length]))
+        if max(thumb.size) < max_size:
+            return None
+        if abs(thumb.width / thumb.height - img.width / img.height) > 0.02:
+            return None
+        thumb.load()
+        return thumb
+    except Exception:
+        return None
+
+
+def _apply_orientation(img, orientation):
+    method = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT,
+        3: Image.Transpose.ROTATE_180,
+        4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE,
+        6: Image.Transpose.ROTATE_270,
+        7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }.get(orientation)
+    return img.transpose(method) if method is not None else img
+
+
+def _load_image(source_path, max_size):
+    """
+    Kaynağı en az max_size boyutunda, yönü düzeltilmiş ve RGB olarak yükler.
+    JPEG'lerde önce yeterince büyük EXIF önizlemesi denenir, yoksa draft modunda
+    küçültülmüş ölçekte çözülür. EXIF yönü (orientation) aynı geçişte uygulanır.
+    """
+    with Image.open(source_path) as img:
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+        thumb = None
+        if img.format == 'JPEG':
+            thumb = _exif_thumbnail(img, max_size)
+            if thumb is None:
+                # Tam çözünürlük yerine 1/2, 1/4, 1/8 ölçekte çöz
+                img.draft('RGB', (max_size, max_size))
+        if thumb is None:
+            thumb = img
+        thumb.thumbnail((max_size, max_size))
+        thumb = _apply_orientation(thumb, orientation)
+        if thumb.mode not in ('RGB', 'L'):
+            thumb = thumb.convert('RGB')
+        # Küçültme gerekmediyse hâlâ tembel yüklü olabilir; dosya kapanmadan oku
+        thumb.load()
+        return thumb
+
+
+def _encode(img, fmt, quality):
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, quality=quality)
+    return buffer.getvalue()
+
+
+def render_thumbnail(source_path, max_size, fmt='JPEG', quality=60):
+    """Kaynaktan (yol veya açık dosya) küçük resmi üretir ve bayt olarak döndürür."""
+    return _encode(_load_image(source_path, max_size), fmt, quality)
+
+
+def _cache_path(item_id, size_name, fmt, st):
+    key = cache_key(item_id, size_name, fmt, st)
+    return os.path.join(_item_dir(item_id), f'{size_name}-{key[:20]}.{FORMATS[fmt][0]}'), key
+
+
+def _store(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Aynı anda üreten istekler birbirinin yarım dosyasını görmesin
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _marker_path(item_id, st):
+    from . import decoders
+
+    key = cache_key(item_id, 'unsupported', decoders.signature(), st)
+    return os.path.join(_item_dir(item_id), f'unsupported-{key[:20]}')
+
+
+def _decode(item_id, name, st, max_size):
+    """
+    Kaynağı çözücü kaydıyla (bkz. decoders) en az max_size boyutunda yükler.
+    HEIC / RAW gibi kayıtlı çözücüsü olan biçimler bir kez çözülür, JPEG önizleme olarak saklanır;
+    boyutlar ondan türetilir. Açılamayan dosya için işaret bırakılır ve dosya (veya kurulu
+    çözücüler) değişene kadar yeniden denenmez. İki durumda da decoders.Unsupported.
+    """
+    from . import decoders
+
+    marker = _marker_path(item_id, st)
+    if os.path.exists(marker):
+        raise decoders.Unsupported(name)
+    preview = None
+    if decoders.has_decoder(name):
+        preview, _ = _cache_path(item_id, 'decoded', 'JPEG', st)
+        if os.path.exists(preview):
+            return _load_image(preview, max_size)
+    try:
+        with files().open(name) as source:
+            img = decoders.decode(source, name, THUMBNAIL_SIZES['full'][0] if preview else max_size)
+    except decoders.Unsupported as e:
+        _store(marker, str(e).encode())
+        logger.warning('Görüntü çözülemedi (%s): %s', item_id, e)
+        raise
+    if preview:
+        _store(preview, _encode(img, 'JPEG', PREVIEW_QUALITY))
+        img.thumbnail((max_size, max_size))
+    return img
+
+
+def get_thumbnail(item, size_name=DEFAULT_SIZE, fmt='JPEG', loader=None):
+    """
+    Önbellekteki küçük resmi döndürür, yoksa üretip kaydeder.
+    loader(name, max_size) kaynağı PIL görüntüsü olarak yükler (videolar için bkz. video.poster_frame).
+    Dönüş: (dosya yolu, etag, kaynak mtime). Kaynak yoksa FileNotFoundError, çözülemiyorsa decoders.Unsupported.
+    """
+    max_size, quality = THUMBNAIL_SIZES[size_name]
+    st = files().stat(item.file.name)
+    path, key = _cache_path(item.pk, size_name, fmt, st)
+    if not os.path.exists(path):
+        img = loader(item.file.name, max_size) if loader else _decode(item.pk, item.file.name, st, max_size)
+        _store(path, _encode(img, fmt, quality))
+    return path, key, st.st_mtime
+
+
+def pregenerate_formats():
+    return getattr(settings, 'THUMBNAIL_PREGENERATE_FORMATS', ('JPEG', 'WEBP'))
+
+
+def build_all(item_id, name, formats=None, loader=None):
+    """
+    Depodaki dosyanın (name) tüm boyut / format küçük resimlerini üretir (loader: bkz. get_thumbnail).
+    Kaynak en büyük boyut için bir kez çözülür, küçükler ondan türetilir.
+    Önbellekte olanlar atlanır. Üretilen dosya sayısını döndürür.
+    """
+    formats = formats or pregenerate_formats()
+    st = files().stat(name)
+    missing = []
+    for size_name in THUMBNAIL_SIZES:
+        for fmt in formats:
+            path, _ = _cache_path(item_id, size_name, fmt, st)
+            if not os.path.exists(path):
+                missing.append((size_name, fmt, path))
+    if not missing:
+        return 0
+
+    largest = max(THUMBNAIL_SIZES[size_name][0] for size_name, _, _ in missing)
+    img = loader(name, largest) if loader else _decode(item_id, name, st, largest)
+    for size_name, _ in sorted(THUMBNAIL_SIZES.items(), key=lambda kv: -kv[1][0]):
+        max_size, quality = THUMBNAIL_SIZES[size_name]
+        img.thumbnail((max_size, max_size))
+        for name, fmt, path in missing:
+            if name == size_name:
+                _store(path, _encode(img, fmt, quality))
+    return len(missing)
+
+
+def pregenerate(item_ids):
+    """Arka plan işi: verilen fotoğrafların küçük resimlerini önceden üretir."""
+    from . import decoders
+    from .models import FileItem
+
+    for item_id, name in FileItem.objects.filter(pk__in=item_ids, file_type='PHOTO').values_list('id', 'file'):
+        try:
+            build_all(item_id, name)
+        except FileNotFoundError:
+            pass
+        except decoders.Unsupported:
+            # _decode bir kez loglar
+            pass
+        except Exception:
+            logger.exception('Küçük resim üretilemedi: %s', item_id)
+
+
+def schedule_pregenerate(items, batch_size=100):
+    """Yeni oluşturulan fotoğraflar için küçük resim, videolar için poster / klip üretimini kuyruğa alır."""
+    from . import video
+    from .tasks import enqueue
+
+    ids = [str(item.pk) for item in items if item.file_type == 'PHOTO']
+    for i in range(0, len(ids), batch_size):
+        enqueue('drive.thumbnails.pregenerate', ids[i:i + batch_size])
+    video.schedule([item for item in items if video.is_video(item)])
+
+
+def invalidate(item_id):
+    """Dosyaya ait tüm önbellek dosyalarını siler."""
+    shutil.rmtree(_item_dir(item_id), ignore_errors=True)
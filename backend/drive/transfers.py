@@ -0,0 +1,296 @@
+"""
+Sunucu tarafı kopyalama / taşıma işleri (TransferJob).
+
+İstek işi oluşturup hemen döner; kopyalama arka plan kuyruğunda (tasks.enqueue) yapılır.
+Aynı dosya sisteminde veri kullanıcı alanından geçmez:
+
+    taşıma          -> os.rename
+    kopya           -> reflink (FICLONE; btrfs / xfs) -> copy_file_range (Linux, çekirdek içi)
+                       -> DRIVE_DEDUP_HARDLINKS açıksa os.link (bkz. storage.copy_file)
+    diğer durumlar  -> shutil.copyfileobj
+    nesne deposu    -> çok parçalı yükleme / indirme (storage.upload / download)
+
+Veri hedef klasördeki gizli .uploads/<iş id>.part dosyasına yazılır, bitince yerine taşınır;
+yarım dosya listelerde / eşitlemede görünmez. İlerleme her PROGRESS_STEP baytta kaydedilir
+ve aynı anda iptal isteği kontrol edilir.
+
+Kuyruk süreçle birlikte kaybolabilir (thread arka ucu): recover_stale_jobs uzun süredir ilerlemeyen
+RUNNING işleri FAILED yapar, bekleyen QUEUED işleri tekrar kuyruğa alır (bkz. sync.reconcile_job).
+"""
+import errno
+import os
+import posixpath
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import events, hashing, journal, listing, metadata, storage, thumbnails, uploads, usage
+from .models import FileItem, TransferJob, user_directory_path
+
+PROGRESS_STEP = 64 * 1024 * 1024
+# Bu kadar süre ilerleme kaydı olmayan RUNNING iş ölü sayılır; QUEUED iş bu kadar bekledikten sonra tekrar kuyruğa alınır
+STALE_RUNNING_AFTER = timedelta(minutes=30)
+REQUEUE_AFTER = timedelta(minutes=5)
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic')
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+class TransferError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _shared_source(path_param):
+    base = storage.shared_dir().resolve()
+    try:
+        source = (base / (path_param or '').lstrip('/')).resolve()
+    except (OSError, ValueError):
+        return None
+    if source == base or not str(source).startswith(str(base) + os.sep):
+        return None
+    return source
+
+
+def create_job(user, op='COPY', path=None, item_id=None):
+    """
+    İşi doğrular, kaydeder ve kuyruğa alır.
+    path: paylaşılan dosya (kullanıcı alanına), item_id: kullanıcının dosyası (paylaşılana).
+    """
+    if op not in dict(TransferJob.OP_CHOICES):
+        raise TransferError('Geçersiz işlem')
+    if path:
+        source = _shared_source(path)
+        if source is None:
+            raise TransferError('Geçersiz path')
+        if not source.is_file():
+            raise TransferError('Dosya bulunamadı', status=404)
+        job = TransferJob(user=user, op=op, direction='TO_USER', source=path.lstrip('/'),
+                          filename=source.name, total_bytes=source.stat().st_size)
+        if not usage.fits(user, job.total_bytes):
+            raise TransferError('Depolama kotası aşıldı', status=413)
+    elif item_id:
+        item = FileItem.objects.filter(pk=item_id, user=user).first()
+        if item is None:
+            raise TransferError('Dosya bulunamadı', status=404)
+        try:
+            size = storage.files().size(item.file.name)
+        except OSError:
+            raise TransferError('Dosya bulunamadı', status=404)
+        job = TransferJob(user=user, op=op, direction='TO_SHARED', source=str(item.pk),
+                          filename=item.filename or os.path.basename(item.file.name), total_bytes=size)
+    else:
+        raise TransferError('path veya id belirtilmedi')
+    job.save()
+
+    from .tasks import enqueue
+    # İş hemen (eager) çalışırsa bile kayıt commit edilmiş olsun
+    transaction.on_commit(lambda: enqueue('drive.transfers.run_job', str(job.pk)))
+    return job
+
+
+def cancel(job):
+    """Sıradaki iş hemen, çalışan iş bir sonraki ilerleme kaydında iptal edilir."""
+    if TransferJob.objects.filter(pk=job.pk, status='QUEUED').update(status='CANCELLED', updated_at=timezone.now()):
+        job.status = 'CANCELLED'
+        return
+    TransferJob.objects.filter(pk=job.pk, status='RUNNING').update(cancel_requested=True, updated_at=timezone.now())
+    job.refresh_from_db()
+
+
+class _Progress:
+    def __init__(self, job):
+        self.job = job
+        self.done = 0
+        self.reported = 0
+
+    def add(self, count, check=True):
+        self.done += count
+        if self.done - self.reported >= PROGRESS_STEP:
+            self.report(check)
+
+    def report(self, check=True):
+        """İlerlemeyi kaydeder; check ise iptal istendiyse TransferCancelled."""
+        self.reported = self.done
+        TransferJob.objects.filter(pk=self.job.pk).update(done_bytes=self.done, updated_at=timezone.now())
+        if check:
+            self.check_cancelled()
+
+    def check_cancelled(self):
+        if TransferJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise TransferCancelled()
+
+
+def _transfer(job, src, dest_dir, progress):
+    """
+    src'yi dest_dir içine (çakışırsa yeni isimle) taşır / kopyalar. (hedef yol, yöntem) döndürür.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    if job.op == 'MOVE':
+        dest = uploads.unique_path(dest_dir, os.path.basename(job.filename))
+        # İptal sadece taşımadan önce; taşındıktan sonra iş tamamlanmalı (dosya yeni yerinde)
+        progress.check_cancelled()
+        try:
+            os.rename(src, dest)
+            progress.add(job.total_bytes, check=False)
+            return dest, 'rename'
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+    staging_dir = os.path.join(dest_dir, uploads.STAGING_FOLDER)
+    os.makedirs(staging_dir, exist_ok=True)
+    staging = os.path.join(staging_dir, f'{job.pk}.part')
+    try:
+        method = storage.copy_file(src, staging, progress)
+        dest = uploads.unique_path(dest_dir, os.path.basename(job.filename))
+        os.replace(staging, dest)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    if job.op == 'MOVE':
+        os.remove(src)
+    return dest, method
+
+
+def _to_user(job, progress):
+    src = _shared_source(job.source)
+    if src is None or not src.is_file():
+        raise TransferError('Dosya bulunamadı', status=404)
+    file_type = 'PHOTO' if src.suffix.lower() in PHOTO_EXTENSIONS else 'FILE'
+    item = FileItem(user=job.user, file_type=file_type)
+    rel_dir = os.path.dirname(user_directory_path(item, src.name))
+    files = storage.files()
+    if files.is_local:
+        dest, method = _transfer(job, str(src), files.path(rel_dir), progress)
+        name = posixpath.join(rel_dir.replace('\\', '/'), dest.name)
+        st = dest.stat()
+    else:
+        # Kaynak, kayıt tamamlanınca silinir
+        name = storage.unique_name(files, rel_dir, src.name)
+        method = files.upload(str(src), name, callback=progress.add)
+        st = src.stat()
+    try:
+        with transaction.atomic():
+            item.file = name
+            item.filename = posixpath.basename(name)
+            item.content_changed(st.st_size, st.st_mtime_ns)
+            item.save()
+            journal.record([item], 'create')
+    except Exception:
+        if not files.is_local:
+            files.delete(name)
+        elif job.op == 'MOVE':
+            os.replace(dest, src)
+        else:
+            os.remove(dest)
+        raise
+    if job.op == 'MOVE':
+        if not files.is_local:
+            os.remove(src)
+        _shared_changed(src.parent)
+    thumbnails.schedule_pregenerate([item])
+    hashing.schedule_hashing([item])
+    metadata.schedule_extraction([item])
+    return item, method
+
+
+def _to_shared(job, progress):
+    item = FileItem.objects.filter(pk=job.source, user=job.user).first()
+    if item is None:
+        raise TransferError('Dosya bulunamadı', status=404)
+    files = storage.files()
+    shared_dir = storage.shared_dir()
+    if files.is_local:
+        dest, method = _transfer(job, files.path(item.file.name), str(shared_dir), progress)
+    else:
+        dest, method = _download(job, item.file.name, str(shared_dir), progress)
+    if job.op == 'MOVE':
+        try:
+            with transaction.atomic():
+                journal.record([item], 'delete')
+                item.delete()
+        except Exception:
+            if files.is_local:
+                os.replace(dest, files.path(item.file.name))
+            else:
+                os.remove(dest)
+            raise
+        if not files.is_local:
+            files.delete(item.file.name)
+        thumbnails.invalidate(item.pk)
+    _shared_changed(shared_dir)
+    return None, method
+
+
+def _download(job, name, dest_dir, progress):
+    """Nesne deposundan dest_dir içine indirir (önce .uploads içine). (hedef yol, yöntem) döndürür."""
+    staging_dir = os.path.join(dest_dir, uploads.STAGING_FOLDER)
+    os.makedirs(staging_dir, exist_ok=True)
+    staging = os.path.join(staging_dir, f'{job.pk}.part')
+    try:
+        method = storage.files().download(name, staging, callback=progress.add)
+        dest = uploads.unique_path(dest_dir, os.path.basename(job.filename))
+        os.replace(staging, dest)
+    except BaseException:
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+    return dest, method
+
+
+def _shared_changed(folder):
+    listing.invalidate(folder)
+    rel = os.path.relpath(folder, storage.shared_dir().resolve())
+    events.publish(None, [{'op': 'shared', 'path': '' if rel == '.' else rel.replace('\\', '/')}])
+
+
+def run_job(job_id):
+    """Arka plan işi: kuyruktaki TransferJob'u çalıştırır."""
+    if not TransferJob.objects.filter(pk=job_id, status='QUEUED').update(status='RUNNING', updated_at=timezone.now()):
+        return
+    job = TransferJob.objects.select_related('user').get(pk=job_id)
+    progress = _Progress(job)
+    fields = {}
+    try:
+        item, method = (_to_user if job.direction == 'TO_USER' else _to_shared)(job, progress)
+        fields = {'status': 'COMPLETED', 'method': method, 'file_item': item, 'done_bytes': job.total_bytes}
+    except TransferCancelled:
+        fields = {'status': 'CANCELLED', 'done_bytes': progress.done}
+    except TransferError as e:
+        fields = {'status': 'FAILED', 'error': e.message, 'done_bytes': progress.done}
+    except Exception as e:
+        fields = {'status': 'FAILED', 'error': str(e), 'done_bytes': progress.done}
+    finally:
+        # KeyboardInterrupt / SystemExit gibi yukarıda yakalanmayanlarda iş RUNNING kalmasın
+        fields = fields or {'status': 'FAILED', 'error': 'İş yarıda kesildi', 'done_bytes': progress.done}
+        TransferJob.objects.filter(pk=job_id).update(updated_at=timezone.now(), **fields)
+        events.publish(job.user_id, [{'op': 'transfer', 'id': str(job.pk), 'status': fields['status']}])
+
+
+def recover_stale_jobs(user=None):
+    """
+    Süreç yeniden başladığında kaybolan işleri toparlar: ilerlemeyen RUNNING işler FAILED olur,
+    uzun süredir bekleyen QUEUED işler tekrar kuyruğa alınır (run_job aynı işi iki kez çalıştırmaz).
+    """
+    from .tasks import enqueue
+
+    now = timezone.now()
+    jobs = TransferJob.objects.all() if user is None else TransferJob.objects.filter(user=user)
+    stale = list(jobs.filter(status='RUNNING', updated_at__lt=now - STALE_RUNNING_AFTER).values_list('pk', 'user_id'))
+    for job_id, user_id in stale:
+        if TransferJob.objects.filter(pk=job_id, status='RUNNING', updated_at__lt=now - STALE_RUNNING_AFTER).update(
+            status='FAILED', error='İş yarıda kesildi', updated_at=now,
+        ):
+            events.publish(user_id, [{'op': 'transfer', 'id': str(job_id), 'status': 'FAILED'}])
+    queued = list(jobs.filter(status='QUEUED', updated_at__lt=now - REQUEUE_AFTER).values_list('pk', flat=True))
+    for job_id in queued:
+        if TransferJob.objects.filter(pk=job_id, status='QUEUED', updated_at__lt=now - REQUEUE_AFTER).update(updated_at=now):
+            enqueue('drive.transfers.run_job', str(job_id))
+    return len(stale), len(queued)
@@ -0,0 +1,274 @@
+"""
+Parça parça (devam ettirilebilir) yükleme.
+
+    POST   /api/drive/uploads                 -> oturum aç (filename, size, file_type)
+    PUT    /api/drive/uploads/<id>            -> Content-Range ile bayt aralığı gönder
+    GET    /api/drive/uploads/<id>            -> kaldığı yer (offset)
+    POST   /api/drive/uploads/<id>/finalize   -> FileItem oluştur
+    DELETE /api/drive/uploads/<id>            -> iptal
+
+Parçalar kullanıcının klasöründeki .uploads/<id>.part dosyasına doğrudan yazılır;
+finalize aynı dosya sisteminde yeniden adlandırma ile hedefe taşır (kopyalama yok).
+S3 deposunda parçalar yerelde (storage.staging_path) birikir, finalize çok parçalı yükleme yapar.
+İçerik özeti parçalar yazılırken hesaplanır; süreç değiştiyse finalize dosyayı bir kez okur.
+"""
+import os
+import posixpath
+import re
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import hashing, journal, storage, usage
+from .models import FileItem, UploadSession, user_directory_path
+
+STAGING_FOLDER = '.uploads'
+
+# Önerilen / izin verilen en büyük parça boyutu
+CHUNK_SIZE = 8 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+COPY_BUFFER = 1024 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
+# Oturum id -> (o ana kadar yazılan baytların özeti, son kullanım); sadece bu süreçte.
+# Oturum başka süreçte iptal / temizlenirse kayıt HASHER_MAX_IDLE sonra düşer, finalize dosyayı okur.
+_hashers = {}
+HASHER_MAX_IDLE = 24 * 60 * 60
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.offset = offset
+
+
+def unique_path(directory, filename):
+    """Hedefte aynı isimde dosya varsa isme zaman damgası (ve gerekirse sayaç) ekler."""
+    directory = Path(directory)
+    path = directory / filename
+    if not path.exists():
+        return path
+    stem, suffix = path.stem, path.suffix
+    timestamp = int(time.time())
+    path = directory / f'{stem}_{timestamp}{suffix}'
+    counter = 1
+    while path.exists():
+        path = directory / f'{stem}_{timestamp}_{counter}{suffix}'
+        counter += 1
+    return path
+
+
+def _clean_filename(filename):
+    name = os.path.basename((filename or '').replace('\\', '/')).strip()
+    if not name or name in ('.', '..'):
+        raise UploadError('Geçersiz dosya adı')
+    return name
+
+
+def create_session(user, filename, total_size, file_type='FILE', target='USER'):
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadError('Dosya boyutu belirtilmedi')
+    if total_size < 0:
+        raise UploadError('Geçersiz dosya boyutu')
+    if file_type not in dict(FileItem.FILE_TYPES):
+        raise UploadError('Geçersiz dosya tipi')
+    if target not in dict(UploadSession.TARGET_CHOICES):
+        raise UploadError('Geçersiz hedef')
+    # Kota, parçalar gelmeden oturumun boyutuyla kontrol edilir (ortak klasör kotaya sayılmaz)
+    if target == 'USER' and not usage.fits(user, total_size):
+        raise UploadError('Depolama kotası aşıldı', status=413)
+
+    session = UploadSession(
+        user=user, filename=_clean_filename(filename), file_type=file_type,
+        target=target, total_size=total_size,
+    )
+    session.staging_path = os.path.join(user.get_user_folder(), STAGING_FOLDER, f'{session.id}.part').replace('\\', '/')
+    staging = storage.files().staging_path(session.staging_path)
+    os.makedirs(os.path.dirname(staging), exist_ok=True)
+    open(staging, 'wb').close()
+    session.save()
+    return session
+
+
+def parse_content_range(header, total_size):
+    """'bytes start-end/total' başlığını (start, uzunluk) olarak döndürür."""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise UploadError('Geçersiz Content-Range')
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start or (total != '*' and int(total) != total_size):
+        raise UploadError('Geçersiz Content-Range')
+    return start, end - start + 1
+
+
+def write_chunk(session, start, stream, length):
+    """
+    Gelen gövdeyi geçici dosyaya start konumundan yazar, yeni offset'i döndürür.
+    start sunucudaki offset ile eşleşmezse 409 (istemci GET ile offset'i sorup devam eder).
+    """
+    if session.status != 'ACTIVE':
+        raise UploadError('Yükleme oturumu aktif değil', status=409, offset=session.offset)
+    if start != session.offset:
+        raise UploadError('Offset uyuşmuyor', status=409, offset=session.offset)
+    if length is None or length > MAX_CHUNK_SIZE:
+        raise UploadError('Parça boyutu çok büyük veya belirtilmedi', status=413)
+    if start + length > session.total_size:
+        raise UploadError('Parça dosya boyutunu aşıyor')
+
+    staging = storage.files().staging_path(session.staging_path)
+    _evict_idle_hashers()
+    hasher, _ = _hashers.get(session.pk, (None, None))
+    hasher = hasher.copy() if hasher is not None and hasher.size == start else None
+    if hasher is None and start == 0:
+        hasher = hashing.ContentHasher()
+    written = 0
+    with open(staging, 'r+b') as f:
+        f.seek(start)
+        while written < length:
+            block = stream.read(min(COPY_BUFFER, length - written))
+            if not block:
+                break
+            f.write(block)
+            if hasher is not None:
+                hasher.update(block)
+            written += len(block)
+        # Kaydedilen offset diskteki veriden ileride olmasın
+        f.flush()
+        os.fsync(f.fileno())
+
+    new_offset = start + written
+    # Aynı oturuma eşzamanlı PUT gelirse sadece biri offset'i ilerletir
+    if not UploadSession.objects.filter(pk=session.pk, offset=start).update(offset=new_offset, updated_at=timezone.now()):
+        session.refresh_from_db()
+        raise UploadError('Offset uyuşmuyor', status=409, offset=session.offset)
+    session.offset = new_offset
+    if hasher is not None:
+        _hashers[session.pk] = (hasher, time.monotonic())
+    if written < length:
+        raise UploadError('Bağlantı parça tamamlanmadan kesildi', status=400, offset=new_offset)
+    return new_offset
+
+
+def _evict_idle_hashers():
+    cutoff = time.monotonic() - HASHER_MAX_IDLE
+    for session_id, (_, used) in list(_hashers.items()):
+        if used < cutoff:
+            _hashers.pop(session_id, None)
+
+
+def _check_finalize(session):
+    if session.status == 'COMPLETED':
+        raise UploadError('Yükleme zaten tamamlandı', status=409)
+    if session.status == 'FINALIZING':
+        raise UploadError('Yükleme zaten tamamlanıyor', status=409)
+    if session.status != 'ACTIVE':
+        raise UploadError('Yükleme oturumu aktif değil', status=409)
+    if session.offset != session.total_size:
+        raise UploadError('Yükleme tamamlanmadı', status=409, offset=session.offset)
+
+
+def finalize(session):
+    """
+    Tamamlanan yüklemeyi hedef klasöre taşır.
+    Kullanıcı alanında FileItem aynı transaction'da oluşturulur; kayıt başarısız olursa dosya geri taşınır.
+    Oturum önce ACTIVE -> FINALIZING ile sahiplenilir; eşzamanlı finalize isteklerinden sadece biri devam eder,
+    hata olursa oturum yeniden ACTIVE olur.
+    Dönüş: FileItem (USER) veya dosya adı (SHARED).
+    """
+    _check_finalize(session)
+    claimed = UploadSession.objects.filter(
+        pk=session.pk, status='ACTIVE', offset=session.total_size,
+    ).update(status='FINALIZING', updated_at=timezone.now())
+    if not claimed:
+        session.refresh_from_db()
+        _check_finalize(session)
+        raise UploadError('Yükleme oturumu aktif değil', status=409)
+    session.status = 'FINALIZING'
+    try:
+        return _finalize(session)
+    except BaseException:
+        UploadSession.objects.filter(pk=session.pk, status='FINALIZING').update(status='ACTIVE', updated_at=timezone.now())
+        session.status = 'ACTIVE'
+        raise
+
+
+def _finalize(session):
+    files = storage.files()
+    staging = files.staging_path(session.staging_path)
+    if not os.path.exists(staging):
+        raise UploadError('Geçici dosya bulunamadı', status=410)
+
+    if session.target == 'SHARED':
+        _hashers.pop(session.pk, None)
+        shared_dir = storage.shared_dir()
+        shared_dir.mkdir(parents=True, exist_ok=True)
+        dest = unique_path(shared_dir, session.filename)
+        shutil.move(staging, dest)
+        UploadSession.objects.filter(pk=session.pk).update(status='COMPLETED', updated_at=timezone.now())
+        return dest.name
+
+    hasher, _ = _hashers.pop(session.pk, (None, None))
+    if hasher is not None and hasher.size == session.total_size:
+        content_hash, content_md5 = hasher.hexdigests()
+    else:
+        content_hash, content_md5 = hashing.hash_file(staging)
+    # Aynı içerik zaten varsa (ayar açıksa) disk üzerinde tek kopya tutulur
+    hashing.link_duplicate(session.user, content_hash, staging)
+
+    item = FileItem(user=session.user, file_type=session.file_type)
+    # Yerelde rename mtime'ı korur; eşitleme dosyayı değişmiş saymaz
+    st = os.stat(staging)
+    item.content_changed(st.st_size, st.st_mtime_ns, content_hash, content_md5)
+    rel = user_directory_path(item, session.filename)
+    name = storage.unique_name(files, os.path.dirname(rel), session.filename)
+    # Yerelde rename; S3'te geçici dosya kayıt tamamlanana kadar tutulur
+    files.upload(staging, name, remove=files.is_local)
+    try:
+        with transaction.atomic():
+            item.file = name
+            item.filename = posixpath.basename(name)
+            item.save()
+            session.status = 'COMPLETED'
+            session.file_item = item
+            session.save(update_fields=['status', 'file_item', 'updated_at'])
+            journal.record([item], 'create')
+    except Exception:
+        if files.is_local:
+            os.replace(files.path(name), staging)
+        else:
+            files.delete(name)
+        raise
+    if os.path.exists(staging):
+        os.remove(staging)
+    return item
+
+
+def abort(session):
+    _hashers.pop(session.pk, None)
+    staging = storage.files().staging_path(session.staging_path)
+    if os.path.exists(staging):
+        os.remove(staging)
+    UploadSession.objects.filter(pk=session.pk).update(status='ABORTED', updated_at=timezone.now())
+
+
+def purge_stale_sessions(user, days=7):
+    """
+    Belirtilen günden uzun süredir ilerlemeyen (veya finalize sırasında süreci ölen) yüklemeleri siler.
+    Bu süreçteki özetler de bırakılır.
+    """
+    stale = UploadSession.objects.filter(
+        user=user, status__in=('ACTIVE', 'FINALIZING'), updated_at__lt=timezone.now() - timedelta(days=days)
+    )
+    for session in stale:
+        abort(session)
+    _evict_idle_hashers()
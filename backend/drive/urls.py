@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter, SimpleRouter
-from .views import FileItemViewSet, NoteViewSet, BrowseFilesystemView, BrowseSharedView, UploadSharedFileView, DeleteSharedFileView, ServeSharedFileView, CopySharedFileView, ThumbnailView
+from .views import FileItemViewSet, NoteViewSet, TransferJobViewSet, SearchView, BrowseFilesystemView, BrowseSharedView, UploadSharedFileView, DeleteSharedFileView, CopySharedFileView, UploadSessionCreateView, UploadSessionFinalizeView, ServeLinkView, ArchiveLinkView, archive_view, events_view, serve_shared_view, serve_view, thumbnail_view, upload_session_view
 
 router = SimpleRouter(trailing_slash=False)
 router.register(r'files', FileItemViewSet, basename='file')
 router.register(r'notes', NoteViewSet, basename='note')
+router.register(r'transfers', TransferJobViewSet, basename='transfer')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -14,7 +15,16 @@ urlpatterns = [
     path('browse-shared/', BrowseSharedView.as_view(), name='browse-shared-slash'),
     path('upload-shared', UploadSharedFileView.as_view(), name='upload-shared'),
     path('delete-shared', DeleteSharedFileView.as_view(), name='delete-shared'),
-    path('serve-shared', ServeSharedFileView.as_view(), name='serve-shared'),
+    path('serve-shared', serve_shared_view, name='serve-shared'),
+    path('serve', serve_view, name='serve'),
+    path('serve/link', ServeLinkView.as_view(), name='serve-link'),
+    path('archive', archive_view, name='archive'),
+    path('archive/link', ArchiveLinkView.as_view(), name='archive-link'),
     path('copy-shared', CopySharedFileView.as_view(), name='copy-shared'),
-    path('thumbnail/<uuid:pk>', ThumbnailView.as_view(), name='thumbnail'),
+    path('events', events_view, name='events'),
+    path('search', SearchView.as_view(), name='search'),
+    path('thumbnail/<uuid:pk>', thumbnail_view, name='thumbnail'),
+    path('uploads', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>', upload_session_view, name='upload-session'),
+    path('uploads/<uuid:pk>/finalize', UploadSessionFinalizeView.as_view(), name='upload-finalize'),
 ]
@@ -0,0 +1,162 @@
+"""
+Kullanıcı başına depolama kullanımı ve kota.
+
+StorageUsage, kullanıcının FileItem boyutlarının tür / favori / çöp kırılımındaki özetidir.
+Dosya değiştiren her yol günlüğe yazdığı için (journal.record_entries) sayaçlar aynı transaction'da
+F() ifadeleriyle güncellenir: journal.entry dosyanın önceki durumunun payını yeni durumundan çıkarır.
+Önceki durumu bilinmeyen dosyalarda (ertelenmiş alanlarla okunmuş kayıt, özeti henüz olmayan kullanıcı)
+kullanıcının özeti commit sonrası baştan hesaplanır. Onarım: python manage.py recompute_usage
+
+Kota: StorageUsage.quota, boşsa DRIVE_DEFAULT_QUOTA (bayt, 0 = sınırsız). Çöp de diskte yer tuttuğu için
+kotaya sayılır. Yüklemeler gövde okunmadan (Content-Length / parça oturumunun boyutu) reddedilir.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import storage
+from .models import FileItem, StorageUsage, UploadSession
+
+COUNTERS = (
+    'file_count', 'file_bytes', 'photo_count', 'photo_bytes',
+    'favorite_count', 'favorite_bytes', 'trash_count', 'trash_bytes',
+)
+BATCH_SIZE = 500
+
+
+def contribution(state):
+    """usage_state() değerinin sayaçlara katkısı."""
+    file_type, size, is_favorite, trashed = state
+    if trashed:
+        return {'trash_count': 1, 'trash_bytes': size}
+    prefix = 'photo' if file_type == 'PHOTO' else 'file'
+    result = {f'{prefix}_count': 1, f'{prefix}_bytes': size}
+    if is_favorite:
+        result.update(favorite_count=1, favorite_bytes=size)
+    return result
+
+
+def delta(item, op):
+    """
+    Dosyanın son kaydedilen durumundan bu yana sayaçlardaki değişim ({sayaç: fark});
+    önceki veya yeni durum bilinmiyorsa None. Dosyanın durumu yeni duruma ilerletilir.
+    """
+    before = item._usage_state
+    after = None if op == 'delete' else item.usage_state()
+    item._usage_state = after
+    if (before is None and op != 'create') or (after is None and op != 'delete'):
+        return None
+    change = Counter(contribution(after) if after else {})
+    change.subtract(contribution(before) if before else {})
+    return {name: value for name, value in change.items() if value}
+
+
+def apply(entries):
+    """Günlük kayıtlarının (journal.entry) kullanım farklarını kullanıcı başına toplayıp yazar."""
+    totals, unknown = {}, set()
+    for change in entries:
+        change_delta = getattr(change, 'usage', None)
+        if change_delta is None:
+            unknown.add(change.user_id)
+            continue
+        totals.setdefault(change.user_id, Counter()).update(change_delta)
+
+    now = timezone.now()
+    for user_id, total in totals.items():
+        fields = {name: F(name) + value for name, value in total.items() if value}
+        if fields and not StorageUsage.objects.filter(user_id=user_id).update(updated_at=now, **fields):
+            # Özeti olmayan kullanıcı: tek farkla değil, tüm dosyalardan hesaplanmalı
+            unknown.add(user_id)
+
+    if unknown:
+        transaction.on_commit(lambda: [recompute(user_id) for user_id in unknown])
+
+
+def totals(user_id):
+    """Sayaçları FileItem tablosundan tek sorguyla hesaplar."""
+    live = Q(trashed_at__isnull=True)
+    buckets = {
+        'file': live & ~Q(file_type='PHOTO'),
+        'photo': live & Q(file_type='PHOTO'),
+        'favorite': live & Q(is_favorite=True),
+        'trash': Q(trashed_at__isnull=False),
+    }
+    aggregates = {}
+    for prefix, condition in buckets.items():
+        aggregates[f'{prefix}_count'] = Count('pk', filter=condition)
+        aggregates[f'{prefix}_bytes'] = Coalesce(Sum('size', filter=condition), Value(0))
+    return FileItem.objects.filter(user_id=user_id).aggregate(**aggregates)
+
+
+def recompute(user_id):
+    """Kullanıcının özetini baştan hesaplar; satır kilitliyken eşzamanlı artışlar beklenir."""
+    with transaction.atomic():
+        StorageUsage.objects.get_or_create(user_id=user_id)
+        usage = StorageUsage.objects.select_for_update().get(user_id=user_id)
+        for name, value in totals(user_id).items():
+            setattr(usage, name, value)
+        usage.save()
+    return usage
+
+
+def verify_sizes(user_id):
+    """Kayıtlı boyutları depodaki boyutlarla karşılaştırır, farklı olanları düzeltir. Dönüş: düzeltilen sayısı."""
+    files = storage.files()
+    fixed = []
+    for item in FileItem.objects.filter(user_id=user_id).only('id', 'file', 'size').iterator(chunk_size=BATCH_SIZE):
+        try:
+            size = files.size(item.file.name)
+        except OSError:
+            continue
+        if size != item.size:
+            item.size = size
+            fixed.append(item)
+    FileItem.objects.bulk_update(fixed, ['size'], batch_size=BATCH_SIZE)
+    return len(fixed)
+
+
+def get_usage(user):
+    return StorageUsage.objects.filter(user=user).first() or recompute(user.pk)
+
+
+def quota(usage):
+    """Geçerli kota (bayt); sınırsızsa None."""
+    limit = usage.quota if usage.quota is not None else getattr(settings, 'DRIVE_DEFAULT_QUOTA', 0)
+    return limit or None
+
+
+def reserved_bytes(user):
+    """Tamamlanmamış parça yükleme oturumlarının ayırdığı alan."""
+    return UploadSession.objects.filter(user=user, status__in=('ACTIVE', 'FINALIZING'), target='USER').aggregate(
+        total=Coalesce(Sum('total_size'), Value(0))
+    )['total']
+
+
+def fits(user, size):
+    """size bayt daha yüklenirse kullanıcı kotayı aşmıyor mu?"""
+    usage = get_usage(user)
+    limit = quota(usage)
+    if limit is None:
+        return True
+    return usage.used_bytes + reserved_bytes(user) + max(size, 0) <= limit
+
+
+def summary(user):
+    usage = get_usage(user)
+    limit = quota(usage)
+    return {
+        'used_bytes': usage.used_bytes,
+        'quota': limit,
+        'available': max(limit - usage.used_bytes, 0) if limit is not None else None,
+        'file_type': {
+            'FILE': {'count': usage.file_count, 'bytes': usage.file_bytes},
+            'PHOTO': {'count': usage.photo_count, 'bytes': usage.photo_bytes},
+        },
+        'favorites': {'count': usage.favorite_count, 'bytes': usage.favorite_bytes},
+        'trash': {'count': usage.trash_count, 'bytes': usage.trash_bytes},
+        'updated_at': usage.updated_at,
+    }
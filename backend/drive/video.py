@@ -0,0 +1,233 @@
+"""
+Video poster kareleri ve önizleme klipleri (ffmpeg alt süreci).
+
+Poster karesi ffmpeg ile tek kare olarak çıkarılır, sonrası fotoğraflarla aynıdır: küçük resim
+boyutları / formatları thumbnails önbelleğine yazılır. Önizleme klibi kısa kenarı
+DRIVE_VIDEO_PREVIEW_HEIGHT olan düşük bit hızlı H.264 / AAC MP4'tür (faststart; tarayıcıda Range ile
+oynatılır) ve aynı klasörde tutulur:
+
+    THUMBNAIL_CACHE_ROOT/<id[:2]>/<id>/clip-<özet>.mp4
+
+Süreç başına en fazla DRIVE_VIDEO_WORKERS ffmpeg aynı anda çalışır. Arka plan işleri boş yuva
+bekler; istekler beklemez (DRIVE_VIDEO_WAIT), yuva yoksa Busy ile hemen döner ve web
+worker'ları kod çözmeye bağlanmaz. Klipler istek içinde hiç üretilmez, kuyruğa alınır.
+ffmpeg bulunamazsa (DRIVE_FFMPEG) videolar eskisi gibi küçük resimsiz kalır.
+"""
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image
+
+from . import thumbnails
+from .storage import files
+
+logger = logging.getLogger(__name__)
+
+CLIP = 'clip'
+POSTER_TIMEOUT = 30
+
+_slots = None
+_slots_lock = threading.Lock()
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+
+
+class Busy(Exception):
+    """Tüm ffmpeg yuvaları dolu."""
+
+
+class Pending(Exception):
+    """Önizleme klibi henüz üretilmedi (kuyrukta)."""
+
+
+def ffmpeg_path():
+    return shutil.which(getattr(settings, 'DRIVE_FFMPEG', 'ffmpeg'))
+
+
+def available():
+    return ffmpeg_path() is not None
+
+
+def is_video(item):
+    if (item.mime_type or '').startswith('video/'):
+        return True
+    mime_type, _ = mimetypes.guess_type(item.filename or item.file.name or '')
+    return bool(mime_type and mime_type.startswith('video/'))
+
+
+def _get_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(getattr(settings, 'DRIVE_VIDEO_WORKERS', 2))
+        return _slots
+
+
+def _run(args, timeout, wait=True):
+    """
+    ffmpeg'i bir yuva alarak düşük öncelikle çalıştırır, stdout'u döndürür.
+    wait=False ise yuva için en fazla DRIVE_VIDEO_WAIT sn beklenir, sonra Busy.
+    """
+    slots = _get_slots()
+    wait_seconds = getattr(settings, 'DRIVE_VIDEO_WAIT', 0)
+    if wait:
+        acquired = slots.acquire()
+    elif wait_seconds:
+        acquired = slots.acquire(timeout=wait_seconds)
+    else:
+        acquired = slots.acquire(blocking=False)
+    if not acquired:
+        raise Busy()
+    try:
+        nice = ['nice', '-n', '10'] if shutil.which('nice') else []
+        result = subprocess.run(
+            [*nice, ffmpeg_path(), '-nostdin', '-hide_banner', '-loglevel', 'error', *args],
+            stdin=subprocess.DEVNULL, capture_output=True, timeout=timeout,
+        )
+    finally:
+        slots.release()
+    if result.returncode:
+        raise OSError(f'ffmpeg: {result.stderr.decode("utf-8", "ignore").strip()[-500:]}')
+    return result.stdout
+
+
+def _source(name):
+    """ffmpeg'e verilecek girdi: yerel yol veya (nesne deposu) imzalı URL."""
+    storage = files()
+    if storage.is_local:
+        path = storage.path(name)
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return path
+    return storage.url(name)
+
+
+def _poster_frame(name, max_size, wait):
+    source = _source(name)
+    scale = f"scale='min(iw,{max_size})':'min(ih,{max_size})':force_original_aspect_ratio=decrease"
+    offset = getattr(settings, 'DRIVE_VIDEO_POSTER_OFFSET', 1.0)
+    # Kısa videolarda ofset sonrasında kare olmayabilir; baştan dene
+    for start in dict.fromkeys((offset, 0)):
+        data = _run(['-ss', str(start), '-i', source, '-an', '-frames:v', '1', '-vf', scale,
+                     '-f', 'image2pipe', '-c:v', 'png', 'pipe:1'], POSTER_TIMEOUT, wait)
+        if data:
+            img = Image.open(BytesIO(data))
+            return img.convert('RGB') if img.mode not in ('RGB', 'L') else img
+    raise OSError('ffmpeg: video karesi okunamadı')
+
+
+def poster_frame(name, max_size):
+    """Arka plan için thumbnails loader'ı: en uzun kenarı en fazla max_size olan poster karesi."""
+    return _poster_frame(name, max_size, wait=True)
+
+
+def request_poster_frame(name, max_size):
+    """İstek için loader: yuva boş değilse Busy."""
+    return _poster_frame(name, max_size, wait=False)
+
+
+def get_poster(item, size_name=thumbnails.DEFAULT_SIZE, fmt='JPEG'):
+    """
+    Videonun poster küçük resmini döndürür (bkz. thumbnails.get_thumbnail).
+    ffmpeg meşgulse Busy; poster ve klip o durumda kuyruğa alınır.
+    """
+    try:
+        return thumbnails.get_thumbnail(item, size_name, fmt, loader=request_poster_frame)
+    except Busy:
+        schedule([item])
+        raise
+
+
+def _clip_path(item_id, st):
+    return thumbnails._cache_path(item_id, CLIP, 'MP4', st)
+
+
+def get_clip(item):
+    """
+    Önbellekteki önizleme klibini döndürür: (dosya yolu, etag, kaynak mtime).
+    Yoksa üretimi kuyruğa alıp Pending, kaynak yoksa FileNotFoundError.
+    """
+    st = files().stat(item.file.name)
+    path, key = _clip_path(item.pk, st)
+    if not os.path.exists(path):
+        schedule([item])
+        raise Pending()
+    return path, key, st.st_mtime
+
+
+def render_clip(name, path):
+    """Önizleme klibini üretip path'e (yarım dosya görünmeden) yazar."""
+    height = getattr(settings, 'DRIVE_VIDEO_PREVIEW_HEIGHT', 480)
+    bitrate = getattr(settings, 'DRIVE_VIDEO_PREVIEW_BITRATE', '600k')
+    seconds = getattr(settings, 'DRIVE_VIDEO_PREVIEW_SECONDS', 0)
+    # Kısa kenar en fazla height; dikey telefon videoları da aynı çözünürlükte kalsın
+    scale = (f"scale='if(gt(iw,ih),-2,min(iw,{height}))':'if(gt(iw,ih),min(ih,{height}),-2)'")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        _run([
+            '-i', _source(name), *(['-t', str(seconds)] if seconds else []),
+            # Telefonların metadata izleri MP4'e yazılamaz; sadece ilk görüntü / ses izi
+            '-map', '0:v:0', '-map', '0:a:0?', '-vf', scale,
+            '-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main', '-pix_fmt', 'yuv420p',
+            '-b:v', bitrate, '-maxrate', bitrate, '-bufsize', bitrate,
+            '-c:a', 'aac', '-b:a', '64k', '-ac', '2',
+            '-threads', str(getattr(settings, 'DRIVE_VIDEO_THREADS', 2)),
+            '-movflags', '+faststart', '-f', 'mp4', '-y', tmp_path,
+        ], getattr(settings, 'DRIVE_VIDEO_TIMEOUT', 1800))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build(item_id, name):
+    """Poster küçük resimlerini ve önizleme klibini (önbellekte yoksa) üretir. Üretilen dosya sayısı."""
+    generated = thumbnails.build_all(item_id, name, loader=poster_frame)
+    path, _ = _clip_path(item_id, files().stat(name))
+    if not os.path.exists(path):
+        render_clip(name, path)
+        generated += 1
+    return generated
+
+
+def render(item_ids):
+    """Arka plan işi: verilen videoların poster ve kliplerini üretir."""
+    from .models import FileItem
+
+    try:
+        if not available():
+            return
+        for item_id, name in FileItem.objects.filter(pk__in=item_ids).values_list('id', 'file'):
+            try:
+                build(item_id, name)
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logger.exception('Video önizlemesi üretilemedi: %s', item_id)
+    finally:
+        with _scheduled_lock:
+            _scheduled.difference_update(str(item_id) for item_id in item_ids)
+
+
+def schedule(items):
+    """Videoların poster / klip üretimini kuyruğa alır; bu süreçte zaten kuyrukta olanlar atlanır."""
+    from .tasks import enqueue
+
+    if not items or not available():
+        return
+    with _scheduled_lock:
+        ids = [str(item.pk) for item in items if str(item.pk) not in _scheduled]
+        _scheduled.update(ids)
+    # Uzun kodlamalar birbirini beklemesin: her video ayrı iş
+    for item_id in ids:
+        enqueue('drive.video.render', [item_id])
@@ -1,26 +1,53 @@
-from rest_framework import viewsets, permissions, parsers, views, status
+from rest_framework import viewsets, permissions, parsers, views, status, exceptions
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import FileItem, Note
-from .serializers import FileItemSerializer, NoteSerializer
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import FileItem, Note, TransferJob, UploadSession
+from .serializers import FileItemSerializer, NoteSerializer, TransferJobSerializer
+from .filters import FileItemFilter
+from .pagination import KeysetPagination, sort_field
+from . import aio, archive, decoders, events, hashing, ingest, journal, listing, metadata, operations, search, serving, storage, thumbnails, transfers, uploads, usage, video, watcher
+from .sync import purge_due, schedule_reconcile, sync_status as get_sync_status
 import os
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DateField
+from django.db.models.functions import Trunc
 from pathlib import Path
 from django.utils import timezone
 from django.utils import timezone
 from datetime import timedelta
-from django.http import HttpResponse
-from PIL import Image
-from io import BytesIO
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+import json
+import logging
 import mimetypes
+import time
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+TIMELINE_GRANULARITIES = ('year', 'month', 'day')
 
 class FileItemViewSet(viewsets.ModelViewSet):
     serializer_class = FileItemSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [parsers.MultiPartParser, parsers.FormParser]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = FileItemFilter
 
     def get_queryset(self):
-        qs = FileItem.objects.filter(user=self.request.user).order_by('-created_at')
+        qs = FileItem.objects.filter(user=self.request.user).select_related('metadata')
+        if self.action in ('list', 'timeline'):
+            qs = qs.order_by(f'-{sort_field(self.request)}', '-id')
         if self.request.query_params.get('trash') == 'true':
             return qs.filter(trashed_at__isnull=False)
         return qs.filter(trashed_at__isnull=True)
@@ -30,53 +57,48 @@ class FileItemViewSet(viewsets.ModelViewSet):
         context['request'] = self.request
         return context
 
+    def create(self, request, *args, **kwargs):
+        # Kota, gövde okunmadan Content-Length ile kontrol edilir
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if not usage.fits(request.user, length):
+            return Response({'error': 'Depolama kotası aşıldı'}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        # Dosya gelirken hedef diske yazılır, özet ve tür aynı geçişte çıkarılır
+        request.upload_handlers.insert(0, ingest.IngestUploadHandler(request))
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        upload = serializer.validated_data['file']
+        if isinstance(upload, ingest.IngestedFile):
+            fields = upload.item_fields()
+        else:
+            # Özet, dosya diske yazılmadan önce yüklenen parçalardan hesaplanır
+            content_hash, content_md5 = hashing.hash_stream(upload)
+            fields = {'content_hash': content_hash, 'content_md5': content_md5}
+        item = serializer.save(user=self.request.user, **fields)
+        journal.record([item], 'create')
+        thumbnails.schedule_pregenerate([item])
+        # Resim olmayan dosyanın türü yüklemede belirlendi; okunacak EXIF yok
+        if not item.mime_type or item.mime_type.startswith('image/'):
+            metadata.schedule_extraction([item])
 
     @action(detail=True, methods=['post'])
     def toggle_favorite(self, request, pk=None):
         item = self.get_object()
-        user_folder = request.user.get_user_folder()
-        
-        # Klasör isimleri
-        base_folder_name = 'Fotograflar' if item.file_type == 'PHOTO' else 'Dosyalar'
-        base_path = os.path.join(settings.MEDIA_ROOT, user_folder, base_folder_name)
-        fav_path = os.path.join(base_path, 'Favoriler')
-        
-        current_full_path = item.file.path
-        filename = os.path.basename(current_full_path)
         
         # Hedef durum
         target_fav_status = not item.is_favorite
         
         try:
-            if target_fav_status:
-                # Favoriye Ekle -> Taşı: Ana -> Favoriler
-                if not os.path.exists(fav_path):
-                    os.makedirs(fav_path)
-                dest_path = os.path.join(fav_path, filename)
-                new_relative_path = os.path.join(user_folder, base_folder_name, 'Favoriler', filename).replace('\\', '/')
-            else:
-                # Favoriden Çıkar -> Taşı: Favoriler -> Ana
-                dest_path = os.path.join(base_path, filename)
-                new_relative_path = os.path.join(user_folder, base_folder_name, filename).replace('\\', '/')
-            
-            # Dosya fiziksel olarak var mı?
-            if os.path.exists(current_full_path):
-                # Hedefte dosya yoksa taşı
-                if not os.path.exists(dest_path):
-                    os.rename(current_full_path, dest_path)
-                
-                # DB Path Güncelle
-                item.file = new_relative_path
-                item.is_favorite = target_fav_status
-                item.save()
-                return Response({'status': 'success', 'is_favorite': item.is_favorite})
-            else:
-                 # Dosya yoksa sadece flag güncelle
-                 item.is_favorite = target_fav_status
-                 item.save()
-                 return Response({'status': 'success', 'is_favorite': item.is_favorite})
+            # Favoriye Ekle -> Ana -> Favoriler, Favoriden Çıkar -> Favoriler -> Ana
+            operations.move_file(item, operations.FAVORITES_FOLDER if target_fav_status else None)
+            item.is_favorite = target_fav_status
+            with transaction.atomic():
+                item.touch_metadata()
+                journal.record([item], 'move')
+            return Response({'status': 'success', 'is_favorite': item.is_favorite})
                  
         except Exception as e:
             return Response({'status': 'error', 'message': str(e)}, status=400)
@@ -89,33 +111,24 @@ class FileItemViewSet(viewsets.ModelViewSet):
         
         # Hard Delete
         if item.trashed_at:
-             if item.file and os.path.exists(item.file.path):
-                 os.remove(item.file.path)
-             item.delete()
+             if item.file:
+                 storage.files().delete(item.file.name)
+             thumbnails.invalidate(item.pk)
+             with transaction.atomic():
+                 journal.record([item], 'delete')
+                 item.delete()
              return Response(status=status.HTTP_204_NO_CONTENT)
         
         # Soft Delete
         try:
-             user_folder = request.user.get_user_folder()
-             base_folder_name = 'Fotograflar' if item.file_type == 'PHOTO' else 'Dosyalar'
-             
-             current_path = item.file.path
-             filename = os.path.basename(current_path)
-             
-             trash_dir = os.path.join(settings.MEDIA_ROOT, user_folder, base_folder_name, 'CopKutusu')
-             if not os.path.exists(trash_dir): os.makedirs(trash_dir)
-             
-             new_path = os.path.join(trash_dir, filename)
-             new_rel_path = os.path.join(user_folder, base_folder_name, 'CopKutusu', filename).replace('\\', '/')
-             
-             if os.path.exists(current_path):
-                 if not os.path.exists(new_path):
-                     os.rename(current_path, new_path)
-             
-             item.file = new_rel_path
+             # Taşıma içeriği (boyut / mtime) değiştirmez; küçük resim önbelleği geçerli kalır
+             operations.move_file(item, operations.TRASH_FOLDER)
+
              item.trashed_at = timezone.now()
              item.is_favorite = False
-             item.save()
+             with transaction.atomic():
+                 item.touch_metadata()
+                 journal.record([item], 'trash')
              return Response(status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
              return Response({'error': str(e)}, status=500)
@@ -126,236 +139,312 @@ class FileItemViewSet(viewsets.ModelViewSet):
         if not item.trashed_at:
              return Response({'status': 'ignored'})
              
-        user_folder = request.user.get_user_folder()
-        base_folder_name = 'Fotograflar' if item.file_type == 'PHOTO' else 'Dosyalar'
-        
-        base_path = os.path.join(settings.MEDIA_ROOT, user_folder, base_folder_name)
-        current_path = item.file.path
-        filename = os.path.basename(current_path)
-        
-        dest_path = os.path.join(base_path, filename)
-        new_rel_path = os.path.join(user_folder, base_folder_name, filename).replace('\\', '/')
-        
-        if os.path.exists(current_path):
-             if not os.path.exists(dest_path):
-                 os.rename(current_path, dest_path)
-        
-        item.file = new_rel_path
+        operations.move_file(item)
+
         item.trashed_at = None
-        item.save()
+        with transaction.atomic():
+            item.touch_metadata()
+            journal.record([item], 'move')
         return Response({'status': 'restored'})
 
+    @action(detail=False, methods=['post'], parser_classes=[parsers.JSONParser])
+    def batch(self, request):
+        """
+        Çoklu seçimde tek istekte işlem.
+        Body: {"ids": [...], "action": "favorite" | "unfavorite" | "trash" | "restore" | "delete"}
+        """
+        ids = request.data.get('ids')
+        batch_action = request.data.get('action')
+        if batch_action not in operations.BATCH_ACTIONS:
+            return Response({'error': 'Geçersiz işlem'}, status=400)
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids listesi belirtilmedi'}, status=400)
+        if len(ids) > operations.MAX_BATCH_SIZE:
+            return Response({'error': f'En fazla {operations.MAX_BATCH_SIZE} dosya seçilebilir'}, status=400)
+
+        try:
+            results = operations.apply_batch(request.user, ids, batch_action)
+        except Exception as e:
+            return Response({'error': str(e)}, status=500)
+        succeeded = sum(1 for result in results.values() if result == 'ok')
+        return Response({
+            'action': batch_action,
+            'results': results,
+            'succeeded': succeeded,
+            'failed': sum(1 for result in results.values() if result not in ('ok', 'skipped')),
+        })
+
+    @action(detail=False, methods=['post'], parser_classes=[parsers.JSONParser])
+    def have(self, request):
+        """
+        Sunucuda zaten bulunan içerikleri döndürür (istemci bunları yüklemez).
+        Body: {"algorithm": "sha256" | "md5", "hashes": [...]}
+        """
+        algorithm = request.data.get('algorithm', 'sha256')
+        hashes = request.data.get('hashes')
+        if algorithm not in hashing.HASH_ALGORITHMS:
+            return Response({'error': 'Geçersiz algoritma'}, status=400)
+        if not isinstance(hashes, list):
+            return Response({'error': 'hashes listesi belirtilmedi'}, status=400)
+        if len(hashes) > hashing.MAX_HAVE_HASHES:
+            return Response({'error': f'En fazla {hashing.MAX_HAVE_HASHES} özet gönderilebilir'}, status=400)
+        found = hashing.find_existing(request.user, hashes, algorithm)
+        return Response({'algorithm': algorithm, 'have': found})
+
     def list(self, request, *args, **kwargs):
-        # Listeleme isteği geldiğinde önce dosya sistemini tara ve eşitle
+        # Dosya sistemi eşitlemesi arka planda yapılır, liste veritabanından hemen döner.
+        # İzleyici çalışıyorsa değişiklikler zaten ondan gelir; her listede tarama tetiklenmez.
+        # Saatlik bakım (süresi dolan çöp vb.) izleyiciden gelmez, zamanı geldiyse yine tetiklenir.
         try:
-            self.sync_filesystem(request.user)
-            return super().list(request, *args, **kwargs)
+            if not watcher.ensure_started() or purge_due(request.user):
+                schedule_reconcile(request.user)
+            response = super().list(request, *args, **kwargs)
+        except exceptions.APIException:
+            raise
         except Exception as e:
             import traceback
             traceback.print_exc()
             return Response({'error': str(e)}, status=500)
 
-    def sync_filesystem(self, user):
+        state = get_sync_status(request.user)
+        if state['last_synced_at']:
+            response['X-Last-Sync'] = state['last_synced_at'].isoformat()
+        response['X-Sync-Pending'] = 'true' if state['pending'] or state['running'] else 'false'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
         """
-        Kullanıcının kendi klasöründeki dosyaları tarar (Ana, Favoriler, Çöp Kutusu).
-        30 günden eski çöpleri siler.
+        Delta eşitleme: ?since=<token> sonrasındaki değişiklikler (aynı dosya için sadece sonuncusu).
+        Token yoksa veya çok eskiyse reset=True döner; istemci tam listeyi yükleyip dönen token'dan devam eder.
         """
-        media_root = settings.MEDIA_ROOT
-        user_folder_name = user.get_user_folder()
-        
-        # 0. Çöp Temizliği
-        cleanup_time = timezone.now() - timedelta(days=30)
-        old_trash = FileItem.objects.filter(user=user, trashed_at__lt=cleanup_time)
-        for t in old_trash:
-            if t.file and os.path.exists(t.file.path):
-                os.remove(t.file.path)
-            t.delete()
-
-        folders = {
-            'FILE': 'Dosyalar',
-            'PHOTO': 'Fotograflar'
-        }
+        try:
+            limit = min(int(request.query_params.get('limit', 1000)), 5000)
+        except ValueError:
+            return Response({'error': 'Geçersiz limit'}, status=400)
+        return Response(journal.changes_since(request.user, request.query_params.get('since'), max(limit, 1)))
 
-        for file_type, folder_name in folders.items():
-            base_path = os.path.join(media_root, user_folder_name, folder_name)
-            fav_path = os.path.join(base_path, 'Favoriler')
-            trash_path = os.path.join(base_path, 'CopKutusu')
-            
-            for p in [base_path, fav_path, trash_path]:
-                if not os.path.exists(p):
-                    try: os.makedirs(p)
-                    except: pass
-            
-            # --- 1. Fiziksel Taramalar ---
-            def scan_dir(path):
-                try: return {f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))}
-                except: return set()
-
-            main_files = scan_dir(base_path)
-            fav_files = scan_dir(fav_path)
-            trash_files = scan_dir(trash_path)
-            
-            # --- 2. DB Map ---
-            existing_qs = FileItem.objects.filter(user=user, file_type=file_type)
-            db_items_map = {}
-            for item in existing_qs:
-                if item.file:
-                    fname = os.path.basename(item.file.name)
-                    db_items_map[fname] = item
-
-            # --- 3. Sync Logic ---
-            
-            # Helper: Create or Update
-            def sync_item(fname, full_path, rel_path, is_fav=False, is_trash=False):
-                if fname not in db_items_map:
-                    try: size = os.path.getsize(full_path)
-                    except: size = 0
-                    FileItem.objects.create(
-                        user=user, file=rel_path, filename=fname, file_type=file_type, size=size,
-                        is_favorite=is_fav, trashed_at=timezone.now() if is_trash else None
-                    )
-                else:
-                    item = db_items_map[fname]
-                    needs_save = False
-                    
-                    if item.file.name != rel_path:
-                        item.file = rel_path
-                        needs_save = True
-                    
-                    if is_trash and not item.trashed_at:
-                        item.trashed_at = timezone.now()
-                        needs_save = True
-                    elif not is_trash and item.trashed_at:
-                        item.trashed_at = None
-                        needs_save = True
-                        
-                    if is_fav != item.is_favorite:
-                        item.is_favorite = is_fav
-                        needs_save = True
-                        
-                    if needs_save: item.save()
-
-            # Sync each folder
-            for f in main_files:
-                rel = os.path.join(user_folder_name, folder_name, f).replace('\\', '/')
-                sync_item(f, os.path.join(base_path, f), rel, is_fav=False, is_trash=False)
-
-            for f in fav_files:
-                rel = os.path.join(user_folder_name, folder_name, 'Favoriler', f).replace('\\', '/')
-                sync_item(f, os.path.join(fav_path, f), rel, is_fav=True, is_trash=False)
-
-            for f in trash_files:
-                rel = os.path.join(user_folder_name, folder_name, 'CopKutusu', f).replace('\\', '/')
-                sync_item(f, os.path.join(trash_path, f), rel, is_fav=False, is_trash=True)
-            
-            # --- 4. Delete Orphans ---
-            all_physical = main_files.union(fav_files).union(trash_files)
-            for fname, item in db_items_map.items():
-                if fname not in all_physical:
-                    item.delete()
+    @action(detail=False, methods=['get'])
+    def timeline(self, request):
+        """
+        Galeri zaman çizelgesi: çekim zamanına göre yıl / ay / gün başına dosya sayısı (tek sorgu).
+        ?granularity=year|month|day (varsayılan month), ?tz=Europe/Istanbul; liste filtreleri
+        (file_type, is_favorite, trash, taken_after ...) aynen geçerlidir.
+        """
+        granularity = request.query_params.get('granularity', 'month')
+        if granularity not in TIMELINE_GRANULARITIES:
+            return Response({'error': 'Geçersiz granularity'}, status=400)
+        try:
+            tz = ZoneInfo(request.query_params['tz']) if request.query_params.get('tz') else metadata.local_timezone()
+        except (ZoneInfoNotFoundError, ValueError):
+            return Response({'error': 'Geçersiz saat dilimi'}, status=400)
 
-class BrowseFilesystemView(views.APIView):
+        rows = (
+            self.filter_queryset(self.get_queryset()).order_by()
+            .annotate(bucket=Trunc('taken_at', granularity, output_field=DateField(), tzinfo=tz))
+            .values('bucket').annotate(count=Count('id')).order_by('-bucket')
+        )
+        buckets = [{'date': row['bucket'].isoformat(), 'count': row['count']} for row in rows]
+        return Response({
+            'granularity': granularity,
+            'buckets': buckets,
+            'total': sum(bucket['count'] for bucket in buckets),
+        })
+
+    @action(detail=False, methods=['get'])
+    def sync_status(self, request):
+        """Son eşitleme zamanı ve bekleyen iş sayısı"""
+        return Response(get_sync_status(request.user))
+
+    @action(detail=False, methods=['get'])
+    def storage_usage(self, request):
+        """Kullanılan alan, kota ve tür / favori / çöp kırılımı (sayaçlardan, dosyalar taranmaz)"""
+        return Response(usage.summary(request.user))
+
+def _browse(request, base_dir):
     """
-    Kullanıcının kendi klasöründeki dosya ve klasörleri listeler
+    base_dir altındaki ?path= klasörünü listeler.
+    ?sort=name|size|modified (veya mtime), ?order=asc|desc, ?offset= ve ?limit= ile sayfalanır.
     """
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get(self, request):
-        # Query parametreden path al, yoksa root
-        relative_path = request.query_params.get('path', '')
-        
-        # Kullanıcının klasör adını al
-        user_folder_name = request.user.get_user_folder()
-        
-        # Base directory - Kullanıcıya özel
-        base_dir = Path(f'D:/ooCloud/{user_folder_name}')
-        
-        # Güvenlik: Path traversal saldırılarını önle
-        try:
-            if relative_path:
-                target_path = (base_dir / relative_path).resolve()
-            else:
-                target_path = base_dir.resolve()
-                
-            # Hedef path base_dir içinde mi kontrol et
-            if not str(target_path).startswith(str(base_dir.resolve())):
-                return Response(
-                    {'error': 'Geçersiz path'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except Exception as e:
+    relative_path = request.query_params.get('path', '')
+
+    # Güvenlik: Path traversal saldırılarını önle
+    try:
+        if relative_path:
+            target_path = (base_dir / relative_path).resolve()
+        else:
+            target_path = base_dir.resolve()
+            
+        # Hedef path base_dir içinde mi kontrol et
+        if not str(target_path).startswith(str(base_dir.resolve())):
             return Response(
                 {'error': 'Geçersiz path'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Klasör yoksa oluştur
-        if not target_path.exists():
-            try:
-                target_path.mkdir(parents=True, exist_ok=True)
-            except Exception as e:
-                return Response(
-                    {'error': f'Klasör oluşturulamadı: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        
-        # Klasör değilse hata
-        if not target_path.is_dir():
-            return Response(
-                {'error': 'Belirtilen path bir klasör değil'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # İçeriği listele
-        items = []
+    except Exception as e:
+        return Response(
+            {'error': 'Geçersiz path'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    sort = request.query_params.get('sort', 'name')
+    if sort == 'mtime':
+        sort = 'modified'
+    if sort not in listing.SORT_FIELDS:
+        return Response({'error': 'Geçersiz sıralama'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+        limit = request.query_params.get('limit')
+        limit = max(int(limit), 1) if limit else None
+    except ValueError:
+        return Response({'error': 'Geçersiz offset/limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Klasör yoksa oluştur
+    if not target_path.exists():
         try:
-            for item in sorted(target_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())):
-                item_info = {
-                    'name': item.name,
-                    'is_dir': item.is_dir(),
-                    'path': str(item.relative_to(base_dir)).replace('\\', '/'),
-                }
-                
-                if item.is_file():
-                    try:
-                        item_info['size'] = item.stat().st_size
-                        item_info['modified'] = item.stat().st_mtime
-                        
-                        # Dosya uzantısına göre tip belirle
-                        ext = item.suffix.lower()
-                        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']:
-                            item_info['type'] = 'image'
-                        elif ext in ['.mp4', '.avi', '.mov', '.mkv', '.webm']:
-                            item_info['type'] = 'video'
-                        elif ext in ['.pdf']:
-                            item_info['type'] = 'pdf'
-                        elif ext in ['.doc', '.docx', '.txt', '.rtf']:
-                            item_info['type'] = 'document'
-                        elif ext in ['.zip', '.rar', '.7z', '.tar', '.gz']:
-                            item_info['type'] = 'archive'
-                        else:
-                            item_info['type'] = 'file'
-                    except Exception:
-                        item_info['size'] = 0
-                        item_info['modified'] = 0
-                        item_info['type'] = 'file'
-                
-                items.append(item_info)
+            target_path.mkdir(parents=True, exist_ok=True)
         except Exception as e:
             return Response(
-                {'error': f'Klasör okunamadı: {str(e)}'},
+                {'error': f'Klasör oluşturulamadı: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        
-        # Mevcut path bilgisi
-        current_path = str(target_path.relative_to(base_dir)).replace('\\', '/') if target_path != base_dir else ''
-        parent_path = str(target_path.parent.relative_to(base_dir)).replace('\\', '/') if target_path != base_dir else None
-        
-        return Response({
-            'current_path': current_path,
-            'parent_path': parent_path,
-            'items': items
-        })
+    
+    # Klasör değilse hata
+    if not target_path.is_dir():
+        return Response(
+            {'error': 'Belirtilen path bir klasör değil'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Mevcut path bilgisi
+    base_resolved = base_dir.resolve()
+    current_path = str(target_path.relative_to(base_resolved)).replace('\\', '/') if target_path != base_resolved else ''
+    parent_path = str(target_path.parent.relative_to(base_resolved)).replace('\\', '/') if target_path != base_resolved else None
+
+    # İçeriği listele
+    try:
+        entries = listing.list_directory(target_path, sort, request.query_params.get('order') == 'desc')
+    except Exception as e:
+        return Response(
+            {'error': f'Klasör okunamadı: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    total = len(entries)
+    page = entries[offset:offset + limit] if limit else entries[offset:]
+    data = {
+        'current_path': current_path,
+        'parent_path': parent_path,
+        'items': listing.serialize(page, current_path),
+        'total': total,
+    }
+    if limit:
+        data['next_offset'] = offset + limit if offset + limit < total else None
+    return Response(data)
+
+class EventsView(views.APIView):
+    """
+    Değişiklik akışı. ?cursor= son alınan imleç (ilk istekte boş: güncel imleç döner).
+    Varsayılan long-poll: yeni olay gelene veya ?timeout= (en fazla 30 sn) dolana kadar bekler.
+    Accept: text/event-stream ise SSE akışı açılır (Last-Event-ID ile devam edilir).
+    reset=True dönerse istemci listeyi baştan yüklemelidir.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_TIMEOUT = 30
+    STREAM_DURATION = 300
+
+    def perform_content_negotiation(self, request, force=False):
+        # Accept: text/event-stream DRF renderer'larıyla eşleşmez; 406 yerine JSON renderer seçilsin
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        watcher.ensure_started()
+        cursor = request.query_params.get('cursor') or request.META.get('HTTP_LAST_EVENT_ID', '')
+        user_id = request.user.pk
+
+        if 'text/event-stream' in request.META.get('HTTP_ACCEPT', ''):
+            response = StreamingHttpResponse(self._stream(user_id, cursor), content_type='text/event-stream')
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+
+        try:
+            timeout = min(float(request.query_params.get('timeout', 25)), self.MAX_TIMEOUT)
+        except ValueError:
+            return Response({'error': 'Geçersiz timeout'}, status=400)
+        if not cursor:
+            return Response(events.read(user_id, ''))
+        return Response(events.wait(user_id, cursor, max(timeout, 0)))
+
+    def _stream(self, user_id, cursor):
+        # Sunucu thread'ini sınırsız tutmamak için akış bir süre sonra kapanır, istemci yeniden bağlanır
+        deadline = time.monotonic() + self.STREAM_DURATION
+        result = events.read(user_id, cursor)
+        yield 'retry: 3000\n\n'
+        first = True
+        while True:
+            yield _sse_message(result, first)
+            first = False
+            if time.monotonic() >= deadline:
+                return
+            result = events.wait(user_id, result['cursor'], 15)
+
+
+def _sse_message(result, first):
+    if first or result['reset'] or result['events']:
+        payload = {'events': result['events'], 'reset': result['reset']}
+        return f"id: {result['cursor']}\ndata: {json.dumps(payload)}\n\n"
+    return ': ping\n\n'
+
+
+async def _event_stream_async(user_id, cursor):
+    deadline = time.monotonic() + EventsView.STREAM_DURATION
+    result = await events.read_async(user_id, cursor)
+    yield 'retry: 3000\n\n'
+    first = True
+    while True:
+        yield _sse_message(result, first)
+        first = False
+        if time.monotonic() >= deadline:
+            return
+        result = await events.wait_async(user_id, result['cursor'], 15)
+
+
+async def _events_async(request):
+    """EventsView'in ASGI sürümü: long-poll ve SSE istemcileri thread tutmadan bekler."""
+    user = await aio.authenticate(request)
+    if user is None:
+        return aio.error('Yetkisiz erişim', 401)
+    await sync_to_async(watcher.ensure_started)()
+    cursor = request.GET.get('cursor') or request.META.get('HTTP_LAST_EVENT_ID', '')
+
+    if 'text/event-stream' in request.META.get('HTTP_ACCEPT', ''):
+        response = StreamingHttpResponse(_event_stream_async(user.pk, cursor), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    try:
+        timeout = min(float(request.GET.get('timeout', 25)), EventsView.MAX_TIMEOUT)
+    except ValueError:
+        return aio.error('Geçersiz timeout', 400)
+    if not cursor:
+        return aio.json_response(await events.read_async(user.pk, ''))
+    return aio.json_response(await events.wait_async(user.pk, cursor, max(timeout, 0)))
+
+
+class BrowseFilesystemView(views.APIView):
+    """
+    Kullanıcının kendi klasöründeki dosya ve klasörleri listeler
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        # Base directory - Kullanıcıya özel
+        files = storage.files()
+        if not files.is_local:
+            return Response({'error': 'Bu depolama türünde klasör gezinme desteklenmiyor'}, status=400)
+        return _browse(request, Path(files.path(request.user.get_user_folder())))
 
 class BrowseSharedView(views.APIView):
     """
@@ -364,98 +453,8 @@ class BrowseSharedView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        # Query parametreden path al, yoksa root
-        relative_path = request.query_params.get('path', '')
-        
         # Base directory - Ortak klasör
-        base_dir = Path('D:/ooCloud/Paylasilan')
-        
-        # Güvenlik: Path traversal saldırılarını önle
-        try:
-            if relative_path:
-                target_path = (base_dir / relative_path).resolve()
-            else:
-                target_path = base_dir.resolve()
-                
-            # Hedef path base_dir içinde mi kontrol et
-            if not str(target_path).startswith(str(base_dir.resolve())):
-                return Response(
-                    {'error': 'Geçersiz path'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except Exception as e:
-            return Response(
-                {'error': 'Geçersiz path'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Klasör yoksa oluştur
-        if not target_path.exists():
-            try:
-                target_path.mkdir(parents=True, exist_ok=True)
-            except Exception as e:
-                return Response(
-                    {'error': f'Klasör oluşturulamadı: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        
-        # Klasör değilse hata
-        if not target_path.is_dir():
-            return Response(
-                {'error': 'Belirtilen path bir klasör değil'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # İçeriği listele
-        items = []
-        try:
-            for item in sorted(target_path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())):
-                item_info = {
-                    'name': item.name,
-                    'is_dir': item.is_dir(),
-                    'path': str(item.relative_to(base_dir)).replace('\\', '/'),
-                }
-                
-                if item.is_file():
-                    try:
-                        item_info['size'] = item.stat().st_size
-                        item_info['modified'] = item.stat().st_mtime
-                        
-                        # Dosya uzantısına göre tip belirle
-                        ext = item.suffix.lower()
-                        if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']:
-                            item_info['type'] = 'image'
-                        elif ext in ['.mp4', '.avi', '.mov', '.mkv', '.webm']:
-                            item_info['type'] = 'video'
-                        elif ext in ['.pdf']:
-                            item_info['type'] = 'pdf'
-                        elif ext in ['.doc', '.docx', '.txt', '.rtf']:
-                            item_info['type'] = 'document'
-                        elif ext in ['.zip', '.rar', '.7z', '.tar', '.gz']:
-                            item_info['type'] = 'archive'
-                        else:
-                            item_info['type'] = 'file'
-                    except Exception:
-                        item_info['size'] = 0
-                        item_info['modified'] = 0
-                        item_info['type'] = 'file'
-                
-                items.append(item_info)
-        except Exception as e:
-            return Response(
-                {'error': f'Klasör okunamadı: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        
-        # Mevcut path bilgisi
-        current_path = str(target_path.relative_to(base_dir)).replace('\\', '/') if target_path != base_dir else ''
-        parent_path = str(target_path.parent.relative_to(base_dir)).replace('\\', '/') if target_path != base_dir else None
-        
-        return Response({
-            'current_path': current_path,
-            'parent_path': parent_path,
-            'items': items
-        })
+        return _browse(request, storage.shared_dir())
 
 
 class NoteViewSet(viewsets.ModelViewSet):
@@ -466,7 +465,57 @@ class NoteViewSet(viewsets.ModelViewSet):
         return Note.objects.filter(user=self.request.user).order_by('-updated_at')
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            note = serializer.save(user=self.request.user)
+            search.index_notes([note])
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            note = serializer.save()
+            search.index_notes([note])
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            search.remove('note', [instance.pk])
+            instance.delete()
+
+
+class SearchView(views.APIView):
+    """
+    Dosya adı ve notlarda dizinli arama (bkz. search).
+    ?q=<metin> (her kelime önek olarak eşleşir), ?type=file|note (varsayılan ikisi), ?limit= (en fazla 100)
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not search.tokens(query):
+            return Response({'error': 'Arama metni belirtilmedi'}, status=400)
+        kind = request.query_params.get('type')
+        if kind and kind not in search.KINDS:
+            return Response({'error': 'Geçersiz type'}, status=400)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'Geçersiz limit'}, status=400)
+
+        hits = search.search(request.user, query, [kind] if kind else search.KINDS, limit)
+        ids = {'file': [], 'note': []}
+        for hit_kind, object_id, _ in hits:
+            ids[hit_kind].append(object_id)
+        objects = {
+            ('file', item.pk): FileItemSerializer(item, context={'request': request}).data
+            for item in FileItem.objects.filter(user=request.user, pk__in=ids['file'], trashed_at__isnull=True).select_related('metadata')
+        }
+        objects.update({
+            ('note', note.pk): NoteSerializer(note).data
+            for note in Note.objects.filter(user=request.user, pk__in=ids['note'])
+        })
+        results = [
+            {'type': hit_kind, 'score': round(score, 4), 'item': objects[(hit_kind, object_id)]}
+            for hit_kind, object_id, score in hits if (hit_kind, object_id) in objects
+        ]
+        return Response({'query': query, 'results': results})
 
 
 class UploadSharedFileView(views.APIView):
@@ -484,8 +533,7 @@ class UploadSharedFileView(views.APIView):
             return Response({'error': 'Dosya bulunamadı'}, status=400)
 
         # Hedef klasör - Direkt Paylasilan klasörü
-        base_dir = Path('D:/ooCloud/Paylasilan')
-        target_dir = base_dir
+        target_dir = storage.shared_dir()
             
         # Klasör yoksa oluştur
         try:
@@ -528,7 +576,7 @@ class DeleteSharedFileView(views.APIView):
         if not path_param:
             return Response({'error': 'Path belirtilmedi'}, status=400)
             
-        base_dir = Path('D:/ooCloud/Paylasilan')
+        base_dir = storage.shared_dir()
         
         # Güvenlik: Path traversal önlemi
         try:
@@ -551,6 +599,18 @@ class DeleteSharedFileView(views.APIView):
         except Exception as e:
             return Response({'error': f'Silme hatası: {str(e)}'}, status=500)
 
+def _resolve_shared(path_param):
+    """Paylaşılan klasör içindeki dosya yolunu döndürür; klasör dışına çıkıyorsa None."""
+    base_dir = storage.shared_dir()
+    try:
+        target_path = (base_dir / path_param.lstrip('/')).resolve()
+    except (OSError, ValueError):
+        return None
+    if not str(target_path).startswith(str(base_dir.resolve())):
+        return None
+    return target_path
+
+
 class ServeSharedFileView(views.APIView):
     """
     Paylaşılan dosyayı sunar (İndirme/Görüntüleme)
@@ -562,29 +622,272 @@ class ServeSharedFileView(views.APIView):
         if not path_param:
             return Response({'error': 'Path belirtilmedi'}, status=400)
 
-        base_dir = Path('D:/ooCloud/Paylasilan')
-        
-        try:
-            target_path = (base_dir / path_param).resolve()
-            if not str(target_path).startswith(str(base_dir.resolve())):
-                 return Response({'error': 'Geçersiz path'}, status=400)
-        except:
+        target_path = _resolve_shared(path_param)
+        if target_path is None:
              return Response({'error': 'Geçersiz path'}, status=400)
 
-        if not target_path.exists() or not target_path.is_file():
+        if not target_path.is_file():
              return Response({'error': 'Dosya bulunamadı'}, status=404)
 
-        from django.http import FileResponse
         try:
-            response = FileResponse(open(target_path, 'rb'))
-            response['Content-Disposition'] = f'attachment; filename="{target_path.name}"'
-            return response
+            return serving.serve_file(request, target_path, as_attachment=True)
+        except FileNotFoundError:
+            return Response({'error': 'Dosya bulunamadı'}, status=404)
         except Exception as e:
             return Response({'error': f'Dosya okuma hatası: {str(e)}'}, status=500)
 
+
+async def _serve_shared_async(request):
+    if await aio.authenticate(request) is None:
+        return aio.error('Yetkisiz erişim', 401)
+    path_param = request.GET.get('path')
+    if not path_param:
+        return aio.error('Path belirtilmedi', 400)
+
+    target_path = await aio.run_io(_resolve_shared, path_param)
+    if target_path is None:
+        return aio.error('Geçersiz path', 400)
+    try:
+        return await aio.run_io(serving.serve_file, request, target_path, as_attachment=True, iterator=aio.iter_file)
+    except (FileNotFoundError, IsADirectoryError):
+        return aio.error('Dosya bulunamadı', 404)
+    except Exception as e:
+        return aio.error(f'Dosya okuma hatası: {str(e)}', 500)
+
+
+class ServeView(views.APIView):
+    """
+    Kullanıcı dosyalarını (?id=) ve paylaşılan klasörü (?path=) tek yerden sunar.
+    Range / 206, ETag, If-Modified-Since desteklenir; ?download=1 ile indirme olarak döner.
+    <video>/<img> gibi başlık gönderemeyen istemciler için ?sig= (bkz. ServeLinkView) kabul edilir.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        user = request.user if request.user.is_authenticated else None
+        target, error = _serve_target(user, request.query_params)
+        if error:
+            return Response({'error': error[0]}, status=error[1])
+
+        source, filename = target
+        download = request.query_params.get('download') in ('1', 'true')
+        try:
+            return _serve_source(request, source, filename, download)
+        except (FileNotFoundError, IsADirectoryError):
+            return Response({'error': 'Dosya bulunamadı'}, status=404)
+
+
+def _serve_source(request, source, filename, download, async_mode=False):
+    """source: paylaşılan dosyanın yolu veya (depo, ad)."""
+    if isinstance(source, tuple):
+        return serving.serve_object(request, *source, filename, as_attachment=download,
+                                    wrap=aio.iterate if async_mode else None)
+    return serving.serve_file(request, source, filename, as_attachment=download,
+                              iterator=aio.iter_file if async_mode else None)
+
+
+def _serve_target(user, params):
+    """
+    ServeView için ((yol veya (depo, ad), dosya adı), None) veya (None, (hata, durum)) döndürür.
+    user None ise ?sig= imzasıyla doğrulanır.
+    """
+    item_id = params.get('id')
+    path_param = params.get('path')
+    if not item_id and not path_param:
+        return None, ('id veya path belirtilmedi', 400)
+
+    if user is None:
+        link = serving.check_link(params.get('sig', ''))
+        if link is None or (link.get('id'), link.get('p')) != (item_id, path_param):
+            return None, ('Yetkisiz erişim', 401)
+        user = User.objects.filter(pk=link['u'], is_active=True).first()
+        if user is None:
+            return None, ('Yetkisiz erişim', 401)
+
+    if item_id:
+        try:
+            item = FileItem.objects.get(pk=item_id, user=user)
+        except (FileItem.DoesNotExist, ValueError, DjangoValidationError):
+            return None, ('Dosya bulunamadı', 404)
+        return ((storage.files(), item.file.name), item.filename or os.path.basename(item.file.name)), None
+
+    path = _resolve_shared(path_param)
+    if path is None:
+        return None, ('Geçersiz path', 400)
+    return (path, path.name), None
+
+
+async def _serve_async(request):
+    user = await aio.authenticate(request)
+    target, error = await aio.run_io(_serve_target, user, request.GET)
+    if error:
+        return aio.error(*error)
+
+    source, filename = target
+    download = request.GET.get('download') in ('1', 'true')
+    try:
+        return await aio.run_io(_serve_source, request, source, filename, download, async_mode=True)
+    except (FileNotFoundError, IsADirectoryError):
+        return aio.error('Dosya bulunamadı', 404)
+
+
+class ServeLinkView(views.APIView):
+    """
+    ServeView için süreli imzalı bağlantı üretir (?id= veya ?path=).
+    Dönen url doğrudan <video src> / <a href> olarak kullanılabilir.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        item_id = request.query_params.get('id')
+        path_param = request.query_params.get('path')
+        if item_id:
+            if not FileItem.objects.filter(pk=item_id, user=request.user).exists():
+                return Response({'error': 'Dosya bulunamadı'}, status=404)
+            sig = serving.sign_link(request.user, item_id=item_id)
+            query = {'id': item_id, 'sig': sig}
+        elif path_param:
+            if _resolve_shared(path_param) is None:
+                return Response({'error': 'Geçersiz path'}, status=400)
+            sig = serving.sign_link(request.user, path=path_param)
+            query = {'path': path_param, 'sig': sig}
+        else:
+            return Response({'error': 'id veya path belirtilmedi'}, status=400)
+        return Response({'url': f"{reverse('serve')}?{urlencode(query)}", 'expires_in': serving.link_max_age()})
+
+def _archive_selection(data, query):
+    """
+    (ids, path, sig): ids GET'te virgülle ayrılmış, POST'ta liste (JSON) veya tekrarlanan alan (form) olarak gelir.
+    """
+    if hasattr(data, 'getlist') and data.getlist('ids'):
+        ids = data.getlist('ids')
+    elif isinstance(data, dict) and isinstance(data.get('ids'), list):
+        ids = data['ids']
+    else:
+        ids = [i for i in query.get('ids', '').split(',') if i]
+    path = data.get('path', query.get('path'))
+    sig = data.get('sig') or query.get('sig', '')
+    return [str(i) for i in dict.fromkeys(ids)], path, sig
+
+
+def _archive_target(user, ids, path, sig):
+    """
+    ArchiveView için ((girdiler, arşiv adı), None) veya (None, (hata, durum)) döndürür.
+    user None ise seçime bağlı ?sig= imzasıyla doğrulanır.
+    """
+    if not ids and path is None:
+        return None, ('ids veya path belirtilmedi', 400)
+    if len(ids) > archive.MAX_ARCHIVE_ITEMS:
+        return None, (f'En fazla {archive.MAX_ARCHIVE_ITEMS} dosya seçilebilir', 400)
+
+    if user is None:
+        user_id = archive.check(sig, ids, path if not ids else None)
+        user = User.objects.filter(pk=user_id, is_active=True).first() if user_id else None
+        if user is None:
+            return None, ('Yetkisiz erişim', 401)
+
+    if ids:
+        try:
+            items = {}
+            for i in range(0, len(ids), operations.DB_CHUNK):
+                for item in FileItem.objects.filter(user=user, pk__in=ids[i:i + operations.DB_CHUNK]):
+                    items[str(item.pk)] = item
+        except DjangoValidationError:
+            return None, ('Geçersiz id', 400)
+        if not items:
+            return None, ('Dosya bulunamadı', 404)
+        entries = archive.item_entries(items[i] for i in ids if i in items)
+        return (entries, f"ooCloud-{timezone.localtime().strftime('%Y%m%d-%H%M%S')}.zip"), None
+
+    folder = _resolve_shared(path)
+    if folder is None:
+        return None, ('Geçersiz path', 400)
+    if not folder.is_dir():
+        return None, ('Klasör bulunamadı', 404)
+    return (archive.folder_entries(folder), f'{folder.name}.zip'), None
+
+
+def _archive_response(stream, filename):
+    response = StreamingHttpResponse(stream, content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Cache-Control'] = 'no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class ArchiveView(views.APIView):
+    """
+    Seçili dosyaları (ids) veya paylaşılan bir klasörü (path) anlık ZIP akışı olarak indirir.
+    GET ?ids=a,b | ?path=  veya  POST {"ids": [...]} / {"path": ...} (çok sayıda id için).
+    Başlık gönderemeyen tarayıcı indirmeleri ArchiveLinkView'dan alınan sig ile yapılır.
+    """
+    permission_classes = [permissions.AllowAny]
+    parser_classes = [parsers.JSONParser, parsers.FormParser]
+
+    def get(self, request):
+        return self._archive(request, {})
+
+    def post(self, request):
+        return self._archive(request, request.data)
+
+    def _archive(self, request, data):
+        user = request.user if request.user.is_authenticated else None
+        target, error = _archive_target(user, *_archive_selection(data, request.query_params))
+        if error:
+            return Response({'error': error[0]}, status=error[1])
+        entries, filename = target
+        return _archive_response(archive.iter_zip(entries), filename)
+
+
+async def _archive_async(request):
+    data = {}
+    if request.method == 'POST':
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(await aio.run_io(lambda: request.body) or b'{}')
+            except ValueError:
+                return aio.error('Geçersiz JSON', 400)
+            if not isinstance(data, dict):
+                return aio.error('Geçersiz JSON', 400)
+        else:
+            data = await aio.run_io(lambda: request.POST)
+
+    user = await aio.authenticate(request)
+    target, error = await aio.run_io(_archive_target, user, *_archive_selection(data, request.GET))
+    if error:
+        return aio.error(*error)
+    entries, filename = target
+    return _archive_response(aio.iterate(archive.iter_zip(entries)), filename)
+
+
+class ArchiveLinkView(views.APIView):
+    """
+    ArchiveView için seçime bağlı süreli imza üretir. Body: {"ids": [...]} veya {"path": ...}
+    path için url doğrudan açılır; ids için url'ye ids alanlarıyla form POST edilir.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        ids, path, _ = _archive_selection(request.data, {})
+        if ids:
+            path = None
+        elif path is None:
+            return Response({'error': 'ids veya path belirtilmedi'}, status=400)
+        elif _resolve_shared(path) is None:
+            return Response({'error': 'Geçersiz path'}, status=400)
+        if len(ids) > archive.MAX_ARCHIVE_ITEMS:
+            return Response({'error': f'En fazla {archive.MAX_ARCHIVE_ITEMS} dosya seçilebilir'}, status=400)
+
+        query = {'sig': archive.sign(request.user, ids=ids, path=path)}
+        if path is not None:
+            query['path'] = path
+        return Response({'url': f"{reverse('archive')}?{urlencode(query)}", 'expires_in': serving.link_max_age()})
+
+
 class CopySharedFileView(views.APIView):
     """
-    Paylaşılan dosyayı kullanıcının kendi alanına kopyalar
+    Paylaşılan dosyayı kullanıcının kendi alanına kopyalar.
+    Kopyalama arka planda yapılır; dönen iş /api/drive/transfers/<id> ile izlenir.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -592,71 +895,331 @@ class CopySharedFileView(views.APIView):
         path_param = request.data.get('path')
         if not path_param:
             return Response({'error': 'Path belirtilmedi'}, status=400)
-
-        base_dir = Path('D:/ooCloud/Paylasilan')
-        
         try:
-            source_path = (base_dir / path_param).resolve()
-            if not str(source_path).startswith(str(base_dir.resolve())):
-                 return Response({'error': 'Geçersiz path'}, status=400)
-        except:
-             return Response({'error': 'Geçersiz path'}, status=400)
+            job = transfers.create_job(request.user, 'COPY', path=path_param)
+        except transfers.TransferError as e:
+            return Response({'error': e.message}, status=e.status)
+        return Response({'status': 'queued', 'job': TransferJobSerializer(job).data}, status=status.HTTP_202_ACCEPTED)
 
-        if not source_path.exists() or not source_path.is_file():
-             return Response({'error': 'Dosya bulunamadı'}, status=404)
-        
-        # Dosya türünü belirle (Basitçe uzantıya göre)
-        is_photo = source_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic']
-        file_type = 'PHOTO' if is_photo else 'FILE'
 
+class TransferJobViewSet(viewsets.ModelViewSet):
+    """
+    Sunucu tarafı kopyalama / taşıma işleri.
+    POST {"path": <paylaşılan dosya>} veya {"id": <dosya id>}, "op": "COPY" | "MOVE" -> 202 + iş
+    GET ile ilerleme (done_bytes / total_bytes), DELETE ile iptal.
+    """
+    serializer_class = TransferJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        return TransferJob.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        transfers.recover_stale_jobs(request.user)
+        # Son işler yeterli
+        jobs = self.get_queryset()[:50]
+        return Response(self.get_serializer(jobs, many=True).data)
+
+    def create(self, request, *args, **kwargs):
         try:
-            from django.core.files import File
-            # Dosyayı okuyup yeni bir FileItem oluşturuyoruz.
-            # Django'nun File objesi otomatik olarak user_directory_path'e (Dosyalar/ veya Fotograflar/) kaydedecek.
-            with open(source_path, 'rb') as f:
-                file_item = FileItem(
-                    user=request.user,
-                    filename=source_path.name,
-                    file_type=file_type,
-                    file_size=source_path.stat().st_size
-                )
-                # save=True ile dosyayı fiziksel olarak kopyalar ve veritabanına yazar
-                file_item.file.save(source_path.name, File(f), save=True)
-
-            return Response({'status': 'success', 'message': 'Dosya başarıyla kopyalandı'})
+            job = transfers.create_job(
+                request.user, str(request.data.get('op', 'COPY')).upper(),
+                path=request.data.get('path'), item_id=request.data.get('id'),
+            )
+        except transfers.TransferError as e:
+            return Response({'error': e.message}, status=e.status)
+        except DjangoValidationError:
+            return Response({'error': 'Dosya bulunamadı'}, status=404)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    def retrieve(self, request, *args, **kwargs):
+        # İstemci ilerlemeyi buradan izler; süreç yeniden başladıysa iş sonsuza dek RUNNING görünmesin
+        transfers.recover_stale_jobs(request.user)
+        return super().retrieve(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status not in ('QUEUED', 'RUNNING'):
+            return Response({'error': 'İş zaten bitti'}, status=409)
+        transfers.cancel(job)
+        return Response(self.get_serializer(job).data)
 
-        except Exception as e:
-            return Response({'error': f'Kopyalama hatası: {str(e)}'}, status=500)
 
 class ThumbnailView(views.APIView):
+    """
+    Fotoğraf küçük resmini / video poster karesini kalıcı önbellekten sunar.
+    ?size=grid|preview|full (varsayılan grid), Accept: image/webp ise WebP döner.
+    Videolarda ?size=clip düşük bit hızlı önizleme klibini (MP4, Range destekli) döndürür;
+    henüz üretilmediyse 202, ffmpeg meşgulse 503 (Retry-After) döner ve üretim kuyruğa alınır.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, pk=None):
+        size_name = request.query_params.get('size', thumbnails.DEFAULT_SIZE)
+        if size_name not in thumbnails.THUMBNAIL_SIZES and size_name != video.CLIP:
+            return Response({'error': 'Geçersiz boyut'}, status=400)
+        fmt = _thumbnail_format(request)
+
         try:
             file_item = FileItem.objects.get(pk=pk, user=request.user)
-            if file_item.file_type != 'PHOTO':
-                 return Response(status=404)
-            
-            file_path = file_item.file.path
-            if not os.path.exists(file_path):
-                 return Response(status=404)
-
-            try:
-                img = Image.open(file_path)
-                img.thumbnail((400, 400)) 
-                
-                buffer = BytesIO()
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                    
-                img.save(buffer, format='JPEG', quality=60)
-                buffer.seek(0)
-                return HttpResponse(buffer, content_type='image/jpeg')
-            except Exception as e:
-                print(f"Thumb Error: {e}")
-                return Response(status=500)
-            
         except FileItem.DoesNotExist:
             return Response(status=404)
-        except Exception as e:
+
+        try:
+            path, key, mtime = _thumbnail_source(file_item, size_name, fmt)
+        except (FileNotFoundError, decoders.Unsupported):
+            return Response(status=404)
+        except video.Pending:
+            return Response({'status': 'pending'}, status=202, headers={'Retry-After': '10'})
+        except video.Busy:
+            return Response({'error': 'Video işleniyor, daha sonra tekrar deneyin'}, status=503, headers={'Retry-After': '5'})
+        except Exception:
+            logger.exception('Küçük resim üretilemedi: %s', file_item.pk)
             return Response(status=500)
+        if size_name == video.CLIP:
+            return _clip_response(serving.serve_file(request, path, _clip_filename(file_item)))
+        return _thumbnail_response(request, path, key, mtime, fmt)
+
+
+def _thumbnail_source(file_item, size_name, fmt):
+    """Önbellekteki (yol, etag, kaynak mtime); dosyanın bu boyutta küçük resmi yoksa FileNotFoundError."""
+    is_video = video.is_video(file_item) and video.available()
+    if size_name == video.CLIP:
+        if not is_video:
+            raise FileNotFoundError(file_item.file.name)
+        return video.get_clip(file_item)
+    if file_item.file_type == 'PHOTO':
+        return thumbnails.get_thumbnail(file_item, size_name, fmt)
+    if is_video:
+        return video.get_poster(file_item, size_name, fmt)
+    raise FileNotFoundError(file_item.file.name)
+
+
+def _clip_filename(file_item):
+    return os.path.splitext(file_item.filename or os.path.basename(file_item.file.name))[0] + '.mp4'
+
+
+def _clip_response(response):
+    # Klip kaynak değişmedikçe aynıdır (önbellek anahtarı)
+    if response.status_code in (200, 206, 304):
+        response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
+def _thumbnail_format(request):
+    return 'WEBP' if 'image/webp' in request.META.get('HTTP_ACCEPT', '') else 'JPEG'
+
+
+def _thumbnail_response(request, path, key, mtime, fmt, buffered=False):
+    """buffered: gövde baştan okunur (ASGI; küçük resimler küçük olduğundan akışa gerek yok)."""
+    etag = f'"{key}"'
+    response = get_conditional_response(request, etag=etag, last_modified=int(mtime))
+    if response is None:
+        content_type = thumbnails.FORMATS[fmt][1]
+        if buffered:
+            with open(path, 'rb') as f:
+                response = HttpResponse(f.read(), content_type=content_type)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = 'private, max-age=86400'
+    response['Vary'] = 'Accept'
+    return response
+
+
+async def _thumbnail_async(request, pk=None):
+    user = await aio.authenticate(request)
+    if user is None:
+        return aio.error('Yetkisiz erişim', 401)
+    size_name = request.GET.get('size', thumbnails.DEFAULT_SIZE)
+    if size_name not in thumbnails.THUMBNAIL_SIZES and size_name != video.CLIP:
+        return aio.error('Geçersiz boyut', 400)
+    fmt = _thumbnail_format(request)
+
+    file_item = await FileItem.objects.filter(pk=pk, user=user).afirst()
+    if file_item is None:
+        return HttpResponse(status=404)
+    try:
+        path, key, mtime = await aio.run_cpu(_thumbnail_source, file_item, size_name, fmt)
+    except (FileNotFoundError, decoders.Unsupported):
+        return HttpResponse(status=404)
+    except video.Pending:
+        response = aio.json_response({'status': 'pending'}, 202)
+        response['Retry-After'] = '10'
+        return response
+    except video.Busy:
+        response = aio.error('Video işleniyor, daha sonra tekrar deneyin', 503)
+        response['Retry-After'] = '5'
+        return response
+    except Exception:
+        logger.exception('Küçük resim üretilemedi: %s', file_item.pk)
+        return HttpResponse(status=500)
+    try:
+        if size_name == video.CLIP:
+            return _clip_response(await aio.run_io(
+                serving.serve_file, request, path, _clip_filename(file_item), iterator=aio.iter_file,
+            ))
+        return await aio.run_io(_thumbnail_response, request, path, key, mtime, fmt, buffered=True)
+    except FileNotFoundError:
+        return HttpResponse(status=404)
+
+
+def _upload_error_data(e):
+    data = {'error': e.message}
+    if e.offset is not None:
+        data['offset'] = e.offset
+    return data
+
+
+def _upload_error_response(e):
+    return Response(_upload_error_data(e), status=e.status)
+
+
+def _chunk_range(meta, session):
+    """PUT başlıklarından (başlangıç, uzunluk). Content-Range yoksa Upload-Offset / sunucudaki offset kullanılır."""
+    length = meta.get('CONTENT_LENGTH')
+    length = int(length) if length and length.isdigit() else None
+    if meta.get('HTTP_CONTENT_RANGE'):
+        start, range_length = uploads.parse_content_range(meta['HTTP_CONTENT_RANGE'], session.total_size)
+        if length is not None and length != range_length:
+            raise uploads.UploadError('Content-Range ile Content-Length uyuşmuyor')
+        return start, range_length
+    return int(meta.get('HTTP_UPLOAD_OFFSET', session.offset)), length
+
+
+class UploadSessionCreateView(views.APIView):
+    """
+    Parça parça yükleme oturumu açar.
+    Body: filename, size, file_type ('FILE' / 'PHOTO'), target ('USER' / 'SHARED')
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        try:
+            session = uploads.create_session(
+                request.user,
+                request.data.get('filename'),
+                request.data.get('size'),
+                file_type=request.data.get('file_type', 'FILE'),
+                target=request.data.get('target', 'USER'),
+            )
+        except uploads.UploadError as e:
+            return _upload_error_response(e)
+        return Response({
+            'id': session.id,
+            'offset': 0,
+            'size': session.total_size,
+            'chunk_size': uploads.CHUNK_SIZE,
+        }, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(views.APIView):
+    """
+    GET/HEAD: kaldığı yer (offset), PUT: Content-Range ile parça yükle, DELETE: iptal
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_session(self, request, pk):
+        try:
+            return UploadSession.objects.get(pk=pk, user=request.user)
+        except UploadSession.DoesNotExist:
+            return None
+
+    def get(self, request, pk=None):
+        session = self.get_session(request, pk)
+        if session is None:
+            return Response({'error': 'Yükleme oturumu bulunamadı'}, status=404)
+        response = Response({
+            'id': session.id,
+            'offset': session.offset,
+            'size': session.total_size,
+            'status': session.status,
+        })
+        response['Upload-Offset'] = str(session.offset)
+        return response
+
+    def put(self, request, pk=None):
+        session = self.get_session(request, pk)
+        if session is None:
+            return Response({'error': 'Yükleme oturumu bulunamadı'}, status=404)
+
+        # Gövde parse edilmeden, akıştan doğrudan geçici dosyaya yazılır
+        try:
+            start, length = _chunk_range(request.META, session)
+            offset = uploads.write_chunk(session, start, request.stream, length)
+        except uploads.UploadError as e:
+            return _upload_error_response(e)
+        except ValueError:
+            return Response({'error': 'Geçersiz offset'}, status=400)
+
+        response = Response({'offset': offset, 'size': session.total_size})
+        response['Upload-Offset'] = str(offset)
+        return response
+
+    def delete(self, request, pk=None):
+        session = self.get_session(request, pk)
+        if session is None:
+            return Response({'error': 'Yükleme oturumu bulunamadı'}, status=404)
+        uploads.abort(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+async def _upload_put_async(request, pk=None):
+    """
+    UploadSessionView.put'un ASGI sürümü. Gövde Django tarafından önceden biriktirilmiştir
+    (MAX_CHUNK_SIZE'ı aşanlar aio.limit_body'de reddedilir); geçici dosyaya yazma G/Ç havuzunda yapılır.
+    """
+    user = await aio.authenticate(request)
+    if user is None:
+        return aio.error('Yetkisiz erişim', 401)
+    session = await UploadSession.objects.filter(pk=pk, user=user).afirst()
+    if session is None:
+        return aio.error('Yükleme oturumu bulunamadı', 404)
+
+    try:
+        start, length = _chunk_range(request.META, session)
+        offset = await aio.run_io(uploads.write_chunk, session, start, request, length)
+    except uploads.UploadError as e:
+        return aio.json_response(_upload_error_data(e), e.status)
+    except ValueError:
+        return aio.error('Geçersiz offset', 400)
+
+    response = aio.json_response({'offset': offset, 'size': session.total_size})
+    response['Upload-Offset'] = str(offset)
+    return response
+
+
+class UploadSessionFinalizeView(views.APIView):
+    """Tüm parçalar geldiyse dosyayı yerine taşır ve FileItem oluşturur"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk=None):
+        try:
+            session = UploadSession.objects.get(pk=pk, user=request.user)
+        except UploadSession.DoesNotExist:
+            return Response({'error': 'Yükleme oturumu bulunamadı'}, status=404)
+
+        try:
+            result = uploads.finalize(session)
+        except uploads.UploadError as e:
+            return _upload_error_response(e)
+        except Exception as e:
+            return Response({'error': f'Yükleme hatası: {str(e)}'}, status=500)
+
+        if session.target == 'SHARED':
+            return Response({'status': 'success', 'filename': result}, status=status.HTTP_201_CREATED)
+        thumbnails.schedule_pregenerate([result])
+        metadata.schedule_extraction([result])
+        serializer = FileItemSerializer(result, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+# ASGI altında ağır G/Ç uçları async çalışır (bkz. aio); WSGI'de DRF view'ları kullanılır
+events_view = aio.hybrid(EventsView.as_view(), get=_events_async)
+serve_shared_view = aio.hybrid(ServeSharedFileView.as_view(), get=_serve_shared_async)
+serve_view = aio.hybrid(ServeView.as_view(), get=_serve_async)
+archive_view = aio.hybrid(ArchiveView.as_view(), get=_archive_async, post=_archive_async)
+thumbnail_view = aio.hybrid(ThumbnailView.as_view(), get=_thumbnail_async)
+upload_session_view = aio.hybrid(UploadSessionView.as_view(), put=_upload_put_async)
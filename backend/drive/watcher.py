@@ -0,0 +1,220 @@
+"""
+Dosya sistemi izleyicisi.
+
+Depolama kökleri (kullanıcı klasörleri, bkz. storage) ve paylaşılan klasör izlenir; değişen kullanıcı için
+artımlı eşitleme (sync.schedule_reconcile) kuyruğa alınır, paylaşılan klasördeki
+değişiklikler tüm kullanıcılara olay olarak yayınlanır. İstemcilerin listeyi sürekli
+yenilemesine gerek kalmaz, /api/drive/events üzerinden beklerler.
+
+    DRIVE_WATCHER = 'auto'      -> watchdog kuruluysa onu (Linux'ta inotify), yoksa yoklama
+    DRIVE_WATCHER = 'watchdog'  -> sadece watchdog
+    DRIVE_WATCHER = 'poll'      -> DRIVE_WATCHER_POLL_INTERVAL saniyede bir klasör mtime kontrolü
+    DRIVE_WATCHER = 'off'       -> kapalı (liste isteği eşitlemeyi tetikler)
+
+İzleyici web sürecinde ilk istekte başlatılır (ensure_started). Nesne deposunda (S3) çalışmaz.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+
+from . import events, listing, storage
+from .sync import LOCATIONS, TYPE_FOLDERS, schedule_reconcile
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+# Art arda gelen olaylar bu süre toplanıp tek seferde işlenir
+DEBOUNCE_SECONDS = 1.0
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def _is_hidden(rel):
+    return any(part.startswith('.') for part in rel.split(os.sep))
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        self.watcher.mark(event.src_path)
+        dest = getattr(event, 'dest_path', None)
+        if dest:
+            self.watcher.mark(dest)
+
+
+class DriveWatcher:
+    def __init__(self, roots, shared_dir, mode, interval):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.shared_dir = os.path.abspath(shared_dir)
+        self.mode = mode
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dirty_folders = set()
+        self._dirty_shared = set()
+        self._mtimes = {}
+        self._users = {}
+        self._observer = None
+
+    # --- Olayların kaydı ---
+
+    def mark(self, path):
+        """Değişen yolu ilgili kullanıcı klasörü veya paylaşılan klasör olarak işaretler."""
+        path = os.path.abspath(os.fsdecode(path))
+        with self._lock:
+            if path == self.shared_dir or path.startswith(self.shared_dir + os.sep):
+                rel = os.path.relpath(path, self.shared_dir)
+                if not _is_hidden(rel):
+                    self._dirty_shared.add(os.path.dirname(rel) if rel != '.' else '')
+            else:
+                root = next((r for r in self.roots if path.startswith(r + os.sep)), None)
+                if root is None:
+                    return
+                rel = os.path.relpath(path, root)
+                if not _is_hidden(rel):
+                    self._dirty_folders.add(rel.split(os.sep, 1)[0])
+        self._wake.set()
+
+    # --- Yoklama (watchdog yoksa) ---
+
+    def _user_folders(self):
+        """Köklerdeki kullanıcı klasörleri (paylaşılan klasör hariç) yolları."""
+        folders = []
+        for root in self.roots:
+            try:
+                with os.scandir(root) as it:
+                    folders.extend(
+                        e.path for e in it
+                        if e.is_dir() and not e.name.startswith('.') and os.path.abspath(e.path) != self.shared_dir
+                    )
+            except OSError:
+                continue
+        return folders
+
+    def _watched_dirs(self):
+        """Yoklanacak klasörler: kullanıcıların tip / favori / çöp klasörleri ve paylaşılan ağaç."""
+        dirs = []
+        for folder in self._user_folders():
+            for type_folder in TYPE_FOLDERS.values():
+                for subfolder, _, _ in LOCATIONS:
+                    dirs.append(os.path.join(folder, type_folder, subfolder) if subfolder else os.path.join(folder, type_folder))
+        for current, subdirs, _ in os.walk(self.shared_dir):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            dirs.append(current)
+        return dirs
+
+    def _poll(self, initial=False):
+        seen = {}
+        for path in self._watched_dirs():
+            try:
+                seen[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        if not initial:
+            for path in seen.keys() ^ self._mtimes.keys():
+                self.mark(path)
+            for path, mtime_ns in seen.items():
+                if self._mtimes.get(path, mtime_ns) != mtime_ns:
+                    # Klasörün kendisi işaretlenir; içindeki bir dosya gibi değerlendirilir
+                    self.mark(os.path.join(path, '_'))
+        self._mtimes = seen
+
+    # --- İşleme ---
+
+    def _user_for(self, folder):
+        user = self._users.get(folder)
+        if user is None:
+            self._users = {u.get_user_folder(): u for u in get_user_model().objects.filter(is_active=True)}
+            user = self._users.get(folder)
+        return user
+
+    def flush(self):
+        with self._lock:
+            folders, self._dirty_folders = self._dirty_folders, set()
+            shared, self._dirty_shared = self._dirty_shared, set()
+        if shared:
+            for rel_dir in shared:
+                listing.invalidate(os.path.join(self.shared_dir, rel_dir))
+            events.publish(None, [
+                {'op': 'shared', 'path': rel_dir.replace('\\', '/')} for rel_dir in sorted(shared)
+            ])
+        if folders:
+            close_old_connections()
+            for folder in folders:
+                user = self._user_for(folder)
+                if user is not None:
+                    schedule_reconcile(user)
+
+    def _run(self):
+        # Kapalıyken olan değişiklikler için açılışta herkes bir kez eşitlenir
+        folders = self._user_folders()
+        with self._lock:
+            self._dirty_folders.update(os.path.basename(folder) for folder in folders)
+        if self._observer is None:
+            self._poll(initial=True)
+        while True:
+            try:
+                if self._observer is None:
+                    self._wake.wait(self.interval)
+                    self._poll()
+                else:
+                    self._wake.wait()
+                time.sleep(DEBOUNCE_SECONDS)
+                self._wake.clear()
+                self.flush()
+            except Exception:
+                logger.exception('Dosya izleyici hatası')
+                time.sleep(self.interval)
+
+    def start(self):
+        if self.mode in ('auto', 'watchdog') and Observer is not None:
+            self._observer = Observer()
+            handler = _Handler(self)
+            for root in self.roots:
+                if os.path.isdir(root):
+                    self._observer.schedule(handler, root, recursive=True)
+            if not any(self.shared_dir.startswith(root + os.sep) for root in self.roots):
+                self._observer.schedule(handler, self.shared_dir, recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+        elif self.mode == 'watchdog':
+            raise RuntimeError('watchdog kurulu değil')
+        threading.Thread(target=self._run, name='drive-watcher', daemon=True).start()
+
+
+def ensure_started():
+    """İzleyiciyi (bir kez) başlatır. İzleyici çalışıyorsa True."""
+    global _watcher
+    if _watcher is not None:
+        return True
+    mode = getattr(settings, 'DRIVE_WATCHER', 'auto')
+    roots = storage.storage_roots()
+    if mode == 'off' or not storage.files().is_local or not any(os.path.isdir(root) for root in roots):
+        return False
+    with _watcher_lock:
+        if _watcher is None:
+            watcher = DriveWatcher(
+                roots, storage.shared_dir(), mode,
+                getattr(settings, 'DRIVE_WATCHER_POLL_INTERVAL', 5),
+            )
+            try:
+                watcher.start()
+            except Exception:
+                logger.exception('Dosya izleyici başlatılamadı')
+                return False
+            _watcher = watcher
+    return True
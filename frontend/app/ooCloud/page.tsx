@@ -37,6 +37,8 @@ import {
 import { motion, AnimatePresence } from 'framer-motion';
 import { folderSyncService } from '@/services/folderSync';
 import { selectMediaFiles, batchUploadMedia, isMobileDevice } from '@/utils/mobileUpload';
+import { getServeUrl, downloadFromUrl, downloadArchive } from '@/utils/serveLink';
+import { subscribeDriveEvents } from '@/utils/driveEvents';
 
 interface FileItem {
     id: string;
@@ -45,6 +47,7 @@ interface FileItem {
     file: string;
     file_url?: string;
     created_at: string;
+    taken_at?: string;
     is_favorite?: boolean;
     file_size: number;
 }
@@ -66,6 +69,8 @@ interface BrowseResponse {
 
 type TabType = 'files' | 'photos' | 'archive' | 'shared' | 'trash' | 'favorites' | 'settings';
 
+const FILES_PAGE_SIZE = 200;
+
 const SmartThumbnail = ({ item, viewMode, iconSize, onToggleFavorite, isSelectionMode, isSelected }: { item: BrowseItem | FileItem, viewMode: 'list' | 'grid', iconSize?: number, onToggleFavorite?: (item: FileItem) => void, isSelectionMode?: boolean, isSelected?: boolean }) => {
     const [objUrl, setObjUrl] = useState<string | null>(null);
     const [textContent, setTextContent] = useState<string | null>(null);
@@ -270,6 +275,11 @@ export default function OOCloudDashboard() {
     const router = useRouter();
 
     const [files, setFiles] = useState<FileItem[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const nextCursorRef = useRef<string | null>(null);
+    nextCursorRef.current = nextCursor;
+    const loadingMoreRef = useRef(false);
+    const loadMoreFilesRef = useRef<() => void>(() => {});
     const [loading, setLoading] = useState(true);
     const [uploading, setUploading] = useState(false);
     const [activeTab, setActiveTab] = useState<TabType>('photos');
@@ -340,6 +350,15 @@ export default function OOCloudDashboard() {
         }
     };
 
+    // Çoklu seçim işlemleri tek istekte yapılır; başarılı (veya zaten uygulanmış) id'leri döndürür
+    const runBatch = async (ids: string[], action: 'favorite' | 'unfavorite' | 'trash' | 'restore' | 'delete') => {
+        if (ids.length === 0) return new Set<string>();
+        const response = await api.post('/drive/files/batch', { ids, action });
+        const results: Record<string, string> = response.data.results || {};
+        if (response.data.failed > 0) console.error('Toplu işlem hataları:', results);
+        return new Set(Object.keys(results).filter(id => results[id] === 'ok' || results[id] === 'skipped'));
+    };
+
     const handleBulkFavorite = async () => {
         if (selectedIds.size === 0) return;
 
@@ -348,15 +367,13 @@ export default function OOCloudDashboard() {
         const targetStatus = !allFavorited;
 
         try {
-            const promises = selectedFiles.map(f => {
-                if (f.is_favorite === targetStatus) return Promise.resolve();
-                return api.post(`/drive/files/${f.id}/toggle_favorite/`);
-            });
-
-            await Promise.all(promises);
+            const done = await runBatch(
+                selectedFiles.filter(f => f.is_favorite !== targetStatus).map(f => f.id),
+                targetStatus ? 'favorite' : 'unfavorite'
+            );
 
             setFiles(prev => prev.map(f => {
-                if (selectedIds.has(f.id)) {
+                if (done.has(f.id)) {
                     return { ...f, is_favorite: targetStatus };
                 }
                 return f;
@@ -373,9 +390,8 @@ export default function OOCloudDashboard() {
     const handleBulkRestore = async () => {
         if (selectedIds.size === 0) return;
         try {
-            const promises = Array.from(selectedIds).map(id => api.post(`/drive/files/${id}/restore/`));
-            await Promise.all(promises);
-            setFiles(prev => prev.filter(f => !selectedIds.has(f.id)));
+            const done = await runBatch(Array.from(selectedIds), 'restore');
+            setFiles(prev => prev.filter(f => !done.has(f.id)));
             setIsSelectionMode(false);
             setSelectedIds(new Set());
         } catch { alert('Onarma hatası'); }
@@ -386,10 +402,9 @@ export default function OOCloudDashboard() {
         if (!confirm(`${selectedIds.size} dosyayı silmek istediğinize emin misiniz?`)) return;
 
         try {
-            const promises = Array.from(selectedIds).map(id => api.delete(`/drive/files/${id}`));
-            await Promise.all(promises);
+            const done = await runBatch(Array.from(selectedIds), 'delete');
 
-            setFiles(prev => prev.filter(f => !selectedIds.has(f.id)));
+            setFiles(prev => prev.filter(f => !done.has(f.id)));
             setIsSelectionMode(false);
             setSelectedIds(new Set());
         } catch (err) {
@@ -398,6 +413,24 @@ export default function OOCloudDashboard() {
         }
     };
 
+    const handleBulkDownload = async () => {
+        if (selectedIds.size === 0) return;
+        try {
+            if (selectedIds.size === 1) {
+                const item = files.find(f => selectedIds.has(f.id));
+                if (item) await handleDownload(item);
+            } else {
+                // Seçilenler tek ZIP olarak indirilir
+                await downloadArchive({ ids: Array.from(selectedIds) });
+            }
+            setIsSelectionMode(false);
+            setSelectedIds(new Set());
+        } catch (err) {
+            console.error(err);
+            alert('İndirme başarısız oldu');
+        }
+    };
+
     // Folder Sync Functions
     const handleFolderUpload = async (file: File, path: string): Promise<boolean> => {
         try {
@@ -565,13 +598,35 @@ export default function OOCloudDashboard() {
     const [filterType, setFilterType] = useState<'all' | 'photo' | 'video'>('all');
     const [showFilterMenu, setShowFilterMenu] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
+    // Sunucu araması sonuçları (null: arama yok veya sonuç henüz gelmedi)
+    const [searchResults, setSearchResults] = useState<FileItem[] | null>(null);
 
     const [mounted, setMounted] = useState(false);
 
+    // Yazarken sunucu tarafı arama (tüm dosyalarda, sadece yüklenmiş sayfalarda değil)
+    useEffect(() => {
+        const q = searchQuery.trim();
+        setSearchResults(null);
+        if (!q || activeTab === 'trash') return;
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const res = await api.get('/drive/search', { params: { q, type: 'file', limit: 100 } });
+                if (!cancelled) setSearchResults(res.data.results.map((result: any) => result.item));
+            } catch (err) {
+                console.error('Arama başarısız:', err);
+            }
+        }, 250);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchQuery, activeTab]);
+
     // Filter files based on active tab
-    const filteredFiles = useMemo(() => files.filter(f => {
-        // Search Filter
-        if (searchQuery && !f.filename.toLowerCase().includes(searchQuery.toLowerCase())) return false;
+    const filteredFiles = useMemo(() => (searchResults ?? files).filter(f => {
+        // Search Filter (sunucu sonucu gelene kadar yüklenmiş listede)
+        if (searchQuery && !searchResults && !f.filename.toLowerCase().includes(searchQuery.toLowerCase())) return false;
 
         // Media Filter Logic
         if (filterType === 'photo' && f.file_type !== 'PHOTO') return false;
@@ -582,7 +637,7 @@ export default function OOCloudDashboard() {
         if (activeTab === 'photos') return f.file_type === 'PHOTO';
         if (activeTab === 'files') return f.file_type === 'FILE'; // Sadece Dosyalar
         return true;
-    }), [files, activeTab, searchQuery, filterType]);
+    }), [files, searchResults, activeTab, searchQuery, filterType]);
 
     // Pagination / Infinite Scroll
     const [visibleCount, setVisibleCount] = useState(100);
@@ -604,6 +659,8 @@ export default function OOCloudDashboard() {
                         if (prev < filteredFilesRef.current.length) {
                             return prev + 50;
                         }
+                        // Yüklenen kayıtlar bitti, sunucudan sonraki sayfayı iste
+                        loadMoreFilesRef.current();
                         return prev;
                     });
                 }
@@ -644,15 +701,60 @@ export default function OOCloudDashboard() {
         }
     }, [isAuthenticated, router, mounted, activeTab]);
 
-    const fetchFiles = async () => {
-        setLoading(true);
+    // Sunucudaki değişiklikleri dinle (izleyici / diğer cihazlar); periyodik yenileme yok
+    const refreshOnEventRef = useRef<(shared: boolean) => void>(() => {});
+    refreshOnEventRef.current = (shared: boolean) => {
+        if (shared) {
+            if (activeTab === 'shared') fetchSharedItems(sharedCurrentPath);
+        } else if (activeTab !== 'archive' && activeTab !== 'shared') {
+            fetchFiles(true);
+        }
+    };
+
+    useEffect(() => {
+        if (!mounted || !isAuthenticated) return;
+        let timer: ReturnType<typeof setTimeout> | null = null;
+        const pending = { files: false, shared: false };
+        const unsubscribe = subscribeDriveEvents((events, reset) => {
+            pending.files = pending.files || reset || events.some(e => e.op !== 'shared');
+            pending.shared = pending.shared || reset || events.some(e => e.op === 'shared');
+            // Art arda gelen olaylar tek yenilemede birleşsin
+            if (timer) clearTimeout(timer);
+            timer = setTimeout(() => {
+                if (pending.files) refreshOnEventRef.current(false);
+                if (pending.shared) refreshOnEventRef.current(true);
+                pending.files = pending.shared = false;
+            }, 500);
+        });
+        return () => {
+            unsubscribe();
+            if (timer) clearTimeout(timer);
+        };
+    }, [mounted, isAuthenticated]);
+
+    // Sunucu tarafı filtreler (keyset sayfalama ile birlikte)
+    const buildFileParams = () => {
+        const params: any = { limit: FILES_PAGE_SIZE };
+        if (activeTab === 'trash') params.trash = 'true';
+        if (activeTab === 'photos') {
+            // Galeri çekim zamanına göre (EXIF) sıralanır
+            params.file_type = 'PHOTO';
+            params.sort = 'taken';
+        }
+        if (activeTab === 'files') params.file_type = 'FILE';
+        if (activeTab === 'favorites') params.is_favorite = 'true';
+        return params;
+    };
+
+    const fetchFiles = async (silent = false) => {
+        if (!silent) setLoading(true);
         try {
-            const params: any = {};
-            if (activeTab === 'trash') params.trash = 'true';
-            const res = await api.get('/drive/files', { params });
-            setFiles(res.data);
+            const res = await api.get('/drive/files', { params: buildFileParams() });
+            setFiles(res.data.results);
+            setNextCursor(res.data.next);
         } catch (err: any) {
             console.error(err);
+            if (silent) return;
             if (err.response?.data?.error) {
                 alert(`Hata: ${err.response.data.error}`);
             } else {
@@ -663,6 +765,23 @@ export default function OOCloudDashboard() {
         }
     };
 
+    // Sonraki sayfayı yükle (sonsuz kaydırma listenin sonuna geldiğinde çağırır)
+    const loadMoreFiles = async () => {
+        const cursor = nextCursorRef.current;
+        if (!cursor || loadingMoreRef.current) return;
+        loadingMoreRef.current = true;
+        try {
+            const res = await api.get('/drive/files', { params: { ...buildFileParams(), cursor } });
+            setFiles(prev => [...prev, ...res.data.results]);
+            setNextCursor(res.data.next);
+        } catch (err) {
+            console.error('Sonraki sayfa yüklenemedi:', err);
+        } finally {
+            loadingMoreRef.current = false;
+        }
+    };
+    loadMoreFilesRef.current = loadMoreFiles;
+
     const fetchBrowseItems = async (path: string) => {
         setBrowseLoading(true);
         try {
@@ -727,21 +846,11 @@ export default function OOCloudDashboard() {
         const fetchPreview = async () => {
             setPreviewLoading(true);
             try {
+                // Dosya blob olarak indirilmez; tarayıcı imzalı url'den Range ile okur
                 if (isBrowseItem(previewItem)) {
-                    const response = await api.get('/drive/serve-shared', {
-                        params: { path: previewItem.path },
-                        responseType: 'blob'
-                    });
-                    const contentType = response.headers['content-type'] || response.headers['Content-Type'];
-                    const blob = new Blob([response.data], { type: contentType });
-                    const url = window.URL.createObjectURL(blob);
-                    setPreviewUrl(url);
+                    setPreviewUrl(await getServeUrl({ path: previewItem.path }));
                 } else if (isFileItem(previewItem)) {
-                    const response = await api.get(previewItem.file, { responseType: 'blob' });
-                    const contentType = response.headers['content-type'] || response.headers['Content-Type'];
-                    const blob = new Blob([response.data], { type: contentType });
-                    const url = window.URL.createObjectURL(blob);
-                    setPreviewUrl(url);
+                    setPreviewUrl(await getServeUrl({ id: previewItem.id }));
                 }
             } catch (error) {
                 console.error("Önizleme yüklenemedi:", error);
@@ -844,19 +953,13 @@ export default function OOCloudDashboard() {
 
     const handleSharedDownload = async (item: BrowseItem) => {
         try {
-            const response = await api.get('/drive/serve-shared', {
-                params: { path: item.path },
-                responseType: 'blob'
-            });
-
-            // Dosya indirme işlemi
-            const url = window.URL.createObjectURL(new Blob([response.data]));
-            const link = document.createElement('a');
-            link.href = url;
-            link.setAttribute('download', item.name);
-            document.body.appendChild(link);
-            link.click();
-            link.remove();
+            if (item.is_dir) {
+                // Klasör ZIP olarak indirilir
+                await downloadArchive({ path: item.path });
+                return;
+            }
+            // Dosya indirme işlemi (tarayıcının indirme yöneticisi, devam ettirilebilir)
+            downloadFromUrl(await getServeUrl({ path: item.path }, { download: true }), item.name);
         } catch (error: any) {
             console.error('İndirme hatası:', error);
             alert(`Dosya indirilemedi: ${error.response?.status === 404 ? 'Dosya bulunamadı' : error.message}`);
@@ -897,8 +1000,15 @@ export default function OOCloudDashboard() {
 
     const handleSharedCopyToPersonal = async (item: BrowseItem) => {
         try {
-            await api.post('/drive/copy-shared', { path: item.path });
-            alert('Dosya başarıyla kopyalandı');
+            const res = await api.post('/drive/copy-shared', { path: item.path });
+            // Kopyalama sunucuda arka planda sürer; bitene kadar iş durumu sorgulanır
+            let job = res.data.job;
+            while (job.status === 'QUEUED' || job.status === 'RUNNING') {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                job = (await api.get(`/drive/transfers/${job.id}`)).data;
+            }
+            if (job.status === 'COMPLETED') alert('Dosya başarıyla kopyalandı');
+            else alert(`Kopyalama başarısız: ${job.error || job.status}`);
         } catch (error: any) {
             console.error('Kopyalama hatası:', error);
             alert(`Kopyalama başarısız: ${error.response?.data?.error || error.message}`);
@@ -1017,17 +1127,7 @@ export default function OOCloudDashboard() {
         const item = targetItem || selectedFile;
         if (item) {
             try {
-                const fileUrl = getFileUrl(item);
-                const response = await fetch(fileUrl);
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
-                const link = document.createElement('a');
-                link.href = url;
-                link.download = item.filename;
-                document.body.appendChild(link);
-                link.click();
-                document.body.removeChild(link);
-                // window.URL.revokeObjectURL(url); // Hata veriyor olabilir, comment out kalsın veya düzeltsin
+                downloadFromUrl(await getServeUrl({ id: item.id }, { download: true }), item.filename);
                 setShowContextMenu(false);
             } catch (err) {
                 console.error('Download failed:', err);
@@ -1155,6 +1255,12 @@ export default function OOCloudDashboard() {
                                         <span className="text-[9px] font-bold leading-none mt-0.5">Favorile</span>
                                     </button>
                                 )}
+                                {activeTab !== 'trash' && (
+                                    <button onClick={handleBulkDownload} className="flex flex-col items-center justify-center p-1.5 min-w-[50px] text-green-600 hover:bg-green-50 dark:hover:bg-green-900/20 rounded-lg transition-colors">
+                                        <Download size={20} />
+                                        <span className="text-[9px] font-bold leading-none mt-0.5">İndir</span>
+                                    </button>
+                                )}
                                 <button onClick={handleBulkDelete} className="flex flex-col items-center justify-center p-1.5 min-w-[50px] text-red-500 hover:bg-red-50 dark:hover:bg-red-900/20 rounded-lg transition-colors">
                                     <Trash2 size={20} />
                                     <span className="text-[9px] font-bold leading-none mt-0.5">Sil</span>
@@ -1563,7 +1669,7 @@ export default function OOCloudDashboard() {
                                                     </p>
                                                     {viewMode === 'list' && (
                                                         <p className="text-xs text-gray-500 mt-0.5 text-left">
-                                                            {new Date(file.created_at).toLocaleDateString()}
+                                                            {new Date(activeTab === 'photos' && file.taken_at ? file.taken_at : file.created_at).toLocaleDateString()}
                                                         </p>
                                                     )}
                                                 </div>
@@ -1603,7 +1709,7 @@ export default function OOCloudDashboard() {
                                     </div>
                                 ))}
                                 <div ref={observerTarget} className="col-span-full h-10 w-full flex items-center justify-center">
-                                    {visibleCount < filteredFiles.length && (
+                                    {(visibleCount < filteredFiles.length || nextCursor) && (
                                         <div className="text-xs text-gray-400">Yükleniyor...</div>
                                     )}
                                 </div>
@@ -1,5 +1,6 @@
 // File System Access API için otomatik senkronizasyon servisi
 // Modern tarayıcılarda (Chrome, Edge) klasör erişimi sağlar
+import { sha256File, findExistingHashes } from '@/utils/contentHash';
 
 interface SyncedFile {
     name: string;
@@ -235,7 +236,8 @@ class FolderSyncService {
 
             if (onProgress) onProgress(this.getStatus());
 
-            // Dosyaları yükle
+            // 1. Yüklenecek dosyaları ve içerik özetlerini topla
+            const pending: { fileInfo: SyncedFile; file: File; hash: string | null }[] = [];
             for (const fileInfo of filesToProcess) {
                 // Desktop modunda değişiklik kontrolü
                 if (this.directoryHandle) {
@@ -266,6 +268,27 @@ class FolderSyncService {
                         continue;
                     }
 
+                    pending.push({ fileInfo, file, hash: await sha256File(file) });
+                } catch (error) {
+                    console.error(`Dosya okuma hatası (${fileInfo.name}):`, error);
+                }
+            }
+
+            // 2. Sunucuda zaten olanları tek istekte öğren
+            const existingHashes = await findExistingHashes(
+                pending.map(p => p.hash).filter((h): h is string => !!h)
+            );
+
+            // 3. Dosyaları yükle
+            for (const { fileInfo, file, hash } of pending) {
+                try {
+                    if (hash && existingHashes.has(hash)) {
+                        fileInfo.uploaded = true;
+                        this.syncedFiles.set(fileInfo.path, fileInfo);
+                        console.log(`= Sunucuda var: ${fileInfo.name}`);
+                        continue;
+                    }
+
                     // Yükle
                     const success = await uploadCallback(file, fileInfo.path);
 
@@ -0,0 +1,74 @@
+// Parça parça (devam ettirilebilir) yükleme - /api/drive/uploads
+import api from '@/lib/api';
+
+const DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024;
+const MAX_RETRIES = 3;
+
+interface UploadOptions {
+    fileType?: 'FILE' | 'PHOTO';
+    target?: 'USER' | 'SHARED';
+    onProgress?: (uploadedBytes: number, totalBytes: number) => void;
+}
+
+// Aynı dosya tekrar seçilirse yarım kalan oturumdan devam etmek için anahtar
+const sessionKey = (file: File, target: string) =>
+    `uploadSession:${target}:${file.name}:${file.size}:${file.lastModified}`;
+
+const getServerOffset = async (sessionId: string): Promise<number | null> => {
+    try {
+        const res = await api.get(`/drive/uploads/${sessionId}`);
+        return res.data.status === 'ACTIVE' ? res.data.offset : null;
+    } catch {
+        return null;
+    }
+};
+
+export const uploadFileChunked = async (file: File, options: UploadOptions = {}) => {
+    const target = options.target || 'USER';
+    const fileType = options.fileType || (file.type.startsWith('image/') ? 'PHOTO' : 'FILE');
+    const key = sessionKey(file, target);
+
+    // 1. Oturum: varsa kaldığı yerden devam, yoksa yeni oturum
+    let sessionId = localStorage.getItem(key);
+    let offset = sessionId ? await getServerOffset(sessionId) : null;
+    let chunkSize = DEFAULT_CHUNK_SIZE;
+    if (offset === null) {
+        const res = await api.post('/drive/uploads', {
+            filename: file.name,
+            size: file.size,
+            file_type: fileType,
+            target,
+        });
+        sessionId = res.data.id as string;
+        chunkSize = res.data.chunk_size || DEFAULT_CHUNK_SIZE;
+        offset = 0;
+        localStorage.setItem(key, sessionId);
+    }
+
+    // 2. Parçaları sırayla gönder; hata olursa sunucudaki offset'i sorup devam et
+    let retries = 0;
+    while (offset < file.size) {
+        const end = Math.min(offset + chunkSize, file.size);
+        try {
+            const res = await api.put(`/drive/uploads/${sessionId}`, file.slice(offset, end), {
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`,
+                },
+            });
+            offset = res.data.offset as number;
+            retries = 0;
+            options.onProgress?.(offset, file.size);
+        } catch (err: any) {
+            if (++retries > MAX_RETRIES) throw err;
+            const serverOffset = err.response?.data?.offset ?? await getServerOffset(sessionId!);
+            if (serverOffset === null || serverOffset === undefined) throw err;
+            offset = serverOffset;
+        }
+    }
+
+    // 3. Tamamla
+    const res = await api.post(`/drive/uploads/${sessionId}/finalize`);
+    localStorage.removeItem(key);
+    return res.data;
+};
@@ -0,0 +1,30 @@
+// İçerik özeti (SHA-256) ve "sunucuda zaten var mı?" kontrolü - /api/drive/files/have
+import api from '@/lib/api';
+
+// Bu boyuttan büyük dosyalar belleğe okunup özetlenmez (doğrudan yüklenir)
+const MAX_HASH_SIZE = 512 * 1024 * 1024;
+const HAVE_BATCH = 5000;
+
+export const sha256File = async (file: File): Promise<string | null> => {
+    if (file.size > MAX_HASH_SIZE || typeof crypto === 'undefined' || !crypto.subtle) return null;
+    try {
+        const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+        return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+    } catch {
+        return null;
+    }
+};
+
+// Sunucuda bulunan özetlerin kümesini döndürür; hata olursa boş küme (hepsi yüklenir)
+export const findExistingHashes = async (hashes: string[], algorithm: 'sha256' | 'md5' = 'sha256'): Promise<Set<string>> => {
+    const found = new Set<string>();
+    for (let i = 0; i < hashes.length; i += HAVE_BATCH) {
+        try {
+            const res = await api.post('/drive/files/have', { algorithm, hashes: hashes.slice(i, i + HAVE_BATCH) });
+            Object.keys(res.data.have || {}).forEach(h => found.add(h));
+        } catch (error) {
+            console.error('Özet kontrol hatası:', error);
+        }
+    }
+    return found;
+};
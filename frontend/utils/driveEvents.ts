@@ -0,0 +1,34 @@
+// Sunucu değişiklik akışı (/api/drive/events) - long-poll ile dinler.
+// Liste periyodik olarak yenilenmez; sadece sunucu bir değişiklik bildirince yenilenir.
+import api from '@/lib/api';
+
+export interface DriveEvent {
+    op: 'create' | 'update' | 'delete' | 'shared';
+    id?: string;
+    path?: string;
+    seq: number;
+}
+
+export const subscribeDriveEvents = (onChange: (events: DriveEvent[], reset: boolean) => void) => {
+    let active = true;
+    let cursor = '';
+
+    const loop = async () => {
+        while (active) {
+            try {
+                const res = await api.get('/drive/events', { params: { cursor, timeout: 25 }, timeout: 40000 });
+                if (!active) return;
+                cursor = res.data.cursor;
+                if (res.data.reset || res.data.events.length > 0) {
+                    onChange(res.data.events, res.data.reset);
+                }
+            } catch {
+                // Ağ hatası: kısa bir süre bekleyip yeniden dene
+                await new Promise(resolve => setTimeout(resolve, 5000));
+            }
+        }
+    };
+    loop();
+
+    return () => { active = false; };
+};
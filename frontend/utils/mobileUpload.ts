@@ -1,5 +1,5 @@
 // Mobil tarayıcıda otomatik yedekleme için helper fonksiyonlar
-import api from '@/lib/api';
+import { uploadFileChunked } from '@/utils/chunkedUpload';
 
 // 1. Medya dosyalarını seç (mobil tarayıcıda)
 export const selectMediaFiles = async (): Promise<File[]> => {
@@ -45,25 +45,13 @@ export const batchUploadMedia = async (
                 onProgress(i + 1, files.length);
             }
 
-            // Upload
-            const formData = new FormData();
-            formData.append('file', file);
-
-            // Dosya tipini belirle
+            // Upload (parça parça; bağlantı koparsa kaldığı yerden devam eder)
             const isPhoto = file.type.startsWith('image/');
-            formData.append('file_type', isPhoto ? 'PHOTO' : 'FILE');
-
-            const response = await api.post('/drive/files', formData, {
-                headers: { 'Content-Type': 'multipart/form-data' },
-            });
+            await uploadFileChunked(file, { fileType: isPhoto ? 'PHOTO' : 'FILE' });
 
-            if (response.status === 201) {
-                successCount++;
-                if (onFileUploaded) {
-                    onFileUploaded(file.name);
-                }
-            } else {
-                failedCount++;
+            successCount++;
+            if (onFileUploaded) {
+                onFileUploaded(file.name);
             }
         } catch (error) {
             console.error(`Upload error for ${file.name}:`, error);
@@ -0,0 +1,45 @@
+// /api/drive/serve için süreli imzalı bağlantı.
+// <video>/<img>/<a> istekleri Authorization başlığı gönderemez; imzalı url ile
+// tarayıcı dosyayı Range istekleriyle parça parça çeker (ileri sarma, devam eden indirme).
+import api from '@/lib/api';
+
+export const getServeUrl = async (
+    target: { id: string } | { path: string },
+    options: { download?: boolean } = {}
+): Promise<string> => {
+    const res = await api.get('/drive/serve/link', { params: target });
+    return options.download ? `${res.data.url}&download=1` : res.data.url;
+};
+
+export const downloadFromUrl = (url: string, filename: string) => {
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+};
+
+// Çoklu dosya / klasör indirmesi: sunucu ZIP'i anlık üretir, tarayıcı doğrudan diske yazar.
+// Çok sayıda id url'ye sığmayacağı için imzalı adrese form ile POST edilir.
+export const downloadArchive = async (target: { ids: string[] } | { path: string }) => {
+    const res = await api.post('/drive/archive/link', target);
+    if ('path' in target) {
+        downloadFromUrl(res.data.url, '');
+        return;
+    }
+    const form = document.createElement('form');
+    form.method = 'POST';
+    form.action = res.data.url;
+    form.style.display = 'none';
+    for (const id of target.ids) {
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = 'ids';
+        input.value = id;
+        form.appendChild(input);
+    }
+    document.body.appendChild(form);
+    form.submit();
+    form.remove();
+};
@@ -8,9 +8,10 @@ echo ╚════════════════════════
 echo.
 
 REM Backend dizinine git ve sunucuyu başlat
-echo [1/2] Backend sunucusu başlatılıyor (Waitress)...
+REM ASGI: yavaş indirme / yüklemeler thread tutmaz (bkz. backend/drive/aio.py)
+echo [1/2] Backend sunucusu başlatılıyor (Uvicorn)...
 cd /d "%~dp0backend"
-start "MobilTools Backend" cmd /k ".\venv\Scripts\waitress-serve --listen=0.0.0.0:8001 --threads=8 --channel-timeout=300 --max-request-body-size=104857600 config.wsgi:application"
+start "MobilTools Backend" cmd /k ".\venv\Scripts\uvicorn config.asgi:application --host 0.0.0.0 --port 8001 --timeout-keep-alive 300"
 
 REM 3 saniye bekle
 timeout /t 3 /nobreak >nul
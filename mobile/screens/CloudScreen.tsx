@@ -20,41 +20,58 @@ interface FileItem {
 
 type TabType = 'photos' | 'files' | 'favorites' | 'trash';
 
+const PAGE_SIZE = 120;
+
 export default function CloudScreen() {
     const navigation = useNavigation();
     const [activeTab, setActiveTab] = useState<TabType>('photos');
     const [files, setFiles] = useState<FileItem[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [uploading, setUploading] = useState(false);
     const [refreshing, setRefreshing] = useState(false);
     const [previewItem, setPreviewItem] = useState<FileItem | null>(null);
     const [showSettings, setShowSettings] = useState(false);
 
+    // Sunucu tarafı filtreler; liste keyset sayfalama ile parça parça yüklenir
+    const buildParams = useCallback(() => {
+        const params: any = { limit: PAGE_SIZE };
+        if (activeTab === 'trash') params.trash = 'true';
+        if (activeTab === 'favorites') params.is_favorite = 'true';
+        if (activeTab === 'photos') params.file_type = 'PHOTO';
+        if (activeTab === 'files') params.file_type = 'FILE';
+        return params;
+    }, [activeTab]);
+
     const fetchFiles = useCallback(async () => {
         try {
             setLoading(true);
-            const params: any = {};
-            if (activeTab === 'trash') {
-                params.trash = 'true';
-            }
-            // If API supports filtering by Favorite server-side:
-            // if (activeTab === 'favorites') params.favorite = 'true';
-
-            // DÜZELTME: /drive/files/ yerine /drive/files
-            // Not: Django trailing slash isteyebilir, router configuration'a göre değişir.
-            // Backend router SimpleRouter(trailing_slash=False) kullanıyor ise /drive/files doğru.
-            // Eğer DefaultRouter ise /drive/files/ olabilir.
-            // `backend/drive/urls.py` dosyasında `SimpleRouter(trailing_slash=False)` kullanılıyor.
-            // Yani /drive/files DOĞRU, /drive/files/ YANLIŞ.
-            const response = await api.get('/drive/files', { params });
-            setFiles(response.data);
+            // Not: backend SimpleRouter(trailing_slash=False) kullanıyor, /drive/files DOĞRU.
+            const response = await api.get('/drive/files', { params: buildParams() });
+            setFiles(response.data.results);
+            setNextCursor(response.data.next);
         } catch (error) {
             console.error('Fetch error:', error);
         } finally {
             setLoading(false);
             setRefreshing(false);
         }
-    }, [activeTab]);
+    }, [buildParams]);
+
+    const loadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const response = await api.get('/drive/files', { params: { ...buildParams(), cursor: nextCursor } });
+            setFiles(prev => [...prev, ...response.data.results]);
+            setNextCursor(response.data.next);
+        } catch (error) {
+            console.error('Load more error:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
 
     useEffect(() => {
         fetchFiles();
@@ -301,6 +318,9 @@ export default function CloudScreen() {
                     numColumns={3}
                     contentContainerStyle={styles.listContent}
                     refreshControl={<RefreshControl refreshing={refreshing} onRefresh={onRefresh} />}
+                    onEndReached={loadMore}
+                    onEndReachedThreshold={0.5}
+                    ListFooterComponent={loadingMore ? <ActivityIndicator style={{ margin: 16 }} color="#007AFF" /> : null}
                     ListEmptyComponent={
                         <View style={styles.emptyState}>
                             <Ionicons name={activeTab === 'photos' ? "images-outline" : "folder-open-outline"} size={48} color="#ccc" />
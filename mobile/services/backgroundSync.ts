@@ -4,6 +4,8 @@ import * as MediaLibrary from 'expo-media-library';
 import * as FileSystem from 'expo-file-system';
 import * as Network from 'expo-network';
 import AsyncStorage from '@react-native-async-storage/async-storage';
+import { uploadFileChunked } from './chunkedUpload';
+import { pullChanges } from './driveChanges';
 
 
 const BACKGROUND_SYNC_TASK = 'background-media-sync';
@@ -86,7 +88,8 @@ TaskManager.defineTask(BACKGROUND_SYNC_TASK, async () => {
         let uploadedCount = 0;
         const newUploadedFiles: UploadedFile[] = [...uploadedFiles];
 
-        // Yeni dosyaları yükle
+        // 1. Yüklenmemiş görünen dosyaların yolunu ve MD5 özetini al (özet yerelde hesaplanır)
+        const candidates: { asset: MediaLibrary.Asset; localUri: string; filename: string; size: number; md5?: string }[] = [];
         for (const asset of assets.assets) {
             // Zaten yüklenmişse atla
             if (uploadedIds.has(asset.id)) continue;
@@ -96,51 +99,87 @@ TaskManager.defineTask(BACKGROUND_SYNC_TASK, async () => {
                 const assetInfo = await MediaLibrary.getAssetInfoAsync(asset);
                 if (!assetInfo.localUri) continue;
 
-                // Dosyayı oku
-                const fileInfo = await FileSystem.getInfoAsync(assetInfo.localUri);
+                const fileInfo = await FileSystem.getInfoAsync(assetInfo.localUri, { md5: true });
                 if (!fileInfo.exists) continue;
 
-                // Dosya türünü belirle
-                if (!token) {
-                    console.error('[Background Sync] No auth token available. Skipping upload.');
-                    return BackgroundFetch.BackgroundFetchResult.Failed;
-                }
-
-                // Dosya türünü belirle
-                const fileType = asset.mediaType === MediaLibrary.MediaType.photo ? 'PHOTO' : 'FILE';
-
-                console.log(`[Background Sync] Uploading ${assetInfo.filename} to ${API_URL}/drive/files`);
+                candidates.push({
+                    asset,
+                    localUri: assetInfo.localUri,
+                    filename: assetInfo.filename,
+                    size: fileInfo.size,
+                    md5: fileInfo.md5,
+                });
+            } catch (error: any) {
+                console.error(`[Background Sync] Error processing asset ${asset.id}:`, error.message);
+            }
+        }
 
-                // Yükle (FileSystem.uploadAsync kullanarak)
-                const uploadResponse = await FileSystem.uploadAsync(`${API_URL}/drive/files`, assetInfo.localUri, {
-                    fieldName: 'file',
-                    httpMethod: 'POST',
-                    uploadType: FileSystem.FileSystemUploadType.MULTIPART,
+        // 2. Sunucuda zaten olanları önce yerel katalogdan (sadece son değişiklikler çekilir),
+        //    bulunamayanları tek istekte sor (uygulama yeniden kurulsa bile tekrar yüklenmez)
+        let serverHas: Record<string, string> = {};
+        try {
+            const catalog = await pullChanges(API_URL, token);
+            for (const [id, entry] of Object.entries(catalog)) {
+                if (entry.content_md5) serverHas[entry.content_md5] = id;
+            }
+        } catch (error: any) {
+            console.error('[Background Sync] Catalog error:', error.message);
+        }
+        const hashes = candidates
+            .map(c => c.md5?.toLowerCase())
+            .filter((h): h is string => !!h && !serverHas[h]);
+        if (hashes.length > 0) {
+            try {
+                const response = await fetch(`${API_URL}/drive/files/have`, {
+                    method: 'POST',
                     headers: {
                         'Authorization': `Bearer ${token}`,
-                        'Accept': 'application/json',
-                    },
-                    parameters: {
-                        'file_type': fileType,
+                        'Content-Type': 'application/json',
                     },
+                    body: JSON.stringify({ algorithm: 'md5', hashes }),
                 });
+                if (response.ok) {
+                    Object.assign(serverHas, (await response.json()).have || {});
+                }
+            } catch (error: any) {
+                console.error('[Background Sync] Hash check error:', error.message);
+            }
+        }
 
-                if (uploadResponse.status >= 200 && uploadResponse.status < 300) {
-                    // Başarılı yüklemeyi kaydet
-                    newUploadedFiles.push({
-                        id: asset.id,
-                        modificationTime: asset.modificationTime,
+        // 3. Yeni dosyaları yükle
+        for (const candidate of candidates) {
+            const { asset } = candidate;
+            try {
+                if (!(candidate.md5 && serverHas[candidate.md5.toLowerCase()])) {
+                    // Dosya türünü belirle
+                    const fileType = asset.mediaType === MediaLibrary.MediaType.photo ? 'PHOTO' : 'FILE';
+
+                    console.log(`[Background Sync] Uploading ${candidate.filename} to ${API_URL}/drive/uploads`);
+
+                    // Parça parça yükle: bağlantı koparsa bir sonraki çalışmada kaldığı yerden devam eder
+                    await uploadFileChunked(candidate.localUri, {
+                        apiUrl: API_URL,
+                        token,
+                        key: asset.id,
+                        filename: candidate.filename,
+                        size: candidate.size,
+                        fileType,
                     });
                     uploadedCount++;
+                    console.log(`[Background Sync] Uploaded: ${candidate.filename}`);
+                } else {
+                    console.log(`[Background Sync] Already on server: ${candidate.filename}`);
+                }
 
-                    console.log(`[Background Sync] Uploaded: ${assetInfo.filename}`);
+                // Başarılı yüklemeyi (veya sunucuda zaten olanı) kaydet
+                newUploadedFiles.push({
+                    id: asset.id,
+                    modificationTime: asset.modificationTime,
+                });
 
-                    // Her 10 dosyada bir kaydet
-                    if (uploadedCount % 10 === 0) {
-                        await AsyncStorage.setItem('uploadedFiles', JSON.stringify(newUploadedFiles));
-                    }
-                } else {
-                    console.error(`[Background Sync] Upload failed for ${assetInfo.filename}. Status: ${uploadResponse.status}, Body: ${uploadResponse.body}`);
+                // Her 10 dosyada bir kaydet
+                if (newUploadedFiles.length % 10 === 0) {
+                    await AsyncStorage.setItem('uploadedFiles', JSON.stringify(newUploadedFiles));
                 }
 
             } catch (error: any) {
@@ -0,0 +1,91 @@
+// Parça parça (devam ettirilebilir) yükleme - /api/drive/uploads
+// Bağlantı koparsa oturum AsyncStorage'da kalır, sonraki çalışmada kaldığı yerden devam edilir.
+import * as FileSystem from 'expo-file-system';
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+const DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024;
+const MAX_RETRIES = 3;
+
+interface ChunkedUploadOptions {
+    apiUrl: string;
+    token: string;
+    key: string; // Oturumu hatırlamak için (ör. asset id)
+    filename: string;
+    size: number;
+    fileType: 'FILE' | 'PHOTO';
+}
+
+const sessionStorageKey = (key: string) => `uploadSession:${key}`;
+
+export async function uploadFileChunked(localUri: string, options: ChunkedUploadOptions) {
+    const { apiUrl, token, key, filename, size, fileType } = options;
+    const headers = { 'Authorization': `Bearer ${token}`, 'Accept': 'application/json' };
+
+    const getServerOffset = async (sessionId: string): Promise<number | null> => {
+        const res = await fetch(`${apiUrl}/drive/uploads/${sessionId}`, { headers });
+        if (!res.ok) return null;
+        const data = await res.json();
+        return data.status === 'ACTIVE' ? data.offset : null;
+    };
+
+    // 1. Oturum: varsa kaldığı yerden devam, yoksa yeni oturum
+    let sessionId = await AsyncStorage.getItem(sessionStorageKey(key));
+    let offset = sessionId ? await getServerOffset(sessionId) : null;
+    let chunkSize = DEFAULT_CHUNK_SIZE;
+    if (offset === null) {
+        const res = await fetch(`${apiUrl}/drive/uploads`, {
+            method: 'POST',
+            headers: { ...headers, 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename, size, file_type: fileType }),
+        });
+        if (!res.ok) throw new Error(`Upload session failed: ${res.status}`);
+        const data = await res.json();
+        sessionId = data.id as string;
+        chunkSize = Math.min(data.chunk_size || DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_SIZE);
+        offset = 0;
+        await AsyncStorage.setItem(sessionStorageKey(key), sessionId);
+    }
+
+    // 2. Parçaları geçici dosyaya çıkarıp ikili (binary) PUT ile gönder
+    const chunkUri = `${FileSystem.cacheDirectory}upload-${sessionId}.chunk`;
+    let retries = 0;
+    try {
+        while (offset < size) {
+            const length = Math.min(chunkSize, size - offset);
+            const chunk = await FileSystem.readAsStringAsync(localUri, {
+                encoding: FileSystem.EncodingType.Base64,
+                position: offset,
+                length,
+            });
+            await FileSystem.writeAsStringAsync(chunkUri, chunk, { encoding: FileSystem.EncodingType.Base64 });
+
+            const res = await FileSystem.uploadAsync(`${apiUrl}/drive/uploads/${sessionId}`, chunkUri, {
+                httpMethod: 'PUT',
+                uploadType: FileSystem.FileSystemUploadType.BINARY_CONTENT,
+                headers: {
+                    ...headers,
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Range': `bytes ${offset}-${offset + length - 1}/${size}`,
+                },
+            });
+
+            if (res.status >= 200 && res.status < 300) {
+                offset = JSON.parse(res.body).offset as number;
+                retries = 0;
+                continue;
+            }
+            if (++retries > MAX_RETRIES) throw new Error(`Chunk upload failed: ${res.status}`);
+            const serverOffset = await getServerOffset(sessionId!);
+            if (serverOffset === null) throw new Error('Upload session lost');
+            offset = serverOffset;
+        }
+    } finally {
+        await FileSystem.deleteAsync(chunkUri, { idempotent: true });
+    }
+
+    // 3. Tamamla
+    const res = await fetch(`${apiUrl}/drive/uploads/${sessionId}/finalize`, { method: 'POST', headers });
+    if (!res.ok) throw new Error(`Finalize failed: ${res.status}`);
+    await AsyncStorage.removeItem(sessionStorageKey(key));
+    return res.json();
+}
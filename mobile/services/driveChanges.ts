@@ -0,0 +1,101 @@
+import AsyncStorage from '@react-native-async-storage/async-storage';
+
+const CATALOG_KEY = 'driveCatalog';
+const PAGE_SIZE = 500;
+
+export interface CatalogEntry {
+    filename: string;
+    file_type: string;
+    size: number;
+    is_favorite: boolean;
+    trashed_at: string | null;
+    content_hash: string | null;
+    content_md5: string | null;
+}
+
+interface Catalog {
+    token: string | null;
+    items: Record<string, CatalogEntry>;
+}
+
+async function loadCatalog(): Promise<Catalog> {
+    const json = await AsyncStorage.getItem(CATALOG_KEY);
+    return json ? JSON.parse(json) : { token: null, items: {} };
+}
+
+function toEntry(data: any): CatalogEntry {
+    return {
+        filename: data.filename,
+        file_type: data.file_type,
+        size: data.size,
+        is_favorite: data.is_favorite,
+        trashed_at: data.trashed_at ?? null,
+        content_hash: data.content_hash ?? null,
+        content_md5: data.content_md5 ?? null,
+    };
+}
+
+// Tam liste (normal + çöp) sayfa sayfa çekilir
+async function loadAll(apiUrl: string, token: string): Promise<Record<string, CatalogEntry>> {
+    const items: Record<string, CatalogEntry> = {};
+    for (const trash of [false, true]) {
+        let cursor: string | null = null;
+        do {
+            const params = new URLSearchParams({ limit: String(PAGE_SIZE) });
+            if (trash) params.set('trash', 'true');
+            if (cursor) params.set('cursor', cursor);
+            const response = await fetch(`${apiUrl}/drive/files?${params}`, {
+                headers: { 'Authorization': `Bearer ${token}` },
+            });
+            if (!response.ok) throw new Error(`Liste alınamadı: ${response.status}`);
+            const page = await response.json();
+            for (const file of page.results) {
+                items[file.id] = toEntry(file);
+            }
+            cursor = page.next;
+        } while (cursor);
+    }
+    return items;
+}
+
+/**
+ * Sunucudaki dosya kataloğunu günceller ve döndürür.
+ * Sadece son token'dan sonraki değişiklikler çekilir; token geçersizse (ilk çalışma,
+ * uzun süre kapalı kalma) liste bir kez baştan yüklenir.
+ */
+export async function pullChanges(apiUrl: string, token: string): Promise<Record<string, CatalogEntry>> {
+    const catalog = await loadCatalog();
+    let since = catalog.token;
+    let hasMore = true;
+
+    while (hasMore) {
+        const params = new URLSearchParams(since ? { since } : {});
+        const response = await fetch(`${apiUrl}/drive/files/changes?${params}`, {
+            headers: { 'Authorization': `Bearer ${token}` },
+        });
+        if (!response.ok) throw new Error(`Değişiklikler alınamadı: ${response.status}`);
+        const result = await response.json();
+
+        if (result.reset) {
+            // Token'ı listeden önce almak, liste çekilirken olan değişikliklerin kaçmamasını sağlar
+            catalog.items = await loadAll(apiUrl, token);
+        }
+        for (const change of result.changes) {
+            if (change.op === 'delete') {
+                delete catalog.items[change.id];
+            } else {
+                catalog.items[change.id] = toEntry(change);
+            }
+        }
+        since = result.token;
+        catalog.token = since;
+        hasMore = result.has_more;
+    }
+
+    await AsyncStorage.setItem(CATALOG_KEY, JSON.stringify(catalog));
+    return catalog.items;
+}
+
+export async function clearCatalog() {
+    await AsyncStorage.removeItem(CATALOG_KEY);
+}